@@ -24,6 +24,14 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Объекты поиска создаются миграцией вручную и не описаны в моделях,
+# autogenerate не должен предлагать их удалить
+SEARCH_OBJECTS = {'search_vector', 'books_fts', 'ix_books_search_vector', 'ix_books_title_trgm', 'ix_books_author_trgm'}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (reflected and name in SEARCH_OBJECTS)
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -46,6 +54,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -65,7 +74,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
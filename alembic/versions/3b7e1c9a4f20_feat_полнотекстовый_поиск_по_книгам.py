@@ -0,0 +1,53 @@
+"""feat: полнотекстовый поиск по книгам
+
+Revision ID: 3b7e1c9a4f20
+Revises: dac1d3479116
+Create Date: 2026-10-18 10:12:41.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from utils.search import SQLITE_FTS_DDL, SQLITE_FTS_DROP
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e1c9a4f20'
+down_revision: Union[str, None] = 'dac1d3479116'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute(
+            "ALTER TABLE books ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(author, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+            ") STORED"
+        )
+        op.create_index('ix_books_search_vector', 'books', ['search_vector'], postgresql_using='gin')
+        op.create_index('ix_books_title_trgm', 'books', ['title'],
+                        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+        op.create_index('ix_books_author_trgm', 'books', ['author'],
+                        postgresql_using='gin', postgresql_ops={'author': 'gin_trgm_ops'})
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_books_author_trgm', table_name='books')
+        op.drop_index('ix_books_title_trgm', table_name='books')
+        op.drop_index('ix_books_search_vector', table_name='books')
+        op.drop_column('books', 'search_vector')
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DROP:
+            op.execute(statement)
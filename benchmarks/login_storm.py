@@ -0,0 +1,124 @@
+"""
+Пропускная способность логинов и задержка несвязанного эндпоинта (GET /book/read/{id}) во время всплеска логинов.
+
+Приложение запускается в этом процессе (uvicorn в отдельном потоке, без фоновых задач) поверх указанной базы,
+таблицы создаются заново, поэтому запускать только на отдельной базе:
+
+    python -m benchmarks.login_storm --logins 200 --concurrency 64
+
+Сначала задержка /book/read/1 измеряется без нагрузки, затем во время логинов. Для сравнения с синхронным
+bcrypt в обработчиках запустите тот же сценарий на предыдущей версии routes/auth.py.
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import threading
+import time
+from typing import List
+
+import httpx
+import uvicorn
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base, Book, User
+from database.session import get_db
+from utils.passwords import password_hasher
+from utils.rate_limiter import limiter
+from main import app
+
+EMAIL = "bench@example.com"
+PASSWORD = "password"
+
+
+def percentile(values: List[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+
+async def probe(client: httpx.AsyncClient, token: str, stop: asyncio.Event, interval: float) -> List[float]:
+    """Запрашивает /book/read/1 каждые interval секунд до stop; возвращает задержки в мс."""
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/book/read/1", headers={"Authorization": f"Bearer {token}"})
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def storm(base_url: str, logins: int, concurrency: int, idle_seconds: float) -> None:
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        token = (await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})).json()["token"]
+
+        stop = asyncio.Event()
+        idle = asyncio.ensure_future(probe(client, token, stop, 0.01))
+        await asyncio.sleep(idle_seconds)
+        stop.set()
+        idle_latencies = await idle
+
+        semaphore = asyncio.Semaphore(concurrency)
+        statuses = []
+
+        async def login() -> None:
+            async with semaphore:
+                response = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+                statuses.append(response.status_code)
+
+        stop = asyncio.Event()
+        busy = asyncio.ensure_future(probe(client, token, stop, 0.01))
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        busy_latencies = await busy
+
+    print(f"логины: {statuses.count(200) / elapsed:.1f}/с (200: {statuses.count(200)}, 503: {statuses.count(503)})")
+    for name, latencies in (("без нагрузки", idle_latencies), ("во время логинов", busy_latencies)):
+        print(f"/book/read {name:17} p50 {statistics.median(latencies):8.1f} мс   "
+              f"p99 {percentile(latencies, 0.99):8.1f} мс   ({len(latencies)} запросов)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=f"sqlite:///{tempfile.gettempdir()}/library_bench.db")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    connect_args = {"check_same_thread": False} if args.url.startswith("sqlite") else {}
+    engine = create_engine(args.url, connect_args=connect_args, pool_size=args.concurrency + 1, max_overflow=0)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Sessions = sessionmaker(bind=engine)
+    with Sessions() as db:
+        db.add(Book(id=1, title="Бенчмарк", author="Автор", copies=1))
+        db.add(User(email=EMAIL, password_hash=password_hasher.context.hash(PASSWORD)))
+        db.commit()
+
+    def bench_db():
+        with Sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = bench_db
+    limiter.enabled = False
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, lifespan="off", log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        asyncio.run(storm(f"http://127.0.0.1:{args.port}", args.logins, args.concurrency, args.idle_seconds))
+    finally:
+        server.should_exit = True
+        thread.join()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
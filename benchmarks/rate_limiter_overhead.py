@@ -0,0 +1,85 @@
+"""
+Накладные расходы лимитера на запрос: вычисление ключа (IP или пользователь из JWT) и учёт попадания
+в хранилище счётчиков (memory://, sqlite:///файл, shared://).
+
+    python -m benchmarks.rate_limiter_overhead --hits 20000 --processes 4
+
+С --processes N хранилище SQLite дополнительно нагружается из N процессов одновременно по одному ключу:
+итоговый счётчик должен совпасть с общим количеством попаданий (лимит общий для всех воркеров).
+"""
+import argparse
+import os
+import tempfile
+import time
+from multiprocessing import Pool
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from starlette.requests import Request
+
+from utils.jwt import jwt_handler, token_cache
+from utils.rate_limiter import rate_limit_key
+
+
+def make_request(token=None) -> Request:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 5000)})
+
+
+def per_call_us(func, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+def hit_many(args) -> None:
+    uri, hits = args
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    item = parse("1000000/hour")
+    for _ in range(hits):
+        limiter.hit(item, "shared-key")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hits", type=int, default=20000)
+    parser.add_argument("--keys", type=int, default=1000, help="количество разных ключей (пользователей)")
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    anonymous = make_request()
+    authorized = make_request(jwt_handler.issue_token(1, 3600))
+    token_cache.clear()
+    print(f"ключ по IP                 {per_call_us(lambda _: rate_limit_key(anonymous), args.hits):8.2f} мкс")
+    print(f"ключ по JWT (кэш токенов)  {per_call_us(lambda _: rate_limit_key(authorized), args.hits):8.2f} мкс")
+
+    path = os.path.join(tempfile.gettempdir(), "library_rate_limits_bench.db")
+    uris = ("memory://", f"sqlite:///{path}", "shared://")
+    item = parse("1000000/hour")
+    for uri in uris:
+        storage = storage_from_string(uri)
+        storage.reset()
+        limiter = FixedWindowRateLimiter(storage)
+        cost = per_call_us(lambda i: limiter.hit(item, f"user:{i % args.keys}"), args.hits)
+        print(f"попадание {uri.split(':')[0]:16} {cost:8.2f} мкс")
+
+    if args.processes > 1:
+        storage = storage_from_string(uris[1])
+        storage.reset()
+        per_process = args.hits // args.processes
+        started = time.perf_counter()
+        with Pool(args.processes) as pool:
+            pool.map(hit_many, [(uris[1], per_process)] * args.processes)
+        elapsed = time.perf_counter() - started
+        counted = FixedWindowRateLimiter(storage).get_window_stats(item, "shared-key").remaining
+        print(f"sqlite, {args.processes} процесса: {args.processes * per_process / elapsed:.0f} попаданий/с, "
+              f"учтено {item.amount - counted} из {args.processes * per_process}")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
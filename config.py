@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 from utils.logger import Logger
@@ -29,11 +30,113 @@ class Settings:
             f"postgresql+psycopg2://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+        # Асинхронный стек БД: 1 — маршруты книг, читателей и выдач работают через AsyncSession (драйвер asyncpg)
+        self.DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+        self.SQLALCHEMY_ASYNC_DATABASE_URL = (
+            f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+        )
+
         # SQL логирование
         self.ECHO_SQL = bool(os.getenv("ECHO_SQL", False))
 
-        # Лимит использования API (/books, /auth/..)
+        # Лимит использования API (/books, /auth/..): запросов в минуту по умолчанию; лимиты отдельных маршрутов
+        # через пробел в виде путь=лимит (например "/auth/login=5/minute /book/search=60/minute;1000/hour");
+        # хранилище счётчиков: sqlite:///путь (общее для процессов на хосте), shared://, shared+redis://, memory://
         self.RATE_LIMITER = str(os.getenv("RATE_LIMITER", "10"))
+        self.RATE_LIMITS = dict(item.split("=", 1) for item in os.getenv("RATE_LIMITS", "").split())
+        self.RATE_LIMIT_STORAGE_URI = os.getenv(
+            "RATE_LIMIT_STORAGE_URI", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'library_rate_limits.db')}"
+        )
+
+        # Пагинация и потоковая выдача каталога
+        self.BOOKS_PAGE_SIZE = int(os.getenv("BOOKS_PAGE_SIZE", "50"))
+        self.BOOKS_MAX_PAGE_SIZE = int(os.getenv("BOOKS_MAX_PAGE_SIZE", "500"))
+        self.STREAM_YIELD_PER = int(os.getenv("STREAM_YIELD_PER", "1000"))
+        self.BOOKS_BATCH_READ_MAX = int(os.getenv("BOOKS_BATCH_READ_MAX", "100"))
+
+        # Поиск по каталогу
+        self.SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "20"))
+        self.SEARCH_MAX_PAGE_SIZE = int(os.getenv("SEARCH_MAX_PAGE_SIZE", "100"))
+
+        # Максимальное количество одновременно выданных читателю книг
+        self.MAX_ACTIVE_BORROWS = int(os.getenv("MAX_ACTIVE_BORROWS", "3"))
+
+        # Срок выдачи книги, дни; период поиска новых просрочек, секунды (0 — выключен); страница /borrow/overdue
+        self.LOAN_PERIOD_DAYS = int(os.getenv("LOAN_PERIOD_DAYS", "14"))
+        self.OVERDUE_SCAN_INTERVAL = float(os.getenv("OVERDUE_SCAN_INTERVAL", "60"))
+        self.OVERDUE_PAGE_SIZE = int(os.getenv("OVERDUE_PAGE_SIZE", "50"))
+        self.OVERDUE_MAX_PAGE_SIZE = int(os.getenv("OVERDUE_MAX_PAGE_SIZE", "500"))
+
+        # Перенос возвращённых выдач в архив: возраст возврата, дни; период, секунды (0 — выключен); размер пачки
+        self.ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+        self.ARCHIVE_INTERVAL = float(os.getenv("ARCHIVE_INTERVAL", "3600"))
+        self.ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+
+        # Аналитика выдач: период обновления агрегатов, секунды (0 — выключен); задержка учёта новых выдач, секунды;
+        # размер топа книг по умолчанию; максимальный период отчёта, дни
+        self.ANALYTICS_ROLLUP_INTERVAL = float(os.getenv("ANALYTICS_ROLLUP_INTERVAL", "300"))
+        self.ANALYTICS_ROLLUP_DELAY = float(os.getenv("ANALYTICS_ROLLUP_DELAY", "60"))
+        self.ANALYTICS_TOP_LIMIT = int(os.getenv("ANALYTICS_TOP_LIMIT", "10"))
+        self.ANALYTICS_MAX_DAYS = int(os.getenv("ANALYTICS_MAX_DAYS", "366"))
+
+        # Максимальное количество позиций в пакетной выдаче и возврате
+        self.BORROW_BATCH_MAX = int(os.getenv("BORROW_BATCH_MAX", "100"))
+
+        # Ожидание брони (long-poll): таймаут по умолчанию и максимальный, период перепроверки в БД
+        # (изменения из других процессов приложения), секунды
+        self.HOLD_WAIT_TIMEOUT = float(os.getenv("HOLD_WAIT_TIMEOUT", "30"))
+        self.HOLD_WAIT_MAX_TIMEOUT = float(os.getenv("HOLD_WAIT_MAX_TIMEOUT", "120"))
+        self.HOLD_RECHECK_INTERVAL = float(os.getenv("HOLD_RECHECK_INTERVAL", "5"))
+        # Срок, в течение которого отложенный по брони экземпляр ждёт читателя (дни), и период поиска истёкших броней
+        # (секунды, 0 — выключен): экземпляр истёкшей брони переходит следующему в очереди
+        self.HOLD_PICKUP_DAYS = float(os.getenv("HOLD_PICKUP_DAYS", "3"))
+        self.HOLD_EXPIRY_INTERVAL = float(os.getenv("HOLD_EXPIRY_INTERVAL", "300"))
+
+        # История выдач читателя: размер страницы по умолчанию и максимальный
+        self.BORROW_HISTORY_PAGE_SIZE = int(os.getenv("BORROW_HISTORY_PAGE_SIZE", "50"))
+        self.BORROW_HISTORY_MAX_PAGE_SIZE = int(os.getenv("BORROW_HISTORY_MAX_PAGE_SIZE", "500"))
+
+        # Массовый импорт каталога
+        self.BOOK_IMPORT_BATCH_SIZE = int(os.getenv("BOOK_IMPORT_BATCH_SIZE", "1000"))
+        self.BOOK_IMPORT_MAX_ERRORS = int(os.getenv("BOOK_IMPORT_MAX_ERRORS", "1000"))
+
+        # Кэш книг: memory (LRU в процессе), shared (общее хранилище) или none
+        self.BOOK_CACHE_BACKEND = os.getenv("BOOK_CACHE_BACKEND", "memory")
+        self.BOOK_CACHE_SIZE = int(os.getenv("BOOK_CACHE_SIZE", "10000"))
+        self.BOOK_CACHE_TTL = float(os.getenv("BOOK_CACHE_TTL", "300"))
+        # адрес общего хранилища для shared (redis://host:6379/0); пусто — локальная замена в памяти процесса
+        self.BOOK_CACHE_URL = os.getenv("BOOK_CACHE_URL", "")
+
+        # Фасеты каталога: размер выдачи, период полного пересчёта copies и фасетов (0 — выключен).
+        # Пересчёт (и при запуске приложения) исправляет расхождение, если процесс упал, не сбросив copies_sync
+        self.FACETS_LIMIT = int(os.getenv("FACETS_LIMIT", "20"))
+        self.FACETS_REBUILD_INTERVAL = float(os.getenv("FACETS_REBUILD_INTERVAL", "3600"))
+
+        # Период пересчёта books.copies и фасетов по экземплярам книг, изменённым выдачами и возвратами, секунды
+        self.COPIES_SYNC_INTERVAL = float(os.getenv("COPIES_SYNC_INTERVAL", "5"))
+
+        # Время жизни access- и refresh-токенов, секунды; период синхронизации списка отозванных токенов из БД
+        # и период удаления истёкших записей, секунды (0 — выключен)
+        self.ACCESS_TOKEN_TTL = float(os.getenv("ACCESS_TOKEN_TTL", "900"))
+        self.REFRESH_TOKEN_TTL = float(os.getenv("REFRESH_TOKEN_TTL", "2592000"))
+        self.TOKEN_REVOCATION_SYNC_INTERVAL = float(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", "5"))
+        self.TOKEN_REVOCATION_CLEANUP_INTERVAL = float(os.getenv("TOKEN_REVOCATION_CLEANUP_INTERVAL", "3600"))
+
+        # Кэш проверенных JWT: максимальное количество токенов, максимальное время жизни записи, секунды
+        self.TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+        self.TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "300"))
+
+        # Пароли: схемы passlib через запятую (первая — для новых хэшей, остальные пересчитываются при входе),
+        # стоимость bcrypt; потоки хэширования и максимальная очередь к ним
+        self.PASSWORD_SCHEMES = [scheme.strip() for scheme in os.getenv("PASSWORD_SCHEMES", "bcrypt").split(",")]
+        self.PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+        self.PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+        self.PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "64"))
+
+        # Idempotency-Key: срок хранения ответа, секунды; размер кэша ответов в процессе; период очистки, секунды (0 — выключен)
+        self.IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+        self.IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+        self.IDEMPOTENCY_CLEANUP_INTERVAL = float(os.getenv("IDEMPOTENCY_CLEANUP_INTERVAL", "3600"))
 
         # Пример логирования
         self.logger.info(f"SQLALCHEMY_DATABASE_URL: {self.SQLALCHEMY_DATABASE_URL}")
@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import Table, select
+from sqlalchemy.orm import Session
+
+from database.dialect import insert_for
+from database.models import JobWatermark
+
+
+def changed_values(data: BaseModel, table: Table) -> dict:
+    """
+    Значения для UPDATE из частичной схемы: только явно переданные поля.
+
+    None для колонок NOT NULL пропускается (как и раньше, null не затирает обязательное поле),
+    для nullable-колонок явный null очищает значение.
+
+    :param data: Pydantic-схема обновления.
+    :param table: обновляемая таблица.
+    :return: словарь колонка -> новое значение.
+    """
+    return {
+        column: value
+        for column, value in data.model_dump(exclude_unset=True).items()
+        if value is not None or table.c[column].nullable
+    }
+
+
+def read_watermark(db: Session, name: str) -> Optional[datetime]:
+    """
+    Читает отметку прогресса фоновой задачи с блокировкой строки до конца транзакции.
+
+    :param db: сессия базы данных.
+    :param name: имя отметки.
+    :return: отметка или None, если задача ещё не запускалась.
+    """
+    return db.execute(select(JobWatermark.value).where(JobWatermark.name == name).with_for_update()).scalar()
+
+
+def claim_watermark(db: Session, name: str, value: datetime) -> bool:
+    """
+    Создаёт отметку прогресса, если её ещё нет (INSERT ... ON CONFLICT DO NOTHING, без commit).
+
+    Конкурентная транзакция с той же вставкой ждёт фиксации первой и получает False, поэтому
+    первичную обработку выполняет только одна из них.
+
+    :param db: сессия базы данных.
+    :param name: имя отметки.
+    :param value: начальная отметка.
+    :return: True, если отметка создана этой транзакцией.
+    """
+    stmt = insert_for(db, JobWatermark.__table__).values(name=name, value=value)
+    stmt = stmt.on_conflict_do_nothing(index_elements=[JobWatermark.name]).returning(JobWatermark.name)
+    return db.execute(stmt).first() is not None
+
+
+def set_watermark(db: Session, name: str, value: datetime) -> None:
+    """
+    Сохраняет отметку прогресса фоновой задачи (без commit).
+
+    :param db: сессия базы данных.
+    :param name: имя отметки.
+    :param value: новая отметка.
+    """
+    stmt = insert_for(db, JobWatermark.__table__).values(name=name, value=value)
+    db.execute(stmt.on_conflict_do_update(index_elements=[JobWatermark.name], set_={"value": value}))
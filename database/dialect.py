@@ -0,0 +1,38 @@
+from sqlalchemy import String, Table, func
+from sqlalchemy.sql import ColumnElement
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def insert_for(db: Session, table: Table):
+    """
+    Возвращает insert() диалекта текущей БД с поддержкой ON CONFLICT (upsert).
+
+    :param db: сессия базы данных.
+    :param table: таблица, в которую выполняется вставка.
+    :return: конструкция insert для Postgres или SQLite.
+    :raises NotImplementedError: если диалект не поддерживает ON CONFLICT.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upsert не поддерживается для диалекта {dialect}")
+
+
+def month_of(db: Session, column) -> ColumnElement:
+    """
+    Месяц даты в виде строки YYYY-MM в синтаксисе текущей БД.
+
+    :param db: сессия базы данных.
+    :param column: столбец или выражение с датой.
+    :return: SQL-выражение месяца.
+    :raises NotImplementedError: если диалект не поддерживается.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.to_char(column, "YYYY-MM", type_=String)
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m", column, type_=String)
+    raise NotImplementedError(f"Группировка по месяцам не поддерживается для диалекта {dialect}")
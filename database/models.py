@@ -1,11 +1,23 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, DateTime, Index, event, func, insert, text
 from sqlalchemy.orm import relationship
 
+from config import settings
 from .session import Base
 
 
+def default_due_date(context) -> datetime:
+    """
+    Срок возврата по умолчанию: дата выдачи плюс LOAN_PERIOD_DAYS.
+
+    :param context: контекст выполнения INSERT.
+    :return: срок возврата.
+    """
+    borrow_date = context.get_current_parameters().get("borrow_date") or datetime.utcnow()
+    return borrow_date + timedelta(days=settings.LOAN_PERIOD_DAYS)
+
+
 class User(Base):
     """
     Модель пользователя для базы данных.
@@ -42,7 +54,8 @@ class Book(Base):
         description (str): Описание книги, необязательное поле.
         year (int): Год издания книги, необязательное поле.
         isbn (str): ISBN книги, уникальное поле, необязательное поле.
-        copies (int): Количество экземпляров книги, по умолчанию 1, необязательное поле.
+        copies (int): Количество доступных экземпляров (кэш по book_copies, пересчитывается фоновой задачей), по умолчанию 1.
+        updated_at (datetime): Дата и время последнего изменения книги (для инкрементальной выгрузки).
 
     Методы:
         __repr__(): Возвращает строковое представление объекта книги.
@@ -56,10 +69,43 @@ class Book(Base):
     year = Column(Integer, nullable=True)
     isbn = Column(String, unique=True, nullable=True)
     copies = Column(Integer, nullable=False, default=1, server_default='1')
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow,
+                        server_default=func.now(), index=True)
 
     def __repr__(self):
         return f'<Book(title={self.title!r}, author={self.author!r}, description={self.description!r}, year={self.year!r}, isbn={self.isbn!r}, copies={self.copies!r})>'
-    
+
+
+class BookCopy(Base):
+    """
+    Физический экземпляр книги. Выдача и возврат меняют статус отдельных экземпляров,
+    а не общий счётчик books.copies.
+
+    Атрибуты:
+        id (int): Уникальный идентификатор экземпляра.
+        book_id (int): Идентификатор книги.
+        status (str): Статус: available (доступен), loaned (выдан), reserved (отложен по брони).
+
+    Методы:
+        __repr__(): Возвращает строковое представление экземпляра.
+    """
+    __tablename__ = 'book_copies'
+    __table_args__ = (Index('ix_book_copies_book_status', 'book_id', 'status'),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    book_id = Column(Integer, ForeignKey('books.id'), nullable=False)
+    status = Column(String, nullable=False, default='available', server_default='available')
+
+    def __repr__(self):
+        return f'<BookCopy(id={self.id!r}, book_id={self.book_id!r}, status={self.status!r})>'
+
+
+@event.listens_for(Book, 'after_insert')
+def create_book_copies(mapper, connection, target: Book) -> None:
+    """Книга, созданная через ORM, получает copies доступных экземпляров."""
+    if target.copies:
+        connection.execute(insert(BookCopy.__table__), [{'book_id': target.id}] * target.copies)
+
 
 class Reader(Base):
     """
@@ -69,6 +115,8 @@ class Reader(Base):
         id (int): Уникальный идентификатор читателя.
         name (str): Имя читателя, обязательное поле.
         email (str): Электронная почта читателя, уникальное поле, обязательное поле.
+        active_borrows (int): Количество невозвращённых книг (поддерживается выдачей и возвратом).
+        updated_at (datetime): Дата и время последнего изменения читателя (для инкрементальной выгрузки).
 
     Методы:
         __repr__(): Возвращает строковое представление объекта читателя.
@@ -79,6 +127,9 @@ class Reader(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
     email = Column(String, unique=True, nullable=False)
+    active_borrows = Column(Integer, nullable=False, default=0, server_default='0')
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow,
+                        server_default=func.now(), index=True)
 
     def __repr__(self):
         return f'<Reader(name={self.name!r}, email={self.email!r})>'
@@ -93,18 +144,292 @@ class BorrowedBooks(Base):
         book_id (int): Идентификатор выданной книги.
         reader_id (int): Идентификатор читателя, получившего книгу.
         borrow_date (datetime): Дата выдачи книги.
+        due_date (datetime): Срок возврата (дата выдачи плюс LOAN_PERIOD_DAYS).
         return_date (datetime): Дата возврата книги (изначально None).
 
     Методы:
         __repr__(): Возвращает строковое представление объекта выдачи книги.
     """
     __tablename__ = 'borrowed_books'
+    __table_args__ = (
+        # Активные выдачи и история читателя по дате выдачи
+        Index('ix_borrowed_books_reader_return_borrow', 'reader_id', 'return_date', 'borrow_date'),
+        # Только открытые выдачи: размер не зависит от истории
+        Index('ix_borrowed_books_open_reader', 'reader_id',
+              postgresql_where=text('return_date IS NULL'), sqlite_where=text('return_date IS NULL')),
+        # Открытые выдачи по сроку возврата (поиск новых просрочек)
+        Index('ix_borrowed_books_open_due', 'due_date',
+              postgresql_where=text('return_date IS NULL'), sqlite_where=text('return_date IS NULL')),
+        # Новые выдачи по дате (инкрементальное обновление аналитики)
+        Index('ix_borrowed_books_borrow_date', 'borrow_date'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     book_id = Column(Integer, ForeignKey('books.id'), nullable=False)
     reader_id = Column(Integer, ForeignKey('readers.id'), nullable=False)
     borrow_date = Column(DateTime, default=datetime.utcnow, nullable=False)
+    due_date = Column(DateTime, default=default_due_date, nullable=False)
     return_date = Column(DateTime, nullable=True)
 
     def __repr__(self):
         return f'<BorrowedBooks(book_id={self.book_id!r}, reader_id={self.reader_id!r}, borrow_date={self.borrow_date!r}, return_date={self.return_date!r})>'
+
+
+class BorrowedBooksArchive(Base):
+    """
+    Архив возвращённых выдач: строки переносятся из borrowed_books фоновой задачей
+    через ARCHIVE_AFTER_DAYS дней после возврата с сохранением id.
+
+    Атрибуты:
+        id (int): Идентификатор выдачи (тот же, что был в borrowed_books).
+        book_id (int): Идентификатор выданной книги.
+        reader_id (int): Идентификатор читателя.
+        borrow_date (datetime): Дата выдачи книги.
+        due_date (datetime): Срок возврата.
+        return_date (datetime): Дата возврата книги.
+
+    Методы:
+        __repr__(): Возвращает строковое представление архивной выдачи.
+    """
+    __tablename__ = 'borrowed_books_archive'
+    __table_args__ = (
+        # История читателя по дате выдачи
+        Index('ix_borrowed_books_archive_reader_borrow', 'reader_id', 'borrow_date'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    book_id = Column(Integer, ForeignKey('books.id'), nullable=False)
+    reader_id = Column(Integer, ForeignKey('readers.id'), nullable=False)
+    borrow_date = Column(DateTime, nullable=False)
+    due_date = Column(DateTime, nullable=False)
+    return_date = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<BorrowedBooksArchive(book_id={self.book_id!r}, reader_id={self.reader_id!r}, borrow_date={self.borrow_date!r}, return_date={self.return_date!r})>'
+
+
+class Hold(Base):
+    """
+    Бронь книги: очередь читателей (FIFO по времени создания) на книгу без доступных экземпляров.
+
+    Атрибуты:
+        id (int): Уникальный идентификатор брони.
+        book_id (int): Идентификатор книги.
+        reader_id (int): Идентификатор читателя.
+        status (str): waiting — в очереди, ready — экземпляр отложен для читателя,
+            fulfilled — книга выдана, cancelled — бронь отменена, expired — читатель не забрал экземпляр в срок.
+        created_at (datetime): Дата и время постановки в очередь.
+        ready_at (datetime): Дата и время, когда экземпляр был отложен для читателя.
+        ready_until (datetime): Срок, до которого отложенный экземпляр ждёт читателя.
+
+    Методы:
+        __repr__(): Возвращает строковое представление брони.
+    """
+    __tablename__ = 'holds'
+    __table_args__ = (
+        Index('ix_holds_book_created', 'book_id', 'created_at'),
+        Index('ix_holds_status_ready_until', 'status', 'ready_until'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    book_id = Column(Integer, ForeignKey('books.id'), nullable=False)
+    reader_id = Column(Integer, ForeignKey('readers.id'), nullable=False)
+    status = Column(String, nullable=False, default='waiting', server_default='waiting')
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    ready_at = Column(DateTime, nullable=True)
+    ready_until = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<Hold(book_id={self.book_id!r}, reader_id={self.reader_id!r}, status={self.status!r}, created_at={self.created_at!r})>'
+
+
+class OverdueLoan(Base):
+    """
+    Просроченная выдача, найденная фоновой задачей (запись создаётся один раз, при обнаружении просрочки).
+
+    Атрибуты:
+        borrow_id (int): Идентификатор выдачи.
+        book_id (int): Идентификатор книги.
+        reader_id (int): Идентификатор читателя.
+        due_date (datetime): Срок возврата.
+        detected_at (datetime): Дата и время обнаружения просрочки.
+
+    Методы:
+        __repr__(): Возвращает строковое представление просроченной выдачи.
+    """
+    __tablename__ = 'overdue_loans'
+
+    # Выдача может находиться в borrowed_books или в архиве, поэтому без внешнего ключа
+    borrow_id = Column(Integer, primary_key=True, autoincrement=False)
+    book_id = Column(Integer, ForeignKey('books.id'), nullable=False)
+    reader_id = Column(Integer, ForeignKey('readers.id'), nullable=False)
+    due_date = Column(DateTime, nullable=False)
+    detected_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<OverdueLoan(borrow_id={self.borrow_id!r}, reader_id={self.reader_id!r}, due_date={self.due_date!r})>'
+
+
+class JobWatermark(Base):
+    """
+    Отметка прогресса инкрементальной фоновой задачи: до какого момента данные уже обработаны.
+
+    Атрибуты:
+        name (str): Имя задачи.
+        value (datetime): Отметка.
+
+    Методы:
+        __repr__(): Возвращает строковое представление отметки.
+    """
+    __tablename__ = 'job_watermarks'
+
+    name = Column(String, primary_key=True)
+    value = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<JobWatermark(name={self.name!r}, value={self.value!r})>'
+
+
+class CatalogFacet(Base):
+    """
+    Предрассчитанные агрегаты каталога (фасеты), поддерживаются инкрементально при изменениях книг.
+
+    Атрибуты:
+        facet (str): Тип фасета: author (автор), decade (десятилетие издания). Итог по каталогу не хранится,
+            а суммируется по строкам decade.
+        value (str): Значение фасета (имя автора, десятилетие; пустая строка для неизвестного года).
+        titles (int): Количество книг (наименований).
+        copies (int): Суммарное количество доступных экземпляров.
+        available_titles (int): Количество книг, у которых есть доступные экземпляры (copies > 0).
+
+    Методы:
+        __repr__(): Возвращает строковое представление фасета.
+    """
+    __tablename__ = 'catalog_facets'
+    __table_args__ = (Index('ix_catalog_facets_facet_titles', 'facet', 'titles'),)
+
+    facet = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+    titles = Column(Integer, nullable=False, default=0, server_default='0')
+    copies = Column(Integer, nullable=False, default=0, server_default='0')
+    available_titles = Column(Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f'<CatalogFacet(facet={self.facet!r}, value={self.value!r}, titles={self.titles!r}, copies={self.copies!r}, available_titles={self.available_titles!r})>'
+
+
+class LoanDailyBook(Base):
+    """
+    Дневной агрегат выдач по книгам (аналитика «самые популярные книги»).
+
+    Атрибуты:
+        day (date): День выдачи.
+        book_id (int): Идентификатор книги.
+        loans (int): Количество выдач.
+
+    Методы:
+        __repr__(): Возвращает строковое представление агрегата.
+    """
+    __tablename__ = 'loan_daily_books'
+
+    day = Column(Date, primary_key=True)
+    book_id = Column(Integer, primary_key=True)
+    loans = Column(Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f'<LoanDailyBook(day={self.day!r}, book_id={self.book_id!r}, loans={self.loans!r})>'
+
+
+class LoanDailyHour(Base):
+    """
+    Дневной агрегат выдач по часам (аналитика «загруженные часы»).
+
+    Атрибуты:
+        day (date): День выдачи.
+        hour (int): Час выдачи (0–23, UTC).
+        loans (int): Количество выдач.
+
+    Методы:
+        __repr__(): Возвращает строковое представление агрегата.
+    """
+    __tablename__ = 'loan_daily_hours'
+
+    day = Column(Date, primary_key=True)
+    hour = Column(Integer, primary_key=True)
+    loans = Column(Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f'<LoanDailyHour(day={self.day!r}, hour={self.hour!r}, loans={self.loans!r})>'
+
+
+class LoanDailyReader(Base):
+    """
+    Дневной агрегат выдач по читателям (аналитика «выдачи читателей по месяцам»).
+
+    Атрибуты:
+        day (date): День выдачи.
+        reader_id (int): Идентификатор читателя.
+        loans (int): Количество выдач.
+
+    Методы:
+        __repr__(): Возвращает строковое представление агрегата.
+    """
+    __tablename__ = 'loan_daily_readers'
+    __table_args__ = (Index('ix_loan_daily_readers_reader_day', 'reader_id', 'day'),)
+
+    day = Column(Date, primary_key=True)
+    reader_id = Column(Integer, primary_key=True)
+    loans = Column(Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f'<LoanDailyReader(day={self.day!r}, reader_id={self.reader_id!r}, loans={self.loans!r})>'
+
+
+class IdempotencyKey(Base):
+    """
+    Сохранённый ответ на запрос с заголовком Idempotency-Key (повтор запроса возвращает его без повторного выполнения).
+
+    Атрибуты:
+        key (str): Хэш ключа вместе с пользователем и эндпоинтом.
+        fingerprint (str): Хэш тела запроса (тот же ключ с другим телом отклоняется).
+        response (str): Тело ответа (JSON).
+        created_at (datetime): Дата и время выполнения запроса.
+        expires_at (datetime): Срок хранения ключа.
+
+    Методы:
+        __repr__(): Возвращает строковое представление ключа.
+    """
+    __tablename__ = 'idempotency_keys'
+
+    key = Column(String(64), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<IdempotencyKey(key={self.key!r}, expires_at={self.expires_at!r})>'
+
+
+class RevokedToken(Base):
+    """
+    Отозванный токен (выход из системы, использованный refresh-токен). Запись нужна только до истечения токена.
+
+    Атрибуты:
+        jti (str): Идентификатор токена.
+        token_type (str): Тип токена: access или refresh.
+        expires_at (datetime): Срок действия токена.
+        revoked_at (datetime): Дата и время отзыва.
+
+    Методы:
+        __repr__(): Возвращает строковое представление отозванного токена.
+    """
+    __tablename__ = 'revoked_tokens'
+
+    jti = Column(String(32), primary_key=True)
+    token_type = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<RevokedToken(jti={self.jti!r}, token_type={self.token_type!r}, expires_at={self.expires_at!r})>'
@@ -1,5 +1,6 @@
-from typing import Optional
-from pydantic import BaseModel, EmailStr, Field
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, field_serializer
 
 
 class UserCreate(BaseModel):
@@ -11,13 +12,19 @@ class UserCreate(BaseModel):
 
 class TokenResponse(BaseModel):
     token: str
+    refresh_token: Optional[str] = None
 
     model_config = {"from_attributes": True}
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
 class BookCreate(BaseModel):
     title: str
     author: str
+    description: Optional[str] = Field(default=None, json_schema_extra={"nullable": True})
     year: Optional[int] = Field(default=None, json_schema_extra={"nullable": True})
     isbn: Optional[str] = Field(default=None, json_schema_extra={"nullable": True})
     copies: int
@@ -37,6 +44,61 @@ class BookResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class BookPage(BaseModel):
+    items: List[BookResponse]
+    next_cursor: Optional[int] = None
+
+    model_config = {"from_attributes": True}
+
+
+class BookBatchResponse(BaseModel):
+    items: List[BookResponse]
+    missing: List[int]
+
+    model_config = {"from_attributes": True}
+
+
+class BookSearchPage(BaseModel):
+    items: List[BookResponse]
+    next_offset: Optional[int] = None
+
+    model_config = {"from_attributes": True}
+
+
+class BookImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+    model_config = {"from_attributes": True}
+
+
+class BookImportResult(BaseModel):
+    processed: int
+    imported: int
+    failed: int
+    errors: List[BookImportError]
+    errors_truncated: bool = False
+
+    model_config = {"from_attributes": True}
+
+
+class FacetValue(BaseModel):
+    value: str
+    titles: int = 0
+    copies: int = 0
+    available_titles: int = 0
+
+    model_config = {"from_attributes": True}
+
+
+class CatalogFacetsResponse(BaseModel):
+    total: FacetValue
+    authors: List[FacetValue]
+    decades: List[FacetValue]
+
+    model_config = {"from_attributes": True}
+
+
 class BookUpdate(BaseModel):
     title: Optional[str] = None
     author: Optional[str] = None
@@ -69,6 +131,70 @@ class BorrowCreate(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class HoldCreate(BaseModel):
+    reader_id: int
+    book_id: int
+
+    model_config = {"from_attributes": True}
+
+
+class HoldResponse(BaseModel):
+    id: int
+    book_id: int
+    reader_id: int
+    status: str
+    created_at: datetime
+    ready_at: Optional[datetime] = None
+    ready_until: Optional[datetime] = None
+    position: Optional[int] = None
+
+    model_config = {"from_attributes": True}
+
+
+class OverdueLoanResponse(BaseModel):
+    borrow_id: int
+    book_id: int
+    reader_id: int
+    title: str
+    due_date: datetime
+    detected_at: datetime
+    return_date: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+class OverduePage(BaseModel):
+    items: List[OverdueLoanResponse]
+    next_cursor: Optional[int] = None
+
+    model_config = {"from_attributes": True}
+
+
+class BorrowBatch(BaseModel):
+    items: List[BorrowCreate] = Field(min_length=1)
+    atomic: bool = False
+
+    model_config = {"from_attributes": True}
+
+
+class BorrowBatchItemResult(BaseModel):
+    reader_id: int
+    book_id: int
+    status_code: int
+    detail: str
+
+    model_config = {"from_attributes": True}
+
+
+class BorrowBatchResult(BaseModel):
+    committed: bool
+    succeeded: int
+    failed: int
+    results: List[BorrowBatchItemResult]
+
+    model_config = {"from_attributes": True}
+
+
 class BorrowBookResponse(BaseModel):
     id: int
     title: str
@@ -76,7 +202,54 @@ class BorrowBookResponse(BaseModel):
     description: Optional[str] = None
     year: Optional[int] = None
     isbn: Optional[str] = None
-    borrow_date: str
+    borrow_date: datetime
+
+    model_config = {"from_attributes": True}
+
+    @field_serializer("borrow_date")
+    def serialize_borrow_date(self, borrow_date: datetime) -> str:
+        return borrow_date.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class BorrowHistoryItem(BaseModel):
+    id: int
+    book_id: int
+    title: str
+    author: str
+    borrow_date: datetime
+    due_date: datetime
+    return_date: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+class BorrowHistoryPage(BaseModel):
+    items: List[BorrowHistoryItem]
+    next_cursor: Optional[int] = None
+
+    model_config = {"from_attributes": True}
+
+
+
+class TopBook(BaseModel):
+    book_id: int
+    title: str
+    author: str
+    loans: int
+
+    model_config = {"from_attributes": True}
+
+
+class HourLoans(BaseModel):
+    hour: int
+    loans: int
 
     model_config = {"from_attributes": True}
 
+
+class ReaderMonthLoans(BaseModel):
+    reader_id: int
+    month: str
+    loans: int
+
+    model_config = {"from_attributes": True}
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from config import settings
 
@@ -9,6 +10,10 @@ engine = create_engine(DATABASE_URL, echo=ECHO_SQL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Асинхронный движок создаётся только при DB_ASYNC: драйвер asyncpg нужен лишь в этом режиме
+async_engine = create_async_engine(settings.SQLALCHEMY_ASYNC_DATABASE_URL, echo=ECHO_SQL) if settings.DB_ASYNC else None
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     """
     Функция-зависимость для получения сессии БД.
@@ -21,3 +26,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """
+    Функция-зависимость для получения асинхронной сессии БД (асинхронные маршруты, DB_ASYNC).
+
+    :yield: сессия SQLAlchemy AsyncSession.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
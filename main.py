@@ -1,17 +1,75 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import List
+
+from fastapi import APIRouter, FastAPI
 from slowapi.errors import RateLimitExceeded
 from slowapi import _rate_limit_exceeded_handler
 
+from config import settings
+from database.session import async_engine
 from utils.rate_limiter import limiter
-from routes import auth, book, reader, borrow
+from utils.scheduler import scheduler
+from utils.inventory import copies_sync, rebuild_catalog_job
+from utils.circulation import expire_holds_job
+from utils.overdue import scan_overdue_job
+from utils.archive import archive_loans_job
+from utils.analytics import update_rollups_job
+from utils.idempotency import purge_idempotency_keys_job
+from utils.revocation import purge_revocations_job, sync_revocations_job
+from routes import analytics, auth, book, book_async, reader, reader_async, borrow, borrow_async, export, hold
+
+# Фоновые задачи приложения
+scheduler.add_job("copies_sync", copies_sync.flush, settings.COPIES_SYNC_INTERVAL, run_on_shutdown=True)
+scheduler.add_job("catalog_rebuild", rebuild_catalog_job, settings.FACETS_REBUILD_INTERVAL, run_on_startup=True)
+scheduler.add_job("overdue_scan", scan_overdue_job, settings.OVERDUE_SCAN_INTERVAL)
+scheduler.add_job("holds_expiry", expire_holds_job, settings.HOLD_EXPIRY_INTERVAL)
+scheduler.add_job("loans_archive", archive_loans_job, settings.ARCHIVE_INTERVAL)
+scheduler.add_job("analytics_rollup", update_rollups_job, settings.ANALYTICS_ROLLUP_INTERVAL)
+scheduler.add_job("idempotency_cleanup", purge_idempotency_keys_job, settings.IDEMPOTENCY_CLEANUP_INTERVAL)
+scheduler.add_job(
+    "token_revocations_sync", sync_revocations_job, settings.TOKEN_REVOCATION_SYNC_INTERVAL, run_on_startup=True
+)
+scheduler.add_job("token_revocations_cleanup", purge_revocations_job, settings.TOKEN_REVOCATION_CLEANUP_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scheduler.start()
+    yield
+    await scheduler.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler) # type: ignore
 
-routers = [auth.router, book.router, reader.router, borrow.router]
-for router in routers:
-    app.include_router(router)
+
+def include_routers(app: FastAPI, routers: List[APIRouter]) -> None:
+    """
+    Подключает роутеры по порядку; маршрут с уже подключённым путём и методом пропускается.
+
+    :param app: приложение.
+    :param routers: роутеры в порядке приоритета.
+    """
+    registered = set()
+    for router in routers:
+        routes = []
+        for route in router.routes:
+            key = (route.path, frozenset(getattr(route, "methods", None) or ()))
+            if key not in registered:
+                registered.add(key)
+                routes.append(route)
+        app.include_router(APIRouter(routes=routes))
+
+
+routers = [auth.router, book.router, reader.router, borrow.router, hold.router, export.router, analytics.router]
+if settings.DB_ASYNC:
+    # Асинхронные маршруты книг, читателей и выдач заменяют синхронные с тем же путём и методом,
+    # остальные маршруты этих роутеров (импорт каталога, пакетные выдачи) работают на синхронной сессии
+    routers = [book_async.router, reader_async.router, borrow_async.router] + routers
+include_routers(app, routers)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,135 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from utils.dependencies import get_user
+from database.dialect import month_of
+from database.models import Book, LoanDailyBook, LoanDailyHour, LoanDailyReader
+from database.session import get_db
+from database.schemas import HourLoans, ReaderMonthLoans, TopBook
+from config import settings
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+def _period(date_from: Optional[date], date_to: Optional[date]) -> Tuple[date, date]:
+    """
+    Период отчёта (границы включительно): по умолчанию последние 30 дней.
+
+    :param date_from: первый день периода.
+    :param date_to: последний день периода.
+    :return: границы периода.
+    :raises HTTPException: если период пустой или длиннее ANALYTICS_MAX_DAYS.
+    """
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from не может быть позже date_to")
+    if (date_to - date_from).days >= settings.ANALYTICS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Период отчёта не может быть длиннее {settings.ANALYTICS_MAX_DAYS} дней")
+    return date_from, date_to
+
+
+@router.get("/top-books", response_model=List[TopBook])
+def top_books(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(default=settings.ANALYTICS_TOP_LIMIT, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user)
+) -> List[TopBook]:
+    """
+    Самые выдаваемые книги за период. Читаются только дневные агрегаты выдач, а не borrowed_books.
+
+    Аргументы:
+        date_from (date): Первый день периода (по умолчанию 29 дней до date_to).
+        date_to (date): Последний день периода (по умолчанию сегодня, UTC).
+        limit (int): Количество книг.
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        List[TopBook]: Книги по убыванию количества выдач.
+    """
+    date_from, date_to = _period(date_from, date_to)
+    loans = func.sum(LoanDailyBook.loans).label("loans")
+    ranked = (
+        select(LoanDailyBook.book_id, loans)
+        .where(LoanDailyBook.day.between(date_from, date_to))
+        .group_by(LoanDailyBook.book_id)
+        .order_by(loans.desc(), LoanDailyBook.book_id)
+        .limit(limit)
+        .subquery()
+    )
+    rows = db.execute(
+        select(ranked.c.book_id, Book.title, Book.author, ranked.c.loans)
+        .join(Book, Book.id == ranked.c.book_id)
+        .order_by(ranked.c.loans.desc(), ranked.c.book_id)
+    ).mappings().all()
+    return [TopBook(**row) for row in rows]
+
+
+@router.get("/busy-hours", response_model=List[HourLoans])
+def busy_hours(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user)
+) -> List[HourLoans]:
+    """
+    Количество выдач по часам суток (UTC) за период.
+
+    Аргументы:
+        date_from (date): Первый день периода (по умолчанию 29 дней до date_to).
+        date_to (date): Последний день периода (по умолчанию сегодня, UTC).
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        List[HourLoans]: Все 24 часа по порядку (часы без выдач — с нулём).
+    """
+    date_from, date_to = _period(date_from, date_to)
+    rows = db.execute(
+        select(LoanDailyHour.hour, func.sum(LoanDailyHour.loans))
+        .where(LoanDailyHour.day.between(date_from, date_to))
+        .group_by(LoanDailyHour.hour)
+    ).all()
+    loans = dict(rows)
+    return [HourLoans(hour=hour, loans=loans.get(hour, 0)) for hour in range(24)]
+
+
+@router.get("/reader-months", response_model=List[ReaderMonthLoans])
+def reader_months(
+    reader_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user)
+) -> List[ReaderMonthLoans]:
+    """
+    Количество выдач по читателям и месяцам за период.
+
+    Аргументы:
+        reader_id (int): Только указанный читатель (по умолчанию все читатели).
+        date_from (date): Первый день периода (по умолчанию 29 дней до date_to).
+        date_to (date): Последний день периода (по умолчанию сегодня, UTC).
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        List[ReaderMonthLoans]: Выдачи по читателю и месяцу (YYYY-MM), упорядоченные по читателю и месяцу.
+    """
+    date_from, date_to = _period(date_from, date_to)
+    month = month_of(db, LoanDailyReader.day).label("month")
+    stmt = (
+        select(LoanDailyReader.reader_id, month, func.sum(LoanDailyReader.loans).label("loans"))
+        .where(LoanDailyReader.day.between(date_from, date_to))
+        .group_by(LoanDailyReader.reader_id, month)
+        .order_by(LoanDailyReader.reader_id, month)
+    )
+    if reader_id is not None:
+        stmt = stmt.where(LoanDailyReader.reader_id == reader_id)
+    return [ReaderMonthLoans(**row) for row in db.execute(stmt).mappings().all()]
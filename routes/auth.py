@@ -1,19 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from passlib.context import CryptContext
+from typing import Optional
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from jose.exceptions import JWTError
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from database.session import get_db
 from database.models import User
-from database.schemas import UserCreate, TokenResponse
-from utils.jwt import jwt_handler
-from utils.rate_limiter import limiter
+from database.schemas import RefreshRequest, UserCreate, TokenResponse
+from utils.dependencies import get_user
+from utils.jwt import ACCESS_TOKEN, REFRESH_TOKEN, jwt_handler, token_cache
+from utils.revocation import revocation_list, revoke_token
+from utils.passwords import password_hasher
+from utils.rate_limiter import limiter, route_limit
 from config import settings
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+
+def _find_user(db: Session, email: str) -> Optional[User]:
+    return db.scalars(select(User).where(User.email == email)).first()
+
+
+def _update_password_hash(db: Session, user_id: int, password_hash: str) -> None:
+    db.execute(update(User.__table__).where(User.id == user_id).values(password_hash=password_hash))
+    db.commit()
+
+
+def _issue_tokens(user_id: int) -> TokenResponse:
+    return TokenResponse(
+        token=jwt_handler.issue_token(user_id, settings.ACCESS_TOKEN_TTL),
+        refresh_token=jwt_handler.issue_token(user_id, settings.REFRESH_TOKEN_TTL, REFRESH_TOKEN)
+    )
+
+
+def _verify_refresh_token(token: str) -> dict:
+    try:
+        claims = jwt_handler.verify_token(token)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Токен недействителен")
+    if claims.get("typ") != REFRESH_TOKEN or "jti" not in claims or "exp" not in claims:
+        raise HTTPException(status_code=401, detail="Токен недействителен")
+    return claims
+
+
 @router.post("/register", response_model=TokenResponse)
-@limiter.limit(f"{settings.RATE_LIMITER}/minute")
-def register(request: Request, register_user: UserCreate, db: Session = Depends(get_db)) -> TokenResponse:
+@limiter.limit(route_limit("/auth/register"))
+async def register(request: Request, register_user: UserCreate, db: Session = Depends(get_db)) -> TokenResponse:
     """
     Обрабатывает регистрацию пользователя.
 
@@ -28,23 +64,28 @@ def register(request: Request, register_user: UserCreate, db: Session = Depends(
 
     Вызывает исключение:
         HTTPException: Если предоставленная электронная почта уже существует.
+
+    Хэширование пароля выполняется в пуле password_hasher, запросы к БД — в пуле потоков,
+    поэтому обработчик не занимает поток на время bcrypt.
     """
-    if db.query(User).filter(User.email == register_user.email).first():
+    if await run_in_threadpool(_find_user, db, register_user.email):
         raise HTTPException(status_code=400, detail="Email already exists")
 
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    hashed_password = pwd_context.hash(register_user.password)
+    hashed_password = await password_hasher.hash(register_user.password)
     user = User(email=register_user.email, password_hash=hashed_password)
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    response = TokenResponse(token=jwt_handler.generate_token({"email": user.email, "password": user.password_hash}))
-    return response
+
+    def save() -> None:
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+
+    await run_in_threadpool(save)
+    return _issue_tokens(user.id)
 
 
 @router.post("/login", response_model=TokenResponse)
-@limiter.limit(f"{settings.RATE_LIMITER}/minute")
-def login(request: Request, login_user: UserCreate, db: Session = Depends(get_db)) -> TokenResponse:
+@limiter.limit(route_limit("/auth/login"))
+async def login(request: Request, login_user: UserCreate, db: Session = Depends(get_db)) -> TokenResponse:
     """
     Обрабатывает вход пользователя.
 
@@ -59,15 +100,104 @@ def login(request: Request, login_user: UserCreate, db: Session = Depends(get_db
 
     Вызывает исключение:
         HTTPException: Если предоставленная электронная почта не существует.
+
+    Если хэш пароля создан устаревшей схемой или стоимостью, он прозрачно пересчитывается и сохраняется.
     """
-    user = db.query(User).filter(User.email == login_user.email).first()
+    user = await run_in_threadpool(_find_user, db, login_user.email)
 
     if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    if not pwd_context.verify(secret=login_user.password, hash=str(user.password_hash)):
+    user_id = user.id
+    valid, new_hash = await password_hasher.verify(login_user.password, str(user.password_hash))
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    if new_hash is not None:
+        await run_in_threadpool(_update_password_hash, db, user_id, new_hash)
+
+    return _issue_tokens(user_id)
 
-    response = TokenResponse(token=jwt_handler.generate_token({"email": user.email, "password": user.password_hash}))
-    return response
\ No newline at end of file
+
+@router.post("/refresh", response_model=TokenResponse)
+@limiter.limit(route_limit("/auth/refresh"))
+def refresh(request: Request, body: RefreshRequest, db: Session = Depends(get_db)) -> TokenResponse:
+    """
+    Выдаёт новую пару access- и refresh-токенов по refresh-токену.
+
+    Аргументы:
+        body (RefreshRequest): Refresh-токен.
+        db (Session): Сессия базы данных.
+
+    Возвращает:
+        TokenResponse: Новые access- и refresh-токены.
+
+    Вызывает исключение:
+        HTTPException: 401, если токен недействителен, уже использован или пользователь удалён.
+
+    Refresh-токен одноразовый: он отзывается в той же транзакции (INSERT ... ON CONFLICT DO NOTHING
+    в revoked_tokens), поэтому повторное или параллельное использование одного токена получает 401,
+    и удаляется из кэша проверенных токенов.
+    """
+    claims = _verify_refresh_token(body.refresh_token)
+    user_id = int(claims["sub"])
+    if not revoke_token(db, claims, REFRESH_TOKEN):
+        db.rollback()
+        raise HTTPException(status_code=401, detail="Токен отозван")
+    if db.get(User, user_id) is None:
+        db.rollback()
+        raise HTTPException(status_code=401, detail="Токен недействителен")
+    db.commit()
+    token_cache.revoke(body.refresh_token)
+    return _issue_tokens(user_id)
+
+
+@router.post("/logout")
+def logout(
+    body: Optional[RefreshRequest] = None,
+    authorization: str = Header(),
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user)
+) -> dict:
+    """
+    Отзывает текущий access-токен и, если передан, refresh-токен того же пользователя.
+
+    Аргументы:
+        body (RefreshRequest): Refresh-токен (необязательно).
+        authorization (str): Заголовок Authorization с отзываемым access-токеном.
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        dict: Сообщение об успешном выходе.
+
+    Отзыв сразу действует в этом процессе (токены удаляются и из кэша проверенных токенов)
+    и в течение TOKEN_REVOCATION_SYNC_INTERVAL секунд — в остальных.
+    """
+    revoke_token(db, user, ACCESS_TOKEN)
+    if body is not None:
+        claims = _verify_refresh_token(body.refresh_token)
+        if claims["sub"] != user["sub"]:
+            db.rollback()
+            raise HTTPException(status_code=403, detail="Refresh-токен принадлежит другому пользователю")
+        revoke_token(db, claims, REFRESH_TOKEN)
+    db.commit()
+    revocation_list.add(user["jti"], datetime.utcfromtimestamp(user["exp"]))
+    token_cache.revoke(authorization.split(" ")[1])
+    if body is not None:
+        token_cache.revoke(body.refresh_token)
+    return {"message": "Выход выполнен, токены отозваны"}
+
+
+@router.get("/token-cache/stats")
+def token_cache_stats(user: dict = Depends(get_user)) -> dict:
+    """
+    Счётчики кэша проверенных токенов: попадания, промахи, доля попаданий, количество
+    и среднее время проверок подписи.
+
+    Аргументы:
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        dict: Статистика кэша.
+    """
+    return token_cache.stats()
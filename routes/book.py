@@ -1,20 +1,68 @@
-from typing import List
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 
 from utils.dependencies import get_user
-from database.models import Book
+from database.crud import changed_values
+from database.models import Book, BookCopy
 from database.session import get_db
-from database.schemas import BookCreate, BookResponse, BookUpdate
-from utils.rate_limiter import limiter
+from database.schemas import (
+    BookBatchResponse, BookCreate, BookImportResult, BookPage, BookResponse, BookSearchPage, BookUpdate,
+    CatalogFacetsResponse, FacetValue
+)
+from utils.rate_limiter import limiter, route_limit
+from utils.search import search_books
+from utils.cache import CacheBackend, book_cache
+from utils.etag import etag_matches, make_etag, not_modified
+from utils.fields import parse_fields, project
+from utils.facets import apply_facet_deltas, book_deltas, read_facet_total, read_facets
+from utils.idempotency import IdempotentRequest, idempotent_request
+from utils.circulation import after_release, restock_copies
+from utils.streaming import iter_ndjson, iter_request_body
+from utils.book_import import IMPORT_FORMATS, import_books, iter_lines, iter_records
 from config import settings
 
 router = APIRouter(prefix="/book", tags=["book"])
 
+# Поля, доступные для выборки через параметр fields
+BOOK_FIELDS = list(BookResponse.model_fields)
+
+# Колонки книги, от которых зависят фасеты каталога
+FACET_COLUMNS = {"author", "year", "copies"}
+
+
+def add_book(db: Session, book: BookCreate, idempotency: IdempotentRequest) -> dict:
+    """Создаёт книгу и обновляет фасеты, см. create_book."""
+    replay = idempotency.replay(db)
+    if replay is not None:
+        return replay
+    new_book = Book(
+        title=book.title,
+        author=book.author,
+        description=book.description,
+        year=book.year,
+        isbn=book.isbn,
+        copies=book.copies
+    )
+    db.add(new_book)
+    apply_facet_deltas(db, book_deltas(book.author, book.year, book.copies))
+    db.flush()
+
+    return idempotency.commit(db, {"message": "Книга успешно создана", "book_id": new_book.id})
 
 @router.post("/create")
-def create_book(book: BookCreate, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> dict:
+def create_book(
+    book: BookCreate,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user),
+    idempotency: IdempotentRequest = Depends(idempotent_request)
+) -> dict:
     """
     Создание новой книги.
 
@@ -22,78 +70,245 @@ def create_book(book: BookCreate, db: Session = Depends(get_db), user: dict = De
         book (BookCreate): Данные книги.
         db (Session): Сессия базы данных.
         user (dict): Авторизованный пользователь (JWT).
+        idempotency (IdempotentRequest): Заголовок Idempotency-Key (повтор возвращает сохранённый ответ
+            и не создаёт книгу ещё раз).
 
     Возвращает:
         dict: Сообщение об успешном создании.
     """
-    new_book = Book(
-        title=book.title,
-        author=book.author,
-        year=book.year,
-        isbn=book.isbn,
-        copies=book.copies
-    )
-    db.add(new_book)
-    db.commit()
-    db.refresh(new_book)
+    return add_book(db, book, idempotency)
+
+@router.post("/import", response_model=BookImportResult)
+async def import_catalog(
+    request: Request,
+    fmt: Optional[str] = Query(default=None, alias="format", pattern="^(csv|ndjson)$"),
+    batch_size: int = Query(default=settings.BOOK_IMPORT_BATCH_SIZE, ge=1, le=10_000),
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user)
+) -> BookImportResult:
+    """
+    Массовый импорт каталога из тела запроса в формате CSV (с заголовком) или NDJSON.
+
+    Тело читается потоком, строки валидируются через BookCreate и пишутся пачками;
+    книги с уже существующим ISBN обновляются.
+
+    Аргументы:
+        request (Request): Запрос, тело которого содержит файл каталога.
+        fmt (str): Формат тела, csv или ndjson. По умолчанию определяется по Content-Type.
+        batch_size (int): Размер пачки для записи в БД.
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        BookImportResult: Количество обработанных, импортированных и ошибочных строк и отчёты об ошибках.
+    """
+    if fmt is None:
+        content_type = request.headers.get("content-type", "")
+        fmt = next((name for name in IMPORT_FORMATS if name in content_type), None)
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Поддерживаются форматы text/csv и application/x-ndjson")
+
+    def run() -> dict:
+        records = iter_records(iter_lines(iter_request_body(request)), fmt)
+        return import_books(db, records, batch_size=batch_size)
+
+    return BookImportResult(**await run_in_threadpool(run))
+
+def book_etag(book_id: int, updated_at, names: Optional[List[str]] = None) -> str:
+    return make_etag("book", book_id, updated_at, ",".join(names or ()))
+
+def book_columns(names: Optional[List[str]]) -> list:
+    return [Book.__table__.c[name] for name in names] if names else list(Book.__table__.c)
+
+def cache_entry(book: BookResponse, updated_at) -> dict:
+    return {**book.model_dump(), "updated_at": updated_at.isoformat() if updated_at is not None else None}
+
+def load_books(
+    db: Session, ids: str, fields: Optional[str], cache: CacheBackend = book_cache
+) -> Union[BookBatchResponse, JSONResponse]:
+    """Книги по списку id: из кэша и одним запросом для остальных, см. read_books."""
+    book_ids = list(dict.fromkeys(int(book_id) for book_id in ids.split(",")))
+    if len(book_ids) > settings.BOOKS_BATCH_READ_MAX:
+        raise HTTPException(status_code=400, detail=f"Можно запросить не более {settings.BOOKS_BATCH_READ_MAX} книг")
+
+    names = parse_fields(fields, BOOK_FIELDS)
+
+    found = {}
+    for book_id in book_ids:
+        cached = cache.get(book_id)
+        if cached is not None:
+            found[book_id] = project(cached, names) if names else BookResponse(**cached)
+
+    misses = [book_id for book_id in book_ids if book_id not in found]
+    if misses:
+        stmt = select(*book_columns(names)).where(Book.id.in_(misses))
+        for row in db.execute(stmt).mappings():
+            if names:
+                found[row["id"]] = dict(row)
+            else:
+                found[row["id"]] = BookResponse(**row)
+                cache.add(row["id"], cache_entry(found[row["id"]], row["updated_at"]))
+
+    items = [found[book_id] for book_id in book_ids if book_id in found]
+    missing = [book_id for book_id in book_ids if book_id not in found]
+    if names:
+        return JSONResponse(content=jsonable_encoder({"items": items, "missing": missing}))
+    return BookBatchResponse(items=items, missing=missing)
+
+@router.get('/read', response_model=BookBatchResponse)
+def read_books(
+    ids: str = Query(pattern=r"^\d+(,\d+)*$"),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user)
+) -> Union[BookBatchResponse, JSONResponse]:
+    """
+    Получение нескольких книг за один запрос (/book/read?ids=1,2,3).
+
+    Книги из кэша берутся без обращения к БД, остальные загружаются одним запросом WHERE id IN (...).
+
+    Аргументы:
+        ids (str): Идентификаторы книг через запятую.
+        fields (str): Возвращаемые поля через запятую (id добавляется всегда). По умолчанию все.
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        BookBatchResponse: Найденные книги в порядке запроса и список ненайденных id.
+    """
+    return load_books(db, ids, fields)
+
+def load_book(
+    db: Session, book_id: int, if_none_match: Optional[str], response: Response, fields: Optional[str],
+    cache: CacheBackend = book_cache
+) -> Union[BookResponse, Response]:
+    """Книга через кэш с проверкой If-None-Match, см. read_book."""
+    names = parse_fields(fields, BOOK_FIELDS)
+
+    cached = cache.get(book_id)
+    if cached is not None:
+        etag = book_etag(book_id, cached["updated_at"], names)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        if names:
+            return JSONResponse(content=jsonable_encoder(project(cached, names)), headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return BookResponse(**cached)
+
+    if if_none_match:
+        # Проверяем версию по одной узкой колонке, не загружая строку целиком
+        updated_at = db.query(Book.updated_at).filter(Book.id == book_id).scalar()
+        if updated_at is not None and etag_matches(if_none_match, book_etag(book_id, updated_at, names)):
+            return not_modified(book_etag(book_id, updated_at, names))
 
-    return {"message": "Книга успешно создана", "book_id": new_book.id}
+    if names:
+        # Частичная выборка: в SQL запрашиваются только нужные колонки, в кэш не кладётся
+        row = db.query(*book_columns(names), Book.updated_at).filter(Book.id == book_id).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Книга не найдена")
+        etag = book_etag(book_id, row.updated_at, names)
+        return JSONResponse(content=jsonable_encoder(project(row._mapping, names)), headers={"ETag": etag})
+
+    book = db.query(Book).filter(Book.id == book_id).first()
+    if book is None:
+        raise HTTPException(status_code=404, detail="Книга не найдена")
+    book_response = BookResponse(**{**book.__dict__})
+    entry = cache_entry(book_response, book.updated_at)
+    # add, а не set: строка могла устареть, пока update_book кладёт в кэш более свежую версию
+    cache.add(book_id, entry)
+    response.headers["ETag"] = book_etag(book_id, entry["updated_at"])
+    return book_response
 
 @router.get('/read/{book_id}', response_model=BookResponse)
-def read_book(book_id: int, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> BookResponse:
+def read_book(
+    book_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user)
+) -> Union[BookResponse, Response]:
     """
     Получение информации о книге.
 
+    Поддерживает условный GET: ответ содержит ETag, при совпадении If-None-Match
+    возвращается 304 без загрузки и сериализации книги.
+
     Аргументы:
         book_id (int): Идентификатор книги.
+        request (Request): Входящий запрос (заголовок If-None-Match).
+        response (Response): Ответ, в который добавляется ETag.
+        fields (str): Возвращаемые поля через запятую (id добавляется всегда). По умолчанию все.
         db (Session): Сессия базы данных.
         user (dict): Авторизованный пользователь (JWT).
 
     Возвращает:
         dict: Информация о книге.
     """
-    book = db.query(Book).filter(Book.id == book_id).first()
-    if book is None:
+    return load_book(db, book_id, request.headers.get("if-none-match"), response, fields)
+
+def change_book(db: Session, book_id: int, book: BookUpdate, cache: CacheBackend = book_cache) -> dict:
+    """Обновляет книгу, фасеты и экземпляры в одной транзакции, см. update_book."""
+    values = changed_values(book, Book.__table__)
+    old = None
+    if FACET_COLUMNS & values.keys():
+        # Для пересчёта фасетов нужна прежняя версия книги; запрос только при изменении автора, года или экземпляров
+        old = db.execute(
+            select(Book.author, Book.year, Book.copies).where(Book.id == book_id).with_for_update()
+        ).first()
+        if old is None:
+            raise HTTPException(status_code=404, detail="Книга не найдена")
+    if values:
+        stmt = update(Book.__table__).where(Book.id == book_id).values(**values).returning(*Book.__table__.c)
+    else:
+        stmt = select(Book.__table__).where(Book.id == book_id)
+    row = db.execute(stmt).mappings().first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Книга не найдена")
-    return BookResponse(**{**book.__dict__})
+    if old is not None:
+        deltas = book_deltas(old.author, old.year, old.copies, sign=-1)
+        apply_facet_deltas(db, book_deltas(row["author"], row["year"], row["copies"], deltas=deltas))
+    handed = restock_copies(db, {book_id: values["copies"]}) if "copies" in values else []
+    db.commit()
+    cache.set(book_id, cache_entry(BookResponse(**row), row["updated_at"]))
+    if handed:
+        # Новые экземпляры отложены для очереди броней: copies книги пересчитается по доступным
+        after_release([book_id], handed)
+    return {"message": "Книга успешно обновлена"}
 
 @router.put('/update/{book_id}')
 def update_book(book_id: int, book: BookUpdate, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> dict:
     """
-    Обновление информации о книге.
+    Обновление информации о книге одним запросом UPDATE ... RETURNING по переданным полям.
 
     Аргументы:
         book_id (int): Идентификатор книги.
-        book (BookCreate): Данные книги.
+        book (BookUpdate): Данные книги.
         db (Session): Сессия базы данных.
         user (dict): Авторизованный пользователь (JWT).
 
     Возвращает:
         dict: Сообщение об успешном обновлении.
     """
-    db_book = db.query(Book).filter(Book.id == book_id).first()
-    if db_book is None:
-        raise HTTPException(status_code=404, detail="Книга не найдена")
+    return change_book(db, book_id, book)
 
-    if book.title is not None:
-        db_book.title = book.title # type: ignore
-    if book.author is not None:
-        db_book.author = book.author # type: ignore
-    if book.description is not None:
-        db_book.description = book.description # type: ignore
-    if book.year is not None:
-        db_book.year = book.year # type: ignore
-    if book.isbn is not None:
-        db_book.isbn = book.isbn # type: ignore
-    if book.copies is not None:
-        db_book.copies = book.copies # type: ignore
+def remove_book(db: Session, book_id: int, cache: CacheBackend = book_cache) -> dict:
+    """Удаляет книгу с экземплярами и вычитает её из фасетов, см. delete_book."""
+    db.execute(delete(BookCopy.__table__).where(BookCopy.book_id == book_id))
+    deleted = db.execute(
+        delete(Book.__table__).where(Book.id == book_id).returning(Book.author, Book.year, Book.copies)
+    ).first()
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Книга не найдена")
+    apply_facet_deltas(db, book_deltas(deleted.author, deleted.year, deleted.copies, sign=-1))
     db.commit()
-    return {"message": "Книга успешно обновлена"}
+    cache.delete(book_id)
+    return {"message": "Книга успешно удалена"}
 
 @router.delete('/delete/{book_id}')
 def delete_book(book_id: int, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> dict:
     """
-    Удаление книги.
+    Удаление книги и её экземпляров запросами DELETE ... RETURNING.
 
     Аргументы:
         book_id (int): Идентификатор книги.
@@ -103,25 +318,156 @@ def delete_book(book_id: int, db: Session = Depends(get_db), user: dict = Depend
     Возвращает:
         dict: Сообщение об успешном удалении.
     """
-    db_book = db.query(Book).filter(Book.id == book_id).first()
-    if db_book is None:
-        raise HTTPException(status_code=404, detail="Книга не найдена")
-    db.delete(db_book)
-    db.commit()
-    return {"message": "Книга успешно удалена"}
+    return remove_book(db, book_id)
 
-@router.get('/all')
-@limiter.limit(f"{settings.RATE_LIMITER}/minute")
-def get_books(request: Request, db: Session = Depends(get_db)) -> List[BookResponse]:
+@router.get('/cache/stats')
+def cache_stats(user: dict = Depends(get_user)) -> dict:
     """
-    Получение списка всех книг.
+    Счётчики кэша книг (попадания, промахи, вытеснения) для подбора его размера.
 
     Аргументы:
-        db (Session): Сессия базы данных.
         user (dict): Авторизованный пользователь (JWT).
 
     Возвращает:
-        List[BookResponse]: Список книг.
+        dict: Статистика кэша.
+    """
+    return book_cache.stats()
+
+def catalog_facets(db: Session, limit: int) -> CatalogFacetsResponse:
+    """Фасеты каталога из catalog_facets, см. facets."""
+    return CatalogFacetsResponse(
+        total=FacetValue.model_validate(read_facet_total(db)),
+        authors=[FacetValue.model_validate(row) for row in read_facets(db, "author", limit)],
+        decades=[FacetValue.model_validate(row) for row in read_facets(db, "decade", limit)]
+    )
+
+@router.get('/facets', response_model=CatalogFacetsResponse)
+@limiter.limit(route_limit("/book/facets"))
+def facets(
+    request: Request,
+    limit: int = Query(default=settings.FACETS_LIMIT, ge=1, le=1000),
+    db: Session = Depends(get_db)
+) -> CatalogFacetsResponse:
+    """
+    Фасеты каталога: итоги по каталогу, авторы и десятилетия издания с количеством книг,
+    экземпляров и книг в наличии.
+
+    Читаются предрассчитанные агрегаты catalog_facets, стоимость не зависит от размера каталога.
+
+    Аргументы:
+        limit (int): Максимальное количество значений каждого фасета.
+        db (Session): Сессия базы данных.
+
+    Возвращает:
+        CatalogFacetsResponse: Фасеты каталога.
+    """
+    return catalog_facets(db, limit)
+
+def books_statement(names: Optional[List[str]], after: Optional[int]) -> Select:
+    """Запрос книг после курсора after по возрастанию id (только колонки names, если заданы)."""
+    stmt = select(*book_columns(names)).order_by(Book.id)
+    if after is not None:
+        stmt = stmt.where(Book.id > after)
+    return stmt
+
+def books_page(
+    db: Session, stmt: Select, names: Optional[List[str]], fields: Optional[str], limit: int, after: Optional[int],
+    if_none_match: Optional[str], response: Response
+) -> Union[BookPage, Response]:
+    """Страница books_statement с ETag и ответом 304 по If-None-Match, см. get_books."""
+    if if_none_match:
+        window = select(Book.id, Book.updated_at).order_by(Book.id).limit(limit + 1)
+        if after is not None:
+            window = window.where(Book.id > after)
+        window = window.subquery()
+        count, last_modified, last_id = db.execute(
+            select(func.count(), func.max(window.c.updated_at), func.max(window.c.id))
+        ).one()
+        etag = make_etag("books", after, limit, fields, count, last_modified, last_id)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    if names and "updated_at" not in names:
+        # updated_at нужен для ETag страницы, в ответ не попадает
+        stmt = stmt.add_columns(Book.updated_at)
+    rows = db.execute(stmt.limit(limit + 1)).mappings().all()
+    etag = make_etag(
+        "books", after, limit, fields, len(rows),
+        max((row["updated_at"] for row in rows), default=None),
+        rows[-1]["id"] if rows else None
+    )
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    if names:
+        content = {"items": [project(row, names) for row in rows[:limit]], "next_cursor": next_cursor}
+        return JSONResponse(content=jsonable_encoder(content), headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return BookPage(items=[BookResponse(**row) for row in rows[:limit]], next_cursor=next_cursor)
+
+def search_page(db: Session, q: str, limit: int, offset: int, fields: Optional[str]) -> Union[BookSearchPage, JSONResponse]:
+    """Страница ранжированного поиска, см. search."""
+    names = parse_fields(fields, BOOK_FIELDS)
+    rows = search_books(db, q, limit=limit + 1, offset=offset, columns=names or BOOK_FIELDS)
+    next_offset = offset + limit if len(rows) > limit else None
+    if names:
+        content = {"items": [dict(row) for row in rows[:limit]], "next_offset": next_offset}
+        return JSONResponse(content=jsonable_encoder(content))
+    return BookSearchPage(items=[BookResponse(**row) for row in rows[:limit]], next_offset=next_offset)
+
+@router.get('/all', response_model=BookPage)
+@limiter.limit(route_limit("/book/all"))
+def get_books(
+    request: Request,
+    response: Response,
+    limit: int = Query(default=settings.BOOKS_PAGE_SIZE, ge=1, le=settings.BOOKS_MAX_PAGE_SIZE),
+    after: Optional[int] = Query(default=None, ge=0),
+    stream: bool = False,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+) -> Union[BookPage, Response]:
+    """
+    Получение списка книг с курсорной (keyset) пагинацией по Book.id.
+
+    Страница отдаётся с ETag; при совпадении If-None-Match возвращается 304 — версия страницы
+    проверяется агрегатом по узким колонкам id и updated_at, сами строки не загружаются.
+
+    Аргументы:
+        limit (int): Размер страницы.
+        after (int): Курсор — id последней книги предыдущей страницы.
+        stream (bool): Потоковая выдача всего каталога (начиная с after) в формате NDJSON, limit не применяется.
+        fields (str): Возвращаемые поля через запятую (id добавляется всегда). По умолчанию все.
+        db (Session): Сессия базы данных.
+
+    Возвращает:
+        BookPage: Страница книг и курсор следующей страницы (None, если страница последняя).
+    """
+    names = parse_fields(fields, BOOK_FIELDS)
+    stmt = books_statement(names, after)
+    if stream:
+        return StreamingResponse(iter_ndjson(db.get_bind(), stmt), media_type="application/x-ndjson")
+    return books_page(db, stmt, names, fields, limit, after, request.headers.get("if-none-match"), response)
+
+
+@router.get('/search', response_model=BookSearchPage)
+@limiter.limit(route_limit("/book/search"))
+def search(
+    request: Request,
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=settings.SEARCH_PAGE_SIZE, ge=1, le=settings.SEARCH_MAX_PAGE_SIZE),
+    offset: int = Query(default=0, ge=0),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+) -> Union[BookSearchPage, JSONResponse]:
+    """
+    Ранжированный поиск книг по названию, автору и описанию (полнотекстовый, по префиксу и нечёткий).
+
+    Аргументы:
+        q (str): Строка поиска.
+        limit (int): Размер страницы.
+        offset (int): Смещение от начала выдачи.
+        fields (str): Возвращаемые поля через запятую (id добавляется всегда). По умолчанию все.
+        db (Session): Сессия базы данных.
+
+    Возвращает:
+        BookSearchPage: Найденные книги и смещение следующей страницы (None, если страница последняя).
     """
-    books = db.query(Book).all()
-    return [BookResponse(**book.__dict__) for book in books]
\ No newline at end of file
+    return search_page(db, q, limit, offset, fields)
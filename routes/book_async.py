@@ -0,0 +1,202 @@
+from typing import Optional, Union
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from utils.dependencies import get_user
+from database.session import get_async_db
+from database.schemas import (
+    BookBatchResponse, BookCreate, BookPage, BookResponse, BookSearchPage, BookUpdate, CatalogFacetsResponse
+)
+from routes.book import (
+    BOOK_FIELDS, add_book, books_page, books_statement, catalog_facets, change_book, load_book, load_books, remove_book,
+    search_page
+)
+from utils.rate_limiter import limiter, route_limit
+from utils.cache import async_book_cache
+from utils.fields import parse_fields
+from utils.idempotency import IdempotentRequest, idempotent_request
+from utils.streaming import aiter_ndjson
+from config import settings
+
+# Асинхронные версии маршрутов routes/book.py (DB_ASYNC): те же функции, выполняемые через AsyncSession.run_sync
+# (без потоков, поверх асинхронного драйвера); кэш книг — async_book_cache, чтобы обращения к Redis
+# не блокировали event loop. Импорт каталога и статистика кэша остаются синхронными
+router = APIRouter(prefix="/book", tags=["book"])
+
+@router.post("/create")
+async def create_book(
+    book: BookCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user: dict = Depends(get_user),
+    idempotency: IdempotentRequest = Depends(idempotent_request)
+) -> dict:
+    """
+    Создание новой книги (асинхронная версия book.create_book).
+
+    Аргументы:
+        book (BookCreate): Данные книги.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+        idempotency (IdempotentRequest): Заголовок Idempotency-Key (повтор возвращает сохранённый ответ
+            и не создаёт книгу ещё раз).
+
+    Возвращает:
+        dict: Сообщение об успешном создании.
+    """
+    return await db.run_sync(add_book, book, idempotency)
+
+@router.get('/read', response_model=BookBatchResponse)
+async def read_books(
+    ids: str = Query(pattern=r"^\d+(,\d+)*$"),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    user: dict = Depends(get_user)
+) -> Union[BookBatchResponse, JSONResponse]:
+    """
+    Получение нескольких книг за один запрос (асинхронная версия book.read_books).
+
+    Аргументы:
+        ids (str): Идентификаторы книг через запятую.
+        fields (str): Возвращаемые поля через запятую (id добавляется всегда). По умолчанию все.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        BookBatchResponse: Найденные книги в порядке запроса и список ненайденных id.
+    """
+    return await db.run_sync(load_books, ids, fields, async_book_cache)
+
+@router.get('/read/{book_id}', response_model=BookResponse)
+async def read_book(
+    book_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    user: dict = Depends(get_user)
+) -> Union[BookResponse, Response]:
+    """
+    Получение информации о книге с условным GET по ETag (асинхронная версия book.read_book).
+
+    Аргументы:
+        book_id (int): Идентификатор книги.
+        request (Request): Входящий запрос (заголовок If-None-Match).
+        response (Response): Ответ, в который добавляется ETag.
+        fields (str): Возвращаемые поля через запятую (id добавляется всегда). По умолчанию все.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        dict: Информация о книге.
+    """
+    return await db.run_sync(
+        load_book, book_id, request.headers.get("if-none-match"), response, fields, async_book_cache
+    )
+
+@router.put('/update/{book_id}')
+async def update_book(book_id: int, book: BookUpdate, db: AsyncSession = Depends(get_async_db), user: dict = Depends(get_user)) -> dict:
+    """
+    Обновление информации о книге одним запросом UPDATE ... RETURNING (асинхронная версия book.update_book).
+
+    Аргументы:
+        book_id (int): Идентификатор книги.
+        book (BookUpdate): Данные книги.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        dict: Сообщение об успешном обновлении.
+    """
+    return await db.run_sync(change_book, book_id, book, async_book_cache)
+
+@router.delete('/delete/{book_id}')
+async def delete_book(book_id: int, db: AsyncSession = Depends(get_async_db), user: dict = Depends(get_user)) -> dict:
+    """
+    Удаление книги и её экземпляров запросами DELETE ... RETURNING (асинхронная версия book.delete_book).
+
+    Аргументы:
+        book_id (int): Идентификатор книги.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        dict: Сообщение об успешном удалении.
+    """
+    return await db.run_sync(remove_book, book_id, async_book_cache)
+
+@router.get('/facets', response_model=CatalogFacetsResponse)
+@limiter.limit(route_limit("/book/facets"))
+async def facets(
+    request: Request,
+    limit: int = Query(default=settings.FACETS_LIMIT, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+) -> CatalogFacetsResponse:
+    """
+    Фасеты каталога из предрассчитанных агрегатов (асинхронная версия book.facets).
+
+    Аргументы:
+        limit (int): Максимальное количество значений каждого фасета.
+        db (AsyncSession): Асинхронная сессия базы данных.
+
+    Возвращает:
+        CatalogFacetsResponse: Фасеты каталога.
+    """
+    return await db.run_sync(catalog_facets, limit)
+
+@router.get('/all', response_model=BookPage)
+@limiter.limit(route_limit("/book/all"))
+async def get_books(
+    request: Request,
+    response: Response,
+    limit: int = Query(default=settings.BOOKS_PAGE_SIZE, ge=1, le=settings.BOOKS_MAX_PAGE_SIZE),
+    after: Optional[int] = Query(default=None, ge=0),
+    stream: bool = False,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> Union[BookPage, Response]:
+    """
+    Получение списка книг с курсорной (keyset) пагинацией по Book.id и ETag страницы
+    (асинхронная версия book.get_books).
+
+    Аргументы:
+        limit (int): Размер страницы.
+        after (int): Курсор — id последней книги предыдущей страницы.
+        stream (bool): Потоковая выдача всего каталога (начиная с after) в формате NDJSON, limit не применяется.
+        fields (str): Возвращаемые поля через запятую (id добавляется всегда). По умолчанию все.
+        db (AsyncSession): Асинхронная сессия базы данных.
+
+    Возвращает:
+        BookPage: Страница книг и курсор следующей страницы (None, если страница последняя).
+    """
+    names = parse_fields(fields, BOOK_FIELDS)
+    stmt = books_statement(names, after)
+    if stream:
+        return StreamingResponse(aiter_ndjson(db.bind, stmt), media_type="application/x-ndjson")
+    return await db.run_sync(books_page, stmt, names, fields, limit, after, request.headers.get("if-none-match"), response)
+
+@router.get('/search', response_model=BookSearchPage)
+@limiter.limit(route_limit("/book/search"))
+async def search(
+    request: Request,
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=settings.SEARCH_PAGE_SIZE, ge=1, le=settings.SEARCH_MAX_PAGE_SIZE),
+    offset: int = Query(default=0, ge=0),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> Union[BookSearchPage, JSONResponse]:
+    """
+    Ранжированный поиск книг по названию, автору и описанию (асинхронная версия book.search).
+
+    Аргументы:
+        q (str): Строка поиска.
+        limit (int): Размер страницы.
+        offset (int): Смещение от начала выдачи.
+        fields (str): Возвращаемые поля через запятую (id добавляется всегда). По умолчанию все.
+        db (AsyncSession): Асинхронная сессия базы данных.
+
+    Возвращает:
+        BookSearchPage: Найденные книги и смещение следующей страницы (None, если страница последняя).
+    """
+    return await db.run_sync(search_page, q, limit, offset, fields)
@@ -1,18 +1,95 @@
-from datetime import datetime
-from typing import List
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, case, func, insert, or_, select, tuple_, update
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 
 from utils.dependencies import get_user
-from database.models import BorrowedBooks, Reader, Book
+from database.models import BookCopy, BorrowedBooks, Hold, OverdueLoan, Reader, Book
 from database.session import get_db
-from database.schemas import BorrowCreate, BorrowBookResponse
+from database.schemas import (
+    BorrowBatch, BorrowBatchItemResult, BorrowBatchResult, BorrowCreate, BorrowBookResponse,
+    BorrowHistoryItem, BorrowHistoryPage, OverdueLoanResponse, OverduePage
+)
+from utils.archive import all_loans
+from utils.idempotency import IdempotentRequest, idempotent_request
+from utils.circulation import HOLD_FULFILLED, HOLD_READY, after_release, release_copies
+from utils.inventory import COPY_AVAILABLE, COPY_LOANED, COPY_RESERVED, copies_sync, move_copies
+from config import settings
 
 router = APIRouter(prefix="/borrow", tags=["borrow"])
 
+# Причины отказа в выдаче и возврате (общие для одиночных и пакетных запросов)
+READER_NOT_FOUND = "Читатель не найден"
+BOOK_NOT_FOUND = "Книга не найдена"
+NO_COPIES = "Нет доступных экземпляров книги"
+LIMIT_EXCEEDED = f"Лимит превышен. Читатель не может взять более {settings.MAX_ACTIVE_BORROWS} книг"
+BORROW_NOT_FOUND = "Выдача книги не была найдена"
+
+def loan_period() -> timedelta:
+    """Срок выдачи книги из настроек."""
+    return timedelta(days=settings.LOAN_PERIOD_DAYS)
+
+def borrow_book(db: Session, borrow: BorrowCreate, idempotency: IdempotentRequest) -> dict:
+    """Выдача книги в одной транзакции, см. borrowing."""
+    replay = idempotency.replay(db)
+    if replay is not None:
+        return replay
+    now = datetime.utcnow()
+    # Экземпляр, отложенный для читателя по брони, выдаётся в первую очередь
+    hold = db.execute(
+        update(Hold.__table__)
+        .where(Hold.book_id == borrow.book_id, Hold.reader_id == borrow.reader_id, Hold.status == HOLD_READY)
+        .values(status=HOLD_FULFILLED)
+        .returning(Hold.id)
+    ).first()
+    # Иначе читателю достаётся любой свободный экземпляр, не занятый параллельной выдачей
+    source = COPY_RESERVED if hold else COPY_AVAILABLE
+    claimed = move_copies(db, borrow.book_id, 1, source, COPY_LOANED)
+    if hold is None and not claimed:
+        reader_id, book_id = db.execute(select(
+            select(Reader.id).where(Reader.id == borrow.reader_id).scalar_subquery(),
+            select(Book.id).where(Book.id == borrow.book_id).scalar_subquery()
+        )).one()
+        db.rollback()
+        if reader_id is None:
+            raise HTTPException(status_code=404, detail=READER_NOT_FOUND)
+        if book_id is None:
+            raise HTTPException(status_code=404, detail=BOOK_NOT_FOUND)
+        raise HTTPException(status_code=400, detail=NO_COPIES)
+
+    # Место в лимите занимается условным UPDATE счётчика: проверка O(1) и не зависит от истории выдач
+    reserved = db.execute(
+        update(Reader.__table__)
+        .where(Reader.id == borrow.reader_id, Reader.active_borrows < settings.MAX_ACTIVE_BORROWS)
+        .values(active_borrows=Reader.active_borrows + 1, updated_at=Reader.updated_at)
+        .returning(Reader.id)
+    ).first()
+    if reserved is None:
+        reader_id = db.execute(select(Reader.id).where(Reader.id == borrow.reader_id)).scalar()
+        # Откат возвращает списанный экземпляр
+        db.rollback()
+        if reader_id is None:
+            raise HTTPException(status_code=404, detail=READER_NOT_FOUND)
+        raise HTTPException(status_code=400, detail=LIMIT_EXCEEDED)
+    db.execute(insert(BorrowedBooks.__table__).values(
+        book_id=borrow.book_id, reader_id=borrow.reader_id, borrow_date=now, due_date=now + loan_period()
+    ))
+    response = idempotency.commit(db, {"message": "Книга успешно выдана"})
+    if hold is None:
+        copies_sync.mark([borrow.book_id])
+    return response
+
 @router.post("/")
-def borrowing(borrow: BorrowCreate, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> dict:
+def borrowing(
+    borrow: BorrowCreate,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user),
+    idempotency: IdempotentRequest = Depends(idempotent_request)
+) -> dict:
     """
     Выдача книги читателю.
 
@@ -20,28 +97,54 @@ def borrowing(borrow: BorrowCreate, db: Session = Depends(get_db), user: dict =
         borrow (BorrowCreate): Данные о выдаче книги.
         db (Session): Сессия базы данных.
         user (dict): Авторизованный пользователь (JWT).
+        idempotency (IdempotentRequest): Заголовок Idempotency-Key (повтор возвращает сохранённый ответ).
 
     Возвращает:
         dict: Сообщение об успешной выдаче книги.
+
+    Выдача выполняется в одной транзакции: получение отложенного по брони экземпляра или свободного
+    экземпляра (строка book_copies, SELECT ... FOR UPDATE SKIP LOCKED), занятие места в лимите читателя
+    (UPDATE счётчика active_borrows с условием) и вставка выдачи. Параллельные выдачи одной книги
+    забирают разные экземпляры и не ждут друг друга на общей строке, выдать больше экземпляров,
+    чем есть, и превысить лимит читателя нельзя. Кэшированное books.copies пересчитывается фоновой задачей.
     """
-    reader = db.query(Reader).filter(Reader.id == borrow.reader_id).first()
-    if reader is None:
-        raise HTTPException(status_code=404, detail="Читатель не найден")
-    book = db.query(Book).filter(Book.id == borrow.book_id).first()
-    if book is None:
-        raise HTTPException(status_code=404, detail="Книга не найдена")
-    if book.copies is None or book.copies == 0:  # type: ignore
-        raise HTTPException(status_code=400, detail="Нет доступных экземпляров книги")
-    if db.query(BorrowedBooks).filter(BorrowedBooks.reader_id == reader.id, BorrowedBooks.return_date == None).count() >= 3:
-        raise HTTPException(status_code=400, detail="Лимит превышен. Читатель не может взять более 3 книг")
-    db_borrow = BorrowedBooks(book_id=book.id, reader_id=reader.id)
-    db.add(db_borrow)
-    book.copies -= 1  # type: ignore
-    db.commit()
-    return {"message": "Книга успешно выдана"}
+    return borrow_book(db, borrow, idempotency)
+
+def return_book(db: Session, borrow: BorrowCreate, idempotency: IdempotentRequest) -> dict:
+    """Возврат книги в одной транзакции, см. returning."""
+    replay = idempotency.replay(db)
+    if replay is not None:
+        return replay
+    # Выдача закрывается условным UPDATE: повторный или параллельный возврат не найдёт открытую выдачу
+    open_borrow = select(BorrowedBooks.id).where(
+        BorrowedBooks.book_id == borrow.book_id,
+        BorrowedBooks.reader_id == borrow.reader_id,
+        BorrowedBooks.return_date.is_(None)
+    ).order_by(BorrowedBooks.borrow_date).limit(1).scalar_subquery()
+    closed = db.execute(
+        update(BorrowedBooks.__table__)
+        .where(BorrowedBooks.id == open_borrow, BorrowedBooks.return_date.is_(None))
+        .values(return_date=datetime.utcnow())
+        .returning(BorrowedBooks.id)
+    ).first()
+    if closed is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=BORROW_NOT_FOUND)
+
+    # Экземпляр отдаётся первому в очереди броней, если она есть, иначе становится доступным
+    handed = release_copies(db, {borrow.book_id: 1})
+    change_active_borrows(db, {borrow.reader_id: -1})
+    response = idempotency.commit(db, {"message": "Книга успешно возвращена"})
+    after_release([borrow.book_id], handed)
+    return response
 
 @router.post("/return")
-def returning(borrow: BorrowCreate, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> dict:
+def returning(
+    borrow: BorrowCreate,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user),
+    idempotency: IdempotentRequest = Depends(idempotent_request)
+) -> dict:
     """
     Возврат книги читателю.
 
@@ -49,30 +152,295 @@ def returning(borrow: BorrowCreate, db: Session = Depends(get_db), user: dict =
         borrow (BorrowCreate): Данные о возврате книги.
         db (Session): Сессия базы данных.
         user (dict): Авторизованный пользователь (JWT).
+        idempotency (IdempotentRequest): Заголовок Idempotency-Key (повтор возвращает сохранённый ответ).
 
     Возвращает:
         dict: Сообщение об успешном возврате книги.
+
+    Освободившийся экземпляр в той же транзакции откладывается для первого читателя в очереди броней.
     """
-    db_borrow = db.query(BorrowedBooks).filter(
-        BorrowedBooks.book_id == borrow.book_id, 
-        BorrowedBooks.reader_id == borrow.reader_id,
-        BorrowedBooks.return_date == None
-    ).first()
-    
-    if db_borrow is None:
-        raise HTTPException(status_code=404, detail="Выдача книги не была найдена")
-    
-    db_borrow.return_date = datetime.utcnow()  # type: ignore
-    book = db.query(Book).filter(Book.id == borrow.book_id).first()
-    book.copies += 1  # type: ignore
+    return return_book(db, borrow, idempotency)
+
+@router.post("/batch", response_model=BorrowBatchResult)
+def borrowing_batch(batch: BorrowBatch, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> BorrowBatchResult:
+    """
+    Пакетная выдача книг в одной транзакции.
+
+    Готовые брони и читатели пакета блокируются (SELECT ... FOR UPDATE), доступные экземпляры книг подсчитываются,
+    решение по каждой позиции принимается по порядку с учётом предыдущих позиций пакета. Затем экземпляры
+    забираются одним UPDATE на книгу (FOR UPDATE SKIP LOCKED; если часть занята параллельными выдачами,
+    последние позиции книги получают отказ), а все выдачи записываются одним INSERT borrowed_books
+    и одним UPDATE holds и readers.
+
+    Аргументы:
+        batch (BorrowBatch): Пары (reader_id, book_id) и признак атомарности.
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        BorrowBatchResult: Результат по каждой позиции и признак фиксации транзакции.
+    """
+    _check_batch_size(batch)
+    book_ids = sorted({item.book_id for item in batch.items})
+    reader_ids = sorted({item.reader_id for item in batch.items})
+    pairs = sorted({(item.reader_id, item.book_id) for item in batch.items})
+    ready = defaultdict(list)
+    for hold_id, reader_id, book_id in db.execute(
+        select(Hold.id, Hold.reader_id, Hold.book_id)
+        .where(tuple_(Hold.reader_id, Hold.book_id).in_(pairs), Hold.status == HOLD_READY)
+        .order_by(Hold.id)
+        .with_for_update()
+    ).all():
+        ready[(reader_id, book_id)].append(hold_id)
+    copies = dict(db.execute(
+        select(Book.id, func.count(BookCopy.id))
+        .outerjoin(BookCopy, and_(BookCopy.book_id == Book.id, BookCopy.status == COPY_AVAILABLE))
+        .where(Book.id.in_(book_ids))
+        .group_by(Book.id)
+    ).all())
+    slots = {reader_id: settings.MAX_ACTIVE_BORROWS - active for reader_id, active in db.execute(
+        select(Reader.id, Reader.active_borrows).where(Reader.id.in_(reader_ids)).order_by(Reader.id).with_for_update()
+    ).all()}
+
+    results, claims, borrowed, fulfilled, picked_up = [], defaultdict(list), Counter(), [], Counter()
+    for item in batch.items:
+        holds = ready[(item.reader_id, item.book_id)]
+        if item.reader_id not in slots:
+            results.append(_item_result(item, 404, READER_NOT_FOUND))
+        elif item.book_id not in copies:
+            results.append(_item_result(item, 404, BOOK_NOT_FOUND))
+        elif not holds and not copies[item.book_id]:
+            results.append(_item_result(item, 400, NO_COPIES))
+        elif slots[item.reader_id] <= 0:
+            results.append(_item_result(item, 400, LIMIT_EXCEEDED))
+        else:
+            # Отложенный по брони экземпляр выдаётся вместо свободного
+            if holds:
+                fulfilled.append(holds.pop(0))
+                picked_up[item.book_id] += 1
+            else:
+                copies[item.book_id] -= 1
+                claims[item.book_id].append(len(results))
+            slots[item.reader_id] -= 1
+            borrowed[item.reader_id] += 1
+            results.append(_item_result(item, 200, "Книга успешно выдана"))
+
+    for book_id, positions in sorted(claims.items()):
+        claimed = move_copies(db, book_id, len(positions), COPY_AVAILABLE, COPY_LOANED)
+        for position in positions[claimed:]:
+            borrowed[results[position].reader_id] -= 1
+            results[position] = _item_result(batch.items[position], 400, NO_COPIES)
+
+    if not _can_commit(db, batch, results):
+        return _batch_result(False, results)
+
+    now = datetime.utcnow()
+    db.execute(insert(BorrowedBooks), [
+        {"book_id": result.book_id, "reader_id": result.reader_id, "borrow_date": now, "due_date": now + loan_period()}
+        for result in results if result.status_code == 200
+    ])
+    if fulfilled:
+        db.execute(update(Hold.__table__).where(Hold.id.in_(fulfilled)).values(status=HOLD_FULFILLED))
+        for book_id, count in sorted(picked_up.items()):
+            move_copies(db, book_id, count, COPY_RESERVED, COPY_LOANED)
+    change_active_borrows(db, dict(borrowed))
     db.commit()
-    return {"message": "Книга успешно возвращена"}
+    copies_sync.mark(claims)
+    return _batch_result(True, results)
+
+@router.post("/return/batch", response_model=BorrowBatchResult)
+def returning_batch(batch: BorrowBatch, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> BorrowBatchResult:
+    """
+    Пакетный возврат книг в одной транзакции.
+
+    Открытые выдачи всех пар пакета блокируются одним запросом, затем закрываются одним UPDATE
+    borrowed_books, а экземпляры откладываются для очередей броней или становятся доступными.
+
+    Аргументы:
+        batch (BorrowBatch): Пары (reader_id, book_id) и признак атомарности.
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        BorrowBatchResult: Результат по каждой позиции и признак фиксации транзакции.
+    """
+    _check_batch_size(batch)
+    pairs = sorted({(item.reader_id, item.book_id) for item in batch.items})
+    open_borrows = defaultdict(list)
+    for borrow_id, reader_id, book_id in db.execute(
+        select(BorrowedBooks.id, BorrowedBooks.reader_id, BorrowedBooks.book_id)
+        .where(tuple_(BorrowedBooks.reader_id, BorrowedBooks.book_id).in_(pairs), BorrowedBooks.return_date.is_(None))
+        .order_by(BorrowedBooks.borrow_date, BorrowedBooks.id)
+        .with_for_update()
+    ).all():
+        open_borrows[(reader_id, book_id)].append(borrow_id)
+
+    results, closed, returned, readers = [], [], Counter(), Counter()
+    for item in batch.items:
+        # Одинаковые пары в пакете закрывают разные выдачи, начиная с самой ранней
+        borrows = open_borrows[(item.reader_id, item.book_id)]
+        if not borrows:
+            results.append(_item_result(item, 404, BORROW_NOT_FOUND))
+            continue
+        closed.append(borrows.pop(0))
+        returned[item.book_id] += 1
+        readers[item.reader_id] -= 1
+        results.append(_item_result(item, 200, "Книга успешно возвращена"))
+
+    if not _can_commit(db, batch, results):
+        return _batch_result(False, results)
+
+    db.execute(
+        update(BorrowedBooks.__table__)
+        .where(BorrowedBooks.id.in_(closed), BorrowedBooks.return_date.is_(None))
+        .values(return_date=datetime.utcnow())
+    )
+    handed = release_copies(db, dict(returned))
+    change_active_borrows(db, dict(readers))
+    db.commit()
+    after_release(returned, handed)
+    return _batch_result(True, results)
+
+def _check_batch_size(batch: BorrowBatch) -> None:
+    if len(batch.items) > settings.BORROW_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"В пакете может быть не более {settings.BORROW_BATCH_MAX} позиций")
+
+def _item_result(item: BorrowCreate, status_code: int, detail: str) -> BorrowBatchItemResult:
+    return BorrowBatchItemResult(reader_id=item.reader_id, book_id=item.book_id, status_code=status_code, detail=detail)
+
+def _can_commit(db: Session, batch: BorrowBatch, results: List[BorrowBatchItemResult]) -> bool:
+    """
+    Проверяет, можно ли записывать пакет: есть успешные позиции и, для атомарного пакета, нет ошибок.
+    Иначе снимает блокировки откатом, а успешные позиции атомарного пакета помечает отменёнными.
+    """
+    failed = any(result.status_code != 200 for result in results)
+    if any(result.status_code == 200 for result in results) and not (batch.atomic and failed):
+        return True
+    db.rollback()
+    for result in results:
+        if result.status_code == 200:
+            result.status_code, result.detail = 409, "Пакет отменён: в нём есть позиции с ошибками"
+    return False
+
+def change_active_borrows(db: Session, changes: Dict[int, int]) -> None:
+    """Меняет счётчики невозвращённых книг нескольких читателей одним UPDATE."""
+    db.execute(
+        update(Reader.__table__)
+        .where(Reader.id.in_(list(changes)))
+        # Счётчик выдач не меняет данные читателя, updated_at (инкрементальная выгрузка) не трогаем
+        .values(active_borrows=Reader.active_borrows + case(changes, value=Reader.id, else_=0), updated_at=Reader.updated_at)
+    )
+
+def _batch_result(committed: bool, results: List[BorrowBatchItemResult]) -> BorrowBatchResult:
+    succeeded = sum(1 for result in results if result.status_code == 200)
+    return BorrowBatchResult(committed=committed, succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+def overdue_statement(active: bool, limit: int, after: Optional[int]) -> Select:
+    """Запрос страницы просроченных выдач (limit + 1 строк, лишняя строка — признак следующей страницы)."""
+    # Открытые выдачи всегда в borrowed_books; возвращённые могут быть уже в архиве
+    loans = BorrowedBooks.__table__ if active else all_loans()
+    stmt = (
+        select(
+            OverdueLoan.borrow_id, OverdueLoan.book_id, OverdueLoan.reader_id, Book.title,
+            OverdueLoan.due_date, OverdueLoan.detected_at, loans.c.return_date
+        )
+        .join(loans, loans.c.id == OverdueLoan.borrow_id)
+        .join(Book, Book.id == OverdueLoan.book_id)
+        .order_by(OverdueLoan.borrow_id)
+        .limit(limit + 1)
+    )
+    if active:
+        stmt = stmt.where(loans.c.return_date.is_(None))
+    if after is not None:
+        stmt = stmt.where(OverdueLoan.borrow_id > after)
+    return stmt
+
+def overdue_page(rows: list, limit: int) -> OverduePage:
+    """Страница просроченных выдач из строк overdue_statement."""
+    next_cursor = rows[limit - 1]["borrow_id"] if len(rows) > limit else None
+    return OverduePage(items=[OverdueLoanResponse(**row) for row in rows[:limit]], next_cursor=next_cursor)
+
+def open_borrows_statement(reader_id: int) -> Select:
+    """Запрос невозвращённых книг читателя."""
+    return (
+        select(Book.id, Book.title, Book.author, Book.description, Book.year, Book.isbn, BorrowedBooks.borrow_date)
+        .join(Book, Book.id == BorrowedBooks.book_id)
+        .where(BorrowedBooks.reader_id == reader_id, BorrowedBooks.return_date.is_(None))
+        .order_by(BorrowedBooks.borrow_date)
+    )
+
+def history_statement(
+    reader_id: int,
+    status: str,
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    limit: int,
+    before: Optional[int]
+) -> Select:
+    """Запрос страницы истории выдач читателя (limit + 1 строк, лишняя строка — признак следующей страницы)."""
+    loans = all_loans(reader_id)
+    stmt = (
+        select(
+            loans.c.id, loans.c.book_id, Book.title, Book.author,
+            loans.c.borrow_date, loans.c.due_date, loans.c.return_date
+        )
+        .join(Book, Book.id == loans.c.book_id)
+        .order_by(loans.c.borrow_date.desc(), loans.c.id.desc())
+        .limit(limit + 1)
+    )
+    if status == "active":
+        stmt = stmt.where(loans.c.return_date.is_(None))
+    elif status == "returned":
+        stmt = stmt.where(loans.c.return_date.is_not(None))
+    if date_from is not None:
+        stmt = stmt.where(loans.c.borrow_date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(loans.c.borrow_date < date_to)
+    if before is not None:
+        # Позиция курсора (borrow_date, id) берётся подзапросом в том же запросе
+        cursor_loans = all_loans(reader_id)
+        cursor_date = select(cursor_loans.c.borrow_date).where(cursor_loans.c.id == before).scalar_subquery()
+        stmt = stmt.where(or_(
+            loans.c.borrow_date < cursor_date,
+            and_(loans.c.borrow_date == cursor_date, loans.c.id < before)
+        ))
+    return stmt
+
+def history_page(rows: list, limit: int) -> BorrowHistoryPage:
+    """Страница истории выдач из строк history_statement."""
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    return BorrowHistoryPage(items=[BorrowHistoryItem(**row) for row in rows[:limit]], next_cursor=next_cursor)
+
+@router.get("/overdue", response_model=OverduePage)
+def overdue(
+    active: bool = True,
+    limit: int = Query(default=settings.OVERDUE_PAGE_SIZE, ge=1, le=settings.OVERDUE_MAX_PAGE_SIZE),
+    after: Optional[int] = Query(default=None, ge=0),
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user)
+) -> OverduePage:
+    """
+    Просроченные выдачи, найденные фоновой задачей, с курсорной (keyset) пагинацией по id выдачи.
+
+    Аргументы:
+        active (bool): Только ещё не возвращённые книги (по умолчанию) или все найденные просрочки.
+        limit (int): Размер страницы.
+        after (int): Курсор — id последней выдачи предыдущей страницы.
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        OverduePage: Страница просроченных выдач и курсор следующей страницы (None, если страница последняя).
+    """
+    return overdue_page(db.execute(overdue_statement(active, limit, after)).mappings().all(), limit)
 
 @router.get("/{reader_id}/borrows", response_model=List[BorrowBookResponse])
 def my_borrows(reader_id: int, db: Session = Depends(get_db)) -> List[BorrowBookResponse]:
     """
     Получение списка всех книг, выданных авторизованному читателю (и еще не возвращенных).
 
+    Выдачи и книги читаются одним запросом с JOIN по индексу (reader_id, return_date, borrow_date).
+
     Аргументы:
         reader_id (int): Идентификатор читателя.
         db (Session): Сессия базы данных.
@@ -80,24 +448,39 @@ def my_borrows(reader_id: int, db: Session = Depends(get_db)) -> List[BorrowBook
     Возвращает:
         List[BorrowBookResponse]: Список выданных книг.
     """
-    borrowed_books = db.query(BorrowedBooks).filter(
-        BorrowedBooks.reader_id == reader_id,
-        BorrowedBooks.return_date == None
-    ).all()
-    
-    books = []
-    for borrowed_book in borrowed_books:
-        book = db.query(Book).filter(Book.id == borrowed_book.book_id).first()
-        if book is not None:
-            books.append(BorrowBookResponse(
-                id=book.id,  # type: ignore
-                title=book.title,  # type: ignore
-                author=book.author,  # type: ignore
-                description=book.description,  # type: ignore
-                year=book.year,  # type: ignore
-                isbn=book.isbn,  # type: ignore
-                borrow_date=borrowed_book.borrow_date.strftime("%Y-%m-%d %H:%M:%S")
-            ))
-    
-    return books
+    rows = db.execute(open_borrows_statement(reader_id)).mappings()
+    return [BorrowBookResponse.model_validate(row) for row in rows]
+
+@router.get("/{reader_id}/history", response_model=BorrowHistoryPage)
+def borrow_history(
+    reader_id: int,
+    status: Literal["all", "active", "returned"] = "all",
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = Query(default=settings.BORROW_HISTORY_PAGE_SIZE, ge=1, le=settings.BORROW_HISTORY_MAX_PAGE_SIZE),
+    before: Optional[int] = Query(default=None, ge=0),
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user)
+) -> BorrowHistoryPage:
+    """
+    История выдач читателя (активные и возвращённые) от новых к старым с курсорной (keyset) пагинацией.
+
+    Страница читается одним запросом из текущих и архивных выдач (UNION ALL с фильтром по читателю
+    в каждой ветке, по индексам обеих таблиц); стоимость не зависит от номера страницы и общего
+    количества выдач читателя.
 
+    Аргументы:
+        reader_id (int): Идентификатор читателя.
+        status (str): all — все выдачи, active — невозвращённые, returned — возвращённые.
+        date_from (datetime): Выдачи не раньше этого момента (включительно).
+        date_to (datetime): Выдачи раньше этого момента (не включительно).
+        limit (int): Размер страницы.
+        before (int): Курсор — id последней выдачи предыдущей страницы.
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        BorrowHistoryPage: Страница выдач и курсор следующей страницы (None, если страница последняя).
+    """
+    rows = db.execute(history_statement(reader_id, status, date_from, date_to, limit, before)).mappings().all()
+    return history_page(rows, limit)
@@ -0,0 +1,129 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from utils.dependencies import get_user
+from database.session import get_async_db
+from database.schemas import BorrowBookResponse, BorrowCreate, BorrowHistoryPage, OverduePage
+from routes.borrow import (
+    borrow_book, history_page, history_statement, open_borrows_statement, overdue_page, overdue_statement, return_book
+)
+from utils.idempotency import IdempotentRequest, idempotent_request
+from config import settings
+
+# Асинхронные версии маршрутов routes/borrow.py (DB_ASYNC). Логика общая с синхронными маршрутами:
+# транзакции выдачи и возврата выполняются через run_sync (без потоков, поверх асинхронного драйвера),
+# чтения — теми же запросами и сборкой страниц через await
+router = APIRouter(prefix="/borrow", tags=["borrow"])
+
+@router.post("/")
+async def borrowing(
+    borrow: BorrowCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user: dict = Depends(get_user),
+    idempotency: IdempotentRequest = Depends(idempotent_request)
+) -> dict:
+    """
+    Выдача книги читателю (асинхронная версия borrow.borrowing).
+
+    Аргументы:
+        borrow (BorrowCreate): Данные о выдаче книги.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+        idempotency (IdempotentRequest): Заголовок Idempotency-Key (повтор возвращает сохранённый ответ).
+
+    Возвращает:
+        dict: Сообщение об успешной выдаче книги.
+    """
+    return await db.run_sync(borrow_book, borrow, idempotency)
+
+@router.post("/return")
+async def returning(
+    borrow: BorrowCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user: dict = Depends(get_user),
+    idempotency: IdempotentRequest = Depends(idempotent_request)
+) -> dict:
+    """
+    Возврат книги читателю (асинхронная версия borrow.returning).
+
+    Аргументы:
+        borrow (BorrowCreate): Данные о возврате книги.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+        idempotency (IdempotentRequest): Заголовок Idempotency-Key (повтор возвращает сохранённый ответ).
+
+    Возвращает:
+        dict: Сообщение об успешном возврате книги.
+    """
+    return await db.run_sync(return_book, borrow, idempotency)
+
+@router.get("/overdue", response_model=OverduePage)
+async def overdue(
+    active: bool = True,
+    limit: int = Query(default=settings.OVERDUE_PAGE_SIZE, ge=1, le=settings.OVERDUE_MAX_PAGE_SIZE),
+    after: Optional[int] = Query(default=None, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+    user: dict = Depends(get_user)
+) -> OverduePage:
+    """
+    Просроченные выдачи с курсорной пагинацией (асинхронная версия borrow.overdue).
+
+    Аргументы:
+        active (bool): Только ещё не возвращённые книги (по умолчанию) или все найденные просрочки.
+        limit (int): Размер страницы.
+        after (int): Курсор — id последней выдачи предыдущей страницы.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        OverduePage: Страница просроченных выдач и курсор следующей страницы (None, если страница последняя).
+    """
+    return overdue_page((await db.execute(overdue_statement(active, limit, after))).mappings().all(), limit)
+
+@router.get("/{reader_id}/borrows", response_model=List[BorrowBookResponse])
+async def my_borrows(reader_id: int, db: AsyncSession = Depends(get_async_db)) -> List[BorrowBookResponse]:
+    """
+    Получение списка книг, выданных читателю и ещё не возвращённых (асинхронная версия borrow.my_borrows).
+
+    Аргументы:
+        reader_id (int): Идентификатор читателя.
+        db (AsyncSession): Асинхронная сессия базы данных.
+
+    Возвращает:
+        List[BorrowBookResponse]: Список выданных книг.
+    """
+    rows = (await db.execute(open_borrows_statement(reader_id))).mappings()
+    return [BorrowBookResponse.model_validate(row) for row in rows]
+
+@router.get("/{reader_id}/history", response_model=BorrowHistoryPage)
+async def borrow_history(
+    reader_id: int,
+    status: Literal["all", "active", "returned"] = "all",
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = Query(default=settings.BORROW_HISTORY_PAGE_SIZE, ge=1, le=settings.BORROW_HISTORY_MAX_PAGE_SIZE),
+    before: Optional[int] = Query(default=None, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+    user: dict = Depends(get_user)
+) -> BorrowHistoryPage:
+    """
+    История выдач читателя с курсорной пагинацией (асинхронная версия borrow.borrow_history).
+
+    Аргументы:
+        reader_id (int): Идентификатор читателя.
+        status (str): all — все выдачи, active — невозвращённые, returned — возвращённые.
+        date_from (datetime): Выдачи не раньше этого момента (включительно).
+        date_to (datetime): Выдачи раньше этого момента (не включительно).
+        limit (int): Размер страницы.
+        before (int): Курсор — id последней выдачи предыдущей страницы.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        BorrowHistoryPage: Страница выдач и курсор следующей страницы (None, если страница последняя).
+    """
+    rows = (await db.execute(history_statement(reader_id, status, date_from, date_to, limit, before))).mappings().all()
+    return history_page(rows, limit)
@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from utils.dependencies import get_user
+from database.models import Book, Reader
+from database.session import get_db
+from utils.archive import all_loans
+from utils.streaming import gzip_stream, iter_csv, iter_ndjson, iter_parquet, pyarrow
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+EXPORT_TABLES = {
+    "books": Book.__table__,
+    "readers": Reader.__table__,
+    # Текущие и архивные выдачи
+    "borrowed_books": all_loans(),
+}
+
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv"),
+    "ndjson": (iter_ndjson, "application/x-ndjson"),
+    "parquet": (iter_parquet, "application/vnd.apache.parquet"),
+}
+
+
+@router.get("/{table}")
+def export_table(
+    table: str = Path(pattern="^(books|readers|borrowed_books)$"),
+    fmt: str = Query(default="ndjson", alias="format", pattern="^(csv|ndjson|parquet)$"),
+    gzip: bool = False,
+    after_id: Optional[int] = Query(default=None, ge=0),
+    before_id: Optional[int] = Query(default=None, ge=0),
+    updated_since: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user)
+) -> StreamingResponse:
+    """
+    Потоковая выгрузка таблицы books, readers или borrowed_books.
+
+    Строки читаются из серверного курсора и отдаются частями (chunked transfer),
+    поэтому расход памяти не зависит от размера таблицы.
+
+    Аргументы:
+        table (str): Имя таблицы.
+        fmt (str): Формат выгрузки: csv, ndjson или parquet (требует pyarrow).
+        gzip (bool): Сжать выгрузку gzip.
+        after_id (int): Выгрузить строки с id больше указанного.
+        before_id (int): Выгрузить строки с id меньше указанного.
+        updated_since (datetime): Выгрузить строки, изменённые начиная с указанного момента
+            (для borrowed_books — выданные или возвращённые).
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        StreamingResponse: Поток выгрузки.
+    """
+    if fmt == "parquet" and pyarrow is None:
+        raise HTTPException(status_code=400, detail="Выгрузка в Parquet недоступна: не установлен pyarrow")
+
+    source = EXPORT_TABLES[table]
+    stmt = select(source).order_by(source.c.id)
+    if after_id is not None:
+        stmt = stmt.where(source.c.id > after_id)
+    if before_id is not None:
+        stmt = stmt.where(source.c.id < before_id)
+    if updated_since is not None:
+        if table == "borrowed_books":
+            stmt = stmt.where(or_(source.c.borrow_date >= updated_since, source.c.return_date >= updated_since))
+        else:
+            stmt = stmt.where(source.c.updated_at >= updated_since)
+
+    writer, media_type = EXPORT_FORMATS[fmt]
+    content = writer(db.get_bind(), stmt)
+    filename = f"{table}.{fmt}"
+    if gzip:
+        content = gzip_stream(content)
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,197 @@
+import asyncio
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import DateTime, String, and_, exists, func, literal, or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from utils.dependencies import get_user
+from database.models import Book, BookCopy, Hold, Reader
+from database.session import get_db
+from database.schemas import HoldCreate, HoldResponse
+from utils.circulation import HOLD_CANCELLED, HOLD_READY, HOLD_WAITING, after_release, hold_notifier, release_copies
+from utils.inventory import COPY_AVAILABLE, COPY_RESERVED
+from routes.borrow import BOOK_NOT_FOUND, READER_NOT_FOUND
+from config import settings
+
+router = APIRouter(prefix="/hold", tags=["hold"])
+
+HOLD_NOT_FOUND = "Бронь не найдена"
+
+
+def _read_hold(db: Session, hold_id: int) -> HoldResponse:
+    """
+    Читает бронь и её место в очереди одним запросом (подсчёт по индексу (book_id, created_at)).
+
+    :param db: сессия базы данных.
+    :param hold_id: идентификатор брони.
+    :return: бронь; position заполнен только для броней в очереди.
+    """
+    ahead = aliased(Hold)
+    position = select(func.count()).select_from(ahead).where(
+        ahead.book_id == Hold.book_id,
+        ahead.status == HOLD_WAITING,
+        or_(ahead.created_at < Hold.created_at, and_(ahead.created_at == Hold.created_at, ahead.id < Hold.id))
+    ).scalar_subquery()
+    row = db.execute(
+        select(
+            Hold.id, Hold.book_id, Hold.reader_id, Hold.status, Hold.created_at, Hold.ready_at, Hold.ready_until,
+            position.label("ahead")
+        )
+        .where(Hold.id == hold_id)
+    ).mappings().first()
+    # Транзакция чтения не держится открытой между проверками ожидания
+    db.rollback()
+    if row is None:
+        raise HTTPException(status_code=404, detail=HOLD_NOT_FOUND)
+    data = dict(row)
+    ahead_count = data.pop("ahead")
+    return HoldResponse(**data, position=ahead_count + 1 if data["status"] == HOLD_WAITING else None)
+
+
+@router.post("/", response_model=HoldResponse)
+def create_hold(hold: HoldCreate, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> HoldResponse:
+    """
+    Постановка читателя в очередь на книгу без доступных экземпляров.
+
+    Бронь вставляется условным INSERT ... SELECT: книга должна существовать и не иметь свободных
+    экземпляров, у читателя не должно быть активной брони этой книги. Перед проверкой строка книги
+    блокируется, чтобы параллельный возврат не разминулся с новой бронью.
+
+    Аргументы:
+        hold (HoldCreate): Читатель и книга.
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        HoldResponse: Созданная бронь и место в очереди.
+    """
+    active = exists().where(
+        Hold.book_id == hold.book_id, Hold.reader_id == hold.reader_id, Hold.status.in_((HOLD_WAITING, HOLD_READY))
+    )
+    available = exists().where(BookCopy.book_id == hold.book_id, BookCopy.status == COPY_AVAILABLE)
+    # Отдельным запросом: проверка ниже выполняется уже после завершения параллельного возврата
+    db.execute(select(Book.id).where(Book.id == hold.book_id).with_for_update())
+    inserted = db.execute(
+        Hold.__table__.insert()
+        .from_select(
+            ["book_id", "reader_id", "status", "created_at"],
+            select(Book.id, Reader.id, literal(HOLD_WAITING, String), literal(datetime.utcnow(), DateTime))
+            .select_from(Book)
+            .join(Reader, Reader.id == hold.reader_id)
+            .where(Book.id == hold.book_id, ~available, ~active)
+        )
+        .returning(Hold.id)
+    ).first()
+    if inserted is None:
+        reader_id, book_id, has_hold = db.execute(select(
+            select(Reader.id).where(Reader.id == hold.reader_id).scalar_subquery(),
+            select(Book.id).where(Book.id == hold.book_id).scalar_subquery(),
+            active
+        )).one()
+        db.rollback()
+        if reader_id is None:
+            raise HTTPException(status_code=404, detail=READER_NOT_FOUND)
+        if book_id is None:
+            raise HTTPException(status_code=404, detail=BOOK_NOT_FOUND)
+        if has_hold:
+            raise HTTPException(status_code=400, detail="Читатель уже стоит в очереди на эту книгу")
+        raise HTTPException(status_code=400, detail="Есть доступные экземпляры, книгу можно взять сразу")
+    db.commit()
+    return _read_hold(db, inserted.id)
+
+
+@router.get("/{hold_id}", response_model=HoldResponse)
+def read_hold(hold_id: int, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> HoldResponse:
+    """
+    Получение брони и места в очереди.
+
+    Аргументы:
+        hold_id (int): Идентификатор брони.
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        HoldResponse: Бронь.
+    """
+    return _read_hold(db, hold_id)
+
+
+@router.get("/{hold_id}/wait", response_model=HoldResponse)
+async def wait_hold(
+    hold_id: int,
+    timeout: float = Query(default=settings.HOLD_WAIT_TIMEOUT, gt=0, le=settings.HOLD_WAIT_MAX_TIMEOUT),
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_user)
+) -> HoldResponse:
+    """
+    Ожидание брони (long-poll): ответ приходит, как только бронь перестаёт быть в очереди
+    (экземпляр отложен для читателя, выдан или бронь отменена), либо по истечении timeout с текущим состоянием.
+
+    Возврат книги в этом процессе будит ожидающий запрос сразу, изменения из других процессов
+    замечаются перепроверкой в БД раз в HOLD_RECHECK_INTERVAL секунд. Клиенту не нужно опрашивать API.
+
+    Аргументы:
+        hold_id (int): Идентификатор брони.
+        timeout (float): Максимальное время ожидания, секунды.
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        HoldResponse: Бронь.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    # Подписка до первой проверки, чтобы не пропустить изменение между проверкой и ожиданием
+    event = hold_notifier.subscribe(hold_id)
+    try:
+        while True:
+            hold = await run_in_threadpool(_read_hold, db, hold_id)
+            remaining = deadline - loop.time()
+            if hold.status != HOLD_WAITING or remaining <= 0:
+                return hold
+            try:
+                await asyncio.wait_for(event.wait(), timeout=min(remaining, settings.HOLD_RECHECK_INTERVAL))
+            except asyncio.TimeoutError:
+                pass
+            event.clear()
+    finally:
+        hold_notifier.unsubscribe(hold_id, event)
+
+
+@router.delete("/{hold_id}")
+def cancel_hold(hold_id: int, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> dict:
+    """
+    Отмена брони. Экземпляр, отложенный по отменённой брони, передаётся следующему в очереди
+    или возвращается в доступные.
+
+    Аргументы:
+        hold_id (int): Идентификатор брони.
+        db (Session): Сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        dict: Сообщение об успешной отмене.
+    """
+    # ready_at заполнен только у броней, для которых был отложен экземпляр
+    cancelled = db.execute(
+        update(Hold.__table__)
+        .where(Hold.id == hold_id, Hold.status.in_((HOLD_WAITING, HOLD_READY)))
+        .values(status=HOLD_CANCELLED)
+        .returning(Hold.book_id, Hold.ready_at)
+    ).first()
+    if cancelled is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=HOLD_NOT_FOUND)
+    if cancelled.ready_at is None:
+        db.commit()
+        hold_notifier.notify(hold_id)
+        return {"message": "Бронь успешно отменена"}
+
+    # Отложенный экземпляр передаётся следующему в очереди или возвращается в доступные
+    handed = release_copies(db, {cancelled.book_id: 1}, source=COPY_RESERVED)
+    db.commit()
+    hold_notifier.notify(hold_id)
+    after_release([cancelled.book_id], handed)
+    return {"message": "Бронь успешно отменена"}
@@ -1,14 +1,36 @@
+from typing import Optional, Union
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from utils.dependencies import get_user
+from database.crud import changed_values
 from database.models import Reader
 from database.session import get_db
 from database.schemas import ReaderCreate, ReaderUpdate
+from utils.fields import parse_fields, project
 
 router = APIRouter(prefix="/reader", tags=["reader"])
 
 
+def add_reader(db: Session, reader: ReaderCreate) -> dict:
+    """Создаёт читателя, см. create_reader."""
+    if db.query(Reader).filter(Reader.email == reader.email).first():
+        raise HTTPException(status_code=400, detail="Email уже существует")
+    new_reader = Reader(
+        name=reader.name,
+        email=reader.email
+    )
+    db.add(new_reader)
+    db.commit()
+    db.refresh(new_reader)
+
+    return {"message": "Читатель успешно создан", "reader_id": new_reader.id}
+
+
 @router.post("/create")
 def create_reader(reader: ReaderCreate, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> dict:
     """Создание нового читателя.
@@ -21,40 +43,61 @@ def create_reader(reader: ReaderCreate, db: Session = Depends(get_db), user: dic
     Возвращает:
         dict: Сообщение об успешном создании.
     """
-    if db.query(Reader).filter(Reader.email == reader.email).first():
-        raise HTTPException(status_code=400, detail="Email уже существует")
-    new_reader = Reader(
-        name=reader.name,
-        email=reader.email
-    )
-    db.add(new_reader)
-    db.commit()
-    db.refresh(new_reader)
+    return add_reader(db, reader)
 
-    return {"message": "Читатель успешно создан", "reader_id": new_reader.id}
+
+def load_reader(db: Session, reader_id: int, fields: Optional[str]) -> Union[ReaderCreate, JSONResponse]:
+    """Читает читателя (все поля или только fields), см. read_reader."""
+    names = parse_fields(fields, ReaderCreate.model_fields, required=())
+    if names:
+        row = db.query(*[Reader.__table__.c[name] for name in names]).filter(Reader.id == reader_id).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Читатель не найден")
+        return JSONResponse(content=project(row._mapping, names))
+
+    reader = db.query(Reader).filter(Reader.id == reader_id).first()
+    if reader is None:
+        raise HTTPException(status_code=404, detail="Читатель не найден")
+    return ReaderCreate(**reader.__dict__)
 
 
 @router.get("/read/{reader_id}", response_model=ReaderCreate)
-def read_reader(reader_id: int, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> ReaderCreate:
+def read_reader(reader_id: int, fields: Optional[str] = None, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> Union[ReaderCreate, JSONResponse]:
     """Получение информации о читателе.
 
     Аргументы:
         reader_id (int): Идентификатор читателя.
+        fields (str): Возвращаемые поля через запятую. По умолчанию все.
         db (Session): Сессия базы данных.
         user (dict): Авторизованный пользователь (JWT).
 
     Возвращает:
         dict: Информация о читателе.
     """
-    reader = db.query(Reader).filter(Reader.id == reader_id).first()
-    if reader is None:
+    return load_reader(db, reader_id, fields)
+
+
+def change_reader(db: Session, reader_id: int, reader: ReaderUpdate) -> dict:
+    """Обновляет переданные поля читателя, см. update_reader."""
+    values = changed_values(reader, Reader.__table__)
+    if values:
+        stmt = update(Reader.__table__).where(Reader.id == reader_id).values(**values).returning(Reader.id)
+    else:
+        stmt = select(Reader.id).where(Reader.id == reader_id)
+    try:
+        row = db.execute(stmt).first()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Email уже существует")
+    if row is None:
         raise HTTPException(status_code=404, detail="Читатель не найден")
-    return ReaderCreate(**reader.__dict__)
+    db.commit()
+    return {"message": "Читатель успешно обновлен"}
 
 
 @router.put("/update/{reader_id}")
 def update_reader(reader_id: int, reader: ReaderUpdate, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> dict:
-    """Обновление информации о читателе.
+    """Обновление информации о читателе одним запросом UPDATE ... RETURNING по переданным полям.
 
     Аргументы:
         reader_id (int): Идентификатор читателя.
@@ -65,22 +108,21 @@ def update_reader(reader_id: int, reader: ReaderUpdate, db: Session = Depends(ge
     Возвращает:
         dict: Сообщение об успешном обновлении.
     """
-    db_reader = db.query(Reader).filter(Reader.id == reader_id).first()
-    if db_reader is None:
-        raise HTTPException(status_code=404, detail="Читатель не найден")
+    return change_reader(db, reader_id, reader)
 
-    if reader.name is not None:
-        db_reader.name = reader.name  # type: ignore
-    if reader.email is not None:
-        db_reader.email = reader.email  # type: ignore
 
+def remove_reader(db: Session, reader_id: int) -> dict:
+    """Удаляет читателя, см. delete_reader."""
+    deleted = db.execute(delete(Reader.__table__).where(Reader.id == reader_id).returning(Reader.id)).first()
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Читатель не найден")
     db.commit()
-    return {"message": "Читатель успешно обновлен"}
+    return {"message": "Читатель успешно удален"}
 
 
 @router.delete("/delete/{reader_id}")
 def delete_reader(reader_id: int, db: Session = Depends(get_db), user: dict = Depends(get_user)) -> dict:
-    """Удаление читателя.
+    """Удаление читателя одним запросом DELETE ... RETURNING.
 
     Аргументы:
         reader_id (int): Идентификатор читателя.
@@ -90,9 +132,4 @@ def delete_reader(reader_id: int, db: Session = Depends(get_db), user: dict = De
     Возвращает:
         dict: Сообщение об успешном удалении.
     """
-    db_reader = db.query(Reader).filter(Reader.id == reader_id).first()
-    if db_reader is None:
-        raise HTTPException(status_code=404, detail="Читатель не найден")
-    db.delete(db_reader)
-    db.commit()
-    return {"message": "Читатель успешно удален"}
+    return remove_reader(db, reader_id)
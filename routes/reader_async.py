@@ -0,0 +1,75 @@
+from typing import Optional, Union
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from utils.dependencies import get_user
+from database.session import get_async_db
+from database.schemas import ReaderCreate, ReaderUpdate
+from routes.reader import add_reader, change_reader, load_reader, remove_reader
+
+# Асинхронные версии маршрутов routes/reader.py (DB_ASYNC): те же функции, выполняемые через AsyncSession.run_sync
+router = APIRouter(prefix="/reader", tags=["reader"])
+
+
+@router.post("/create")
+async def create_reader(reader: ReaderCreate, db: AsyncSession = Depends(get_async_db), user: dict = Depends(get_user)) -> dict:
+    """Создание нового читателя (асинхронная версия reader.create_reader).
+
+    Аргументы:
+        reader (ReaderCreate): Данные читателя.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        dict: Сообщение об успешном создании.
+    """
+    return await db.run_sync(add_reader, reader)
+
+
+@router.get("/read/{reader_id}", response_model=ReaderCreate)
+async def read_reader(reader_id: int, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db), user: dict = Depends(get_user)) -> Union[ReaderCreate, JSONResponse]:
+    """Получение информации о читателе (асинхронная версия reader.read_reader).
+
+    Аргументы:
+        reader_id (int): Идентификатор читателя.
+        fields (str): Возвращаемые поля через запятую. По умолчанию все.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        dict: Информация о читателе.
+    """
+    return await db.run_sync(load_reader, reader_id, fields)
+
+
+@router.put("/update/{reader_id}")
+async def update_reader(reader_id: int, reader: ReaderUpdate, db: AsyncSession = Depends(get_async_db), user: dict = Depends(get_user)) -> dict:
+    """Обновление информации о читателе одним запросом UPDATE ... RETURNING (асинхронная версия reader.update_reader).
+
+    Аргументы:
+        reader_id (int): Идентификатор читателя.
+        reader (ReaderUpdate): Данные читателя.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        dict: Сообщение об успешном обновлении.
+    """
+    return await db.run_sync(change_reader, reader_id, reader)
+
+
+@router.delete("/delete/{reader_id}")
+async def delete_reader(reader_id: int, db: AsyncSession = Depends(get_async_db), user: dict = Depends(get_user)) -> dict:
+    """Удаление читателя одним запросом DELETE ... RETURNING (асинхронная версия reader.delete_reader).
+
+    Аргументы:
+        reader_id (int): Идентификатор читателя.
+        db (AsyncSession): Асинхронная сессия базы данных.
+        user (dict): Авторизованный пользователь (JWT).
+
+    Возвращает:
+        dict: Сообщение об успешном удалении.
+    """
+    return await db.run_sync(remove_reader, reader_id)
@@ -0,0 +1,58 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.models import Base
+from database.session import get_db
+from utils.cache import book_cache
+from utils.dependencies import get_user
+from utils.idempotency import idempotency_cache
+from utils.inventory import copies_sync
+from utils.rate_limiter import limiter
+from main import app
+
+
+@pytest.fixture
+def db():
+    """
+    Сессия SQLite в памяти со схемой, созданной по моделям.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def client(db):
+    """
+    Тестовый клиент с подменёнными зависимостями get_db и get_user и выключенным лимитером.
+    """
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_user] = lambda: {"email": "test@test.com"}
+    limiter.enabled = False
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        limiter.enabled = True
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Очищает кэши процесса, чтобы записи не переходили между тестами.
+    """
+    book_cache.clear()
+    idempotency_cache.clear()
+    copies_sync.drain()
+    yield
+    book_cache.clear()
+    idempotency_cache.clear()
+    copies_sync.drain()
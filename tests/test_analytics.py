@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from database.models import Book, BorrowedBooks, BorrowedBooksArchive, Reader
+from database.crud import read_watermark
+from utils import analytics
+from utils.analytics import backfill_rollups, update_rollups
+
+
+def _seed(db):
+    db.add(Reader(id=1, name="Иван", email="ivan@test.com"))
+    db.add(Reader(id=2, name="Пётр", email="petr@test.com"))
+    for i in range(1, 4):
+        db.add(Book(id=i, title=f"Книга {i}", author="Автор", copies=5))
+    db.commit()
+
+
+def _loan(book_id, reader_id, borrow_date, archived=False):
+    if archived:
+        return BorrowedBooksArchive(id=100 + book_id * 10 + reader_id, book_id=book_id, reader_id=reader_id,
+                                    borrow_date=borrow_date, due_date=borrow_date, return_date=borrow_date)
+    return BorrowedBooks(book_id=book_id, reader_id=reader_id, borrow_date=borrow_date, due_date=borrow_date)
+
+
+def test_rollups_backfill_and_incremental(client, db):
+    """
+    Тестирует построение агрегатов по всем выдачам (включая архив) и добавление только новых выдач.
+    """
+    _seed(db)
+    db.add(_loan(1, 1, datetime(2024, 1, 30, 10, 15), archived=True))
+    db.add(_loan(1, 2, datetime(2024, 2, 1, 10, 45)))
+    db.add(_loan(2, 1, datetime(2024, 2, 1, 18, 5)))
+    db.commit()
+    backfill_rollups(db, now=datetime(2024, 2, 2))
+    db.commit()
+
+    db.add(_loan(2, 2, datetime(2024, 2, 3, 10, 0)))
+    db.add(_loan(2, 1, datetime(2024, 2, 3, 11, 0)))
+    db.commit()
+    update_rollups(db, now=datetime(2024, 2, 4))
+    db.commit()
+    # Повторный запуск без новых выдач ничего не добавляет
+    update_rollups(db, now=datetime(2024, 2, 4, 0, 5))
+    db.commit()
+
+    period = {"date_from": "2024-01-01", "date_to": "2024-02-29"}
+    top = client.get("/analytics/top-books", params=period).json()
+    assert [(book["book_id"], book["loans"]) for book in top] == [(2, 3), (1, 2)]
+    assert top[0]["title"] == "Книга 2"
+
+    hours = client.get("/analytics/busy-hours", params=period).json()
+    assert len(hours) == 24 and hours[10]["loans"] == 3 and hours[18]["loans"] == 1
+
+    months = client.get("/analytics/reader-months", params=period).json()
+    assert [(row["reader_id"], row["month"], row["loans"]) for row in months] == [
+        (1, "2024-01", 1), (1, "2024-02", 2), (2, "2024-02", 2)
+    ]
+
+
+def test_rollups_first_run_and_period_validation(client, db, monkeypatch):
+    """
+    Тестирует, что первый запуск задачи строит агрегаты полностью (один раз, даже если второй воркер
+    тоже не нашёл отметку), а слишком длинный период отклоняется.
+    """
+    _seed(db)
+    now = datetime.utcnow()
+    db.add(_loan(3, 1, now - timedelta(days=1)))
+    # Выдача младше ANALYTICS_ROLLUP_DELAY учитывается следующим запуском
+    db.add(_loan(3, 2, now))
+    db.commit()
+    update_rollups(db, now=now)
+    db.commit()
+    # Второй воркер прочитал отметку до фиксации первого: его backfill сложил бы счётчики поверх чужих
+    reads, backfills = [None], []
+    monkeypatch.setattr(analytics, "read_watermark", lambda db, name: reads.pop() if reads else read_watermark(db, name))
+    monkeypatch.setattr(analytics, "backfill_rollups", lambda db, now: backfills.append(now))
+    update_rollups(db, now=now)
+    db.commit()
+    assert backfills == []
+
+    top = client.get("/analytics/top-books").json()
+    assert [(book["book_id"], book["loans"]) for book in top] == [(3, 1)]
+    response = client.get("/analytics/top-books", params={"date_from": "2020-01-01", "date_to": "2024-01-01"})
+    assert response.status_code == 400
@@ -0,0 +1,113 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base, Book, BorrowedBooks, BorrowedBooksArchive, Reader
+from utils.archive import archive_loans, archive_loans_job
+from utils.overdue import scan_overdue
+
+
+def _seed(db, returned=True):
+    db.add(Reader(id=1, name="Иван", email="ivan@test.com"))
+    db.add(Book(id=1, title="Книга", author="Автор", copies=1))
+    start = datetime(2024, 1, 1)
+    for i in range(12):
+        borrow_date = start + timedelta(days=i)
+        # Каждая третья выдача открыта, остальные возвращены через 2 дня
+        db.add(BorrowedBooks(book_id=1, reader_id=1, borrow_date=borrow_date, due_date=borrow_date + timedelta(days=1),
+                             return_date=None if i % 3 == 0 or not returned else borrow_date + timedelta(days=2)))
+    db.commit()
+    return start
+
+
+def test_archive_moves_old_returned_loans(client, db):
+    """
+    Тестирует, что в архив переносятся только давно возвращённые выдачи, а история читает обе таблицы.
+    """
+    start = _seed(db)
+    # Все закрытые выдачи возвращены более 30 дней назад; последняя (id=12) остаётся как выдача с наибольшим id
+    now = start + timedelta(days=45)
+    assert archive_loans(db, now=now, batch_size=3) == 3
+    assert archive_loans(db, now=now) == 4
+    assert archive_loans(db, now=now) == 0
+    db.commit()
+
+    assert sorted(loan.id for loan in db.query(BorrowedBooks)) == [1, 4, 7, 10, 12]
+    assert db.query(BorrowedBooksArchive).count() == 7
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 5} if cursor is None else {"limit": 5, "before": cursor}
+        page = client.get("/borrow/1/history", params=params).json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(range(12, 0, -1))
+    returned = client.get("/borrow/1/history", params={"status": "returned"}).json()["items"]
+    assert len(returned) == 8
+    assert client.post("/borrow/return", json={"reader_id": 1, "book_id": 1}).status_code == 200
+
+
+def test_archived_loans_in_overdue_and_export(client, db):
+    """
+    Тестирует, что просрочки и выгрузка видят выдачи, перенесённые в архив.
+    """
+    start = _seed(db, returned=False)
+    scan_overdue(db, now=start + timedelta(days=20))
+    for loan in db.query(BorrowedBooks).filter(BorrowedBooks.id % 3 != 1):
+        loan.return_date = loan.borrow_date + timedelta(days=30)
+    db.commit()
+    assert archive_loans(db, now=start + timedelta(days=90)) == 7
+    db.commit()
+
+    overdue = client.get("/borrow/overdue", params={"active": False}).json()["items"]
+    assert len(overdue) == 12
+    assert sum(item["return_date"] is None for item in overdue) == 4
+    assert len(client.get("/borrow/overdue").json()["items"]) == 4
+
+    lines = client.get("/export/borrowed_books").text.strip().splitlines()
+    assert len(lines) == 12
+
+
+def test_parallel_archive_jobs_move_each_loan_once(tmp_path):
+    """
+    Тестирует две одновременные задачи архивации (два воркера): обе выбирают одну пачку,
+    но каждая выдача переносится один раз и ни одна задача не падает на конфликте ключа.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'library.db'}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        _seed(db)
+        # Возвраты — больше ARCHIVE_AFTER_DAYS дней назад
+        db.query(BorrowedBooks).update({BorrowedBooks.return_date: datetime(2024, 1, 1)})
+        db.commit()
+
+    # Обе задачи доходят до вставки в архив, выбрав одни и те же выдачи
+    selected = threading.Barrier(2)
+    local = threading.local()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def wait_for_other_job(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO borrowed_books_archive") and not getattr(local, "waited", False):
+            local.waited = True
+            selected.wait(timeout=10)
+
+    def run_job() -> int:
+        with Session() as db:
+            moved = archive_loans(db)
+            db.commit()
+            return moved
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert sorted(pool.map(lambda _: run_job(), range(2))) == [0, 11]
+    archive_loans_job(session_factory=Session)
+
+    with Session() as db:
+        assert [loan.id for loan in db.query(BorrowedBooks)] == [12]
+        assert db.query(BorrowedBooksArchive).count() == 11
+    engine.dispose()
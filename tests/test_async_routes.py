@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from database.models import Base
+from database.session import get_async_db
+from routes import book, book_async, borrow, borrow_async, reader, reader_async
+from utils.cache import LocalSharedStore, SharedCache, ThreadpoolCache
+from utils.dependencies import get_user
+from utils.rate_limiter import limiter
+from main import include_routers
+
+
+@pytest.fixture
+def async_client():
+    """
+    Тестовый клиент приложения с асинхронными маршрутами (как при DB_ASYNC) поверх SQLite в памяти (aiosqlite).
+    """
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    sessions = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def override_db():
+        async with sessions() as db:
+            yield db
+
+    async def create_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    app = FastAPI()
+    app.state.limiter = limiter
+    include_routers(app, [
+        book_async.router, reader_async.router, borrow_async.router, book.router, reader.router, borrow.router
+    ])
+    app.dependency_overrides[get_async_db] = override_db
+    app.dependency_overrides[get_user] = lambda: {"email": "test@test.com"}
+    limiter.enabled = False
+    try:
+        # Один event loop на весь тест: соединение aiosqlite привязано к циклу, в котором создано
+        with TestClient(app) as client:
+            client.portal.call(create_schema)
+            yield client
+            client.portal.call(engine.dispose)
+    finally:
+        limiter.enabled = True
+
+
+def test_async_routes_replace_sync_routes(async_client):
+    """
+    Асинхронные маршруты подключаются вместо синхронных с тем же путём и методом,
+    остальные маршруты роутеров остаются синхронными.
+    """
+    endpoints = {}
+    for route in async_client.app.routes:
+        for method in getattr(route, "methods", ()):
+            assert (route.path, method) not in endpoints
+            endpoints[(route.path, method)] = route.endpoint
+
+    assert endpoints[("/book/read/{book_id}", "GET")] is book_async.read_book
+    assert endpoints[("/borrow/", "POST")] is borrow_async.borrowing
+    assert endpoints[("/reader/create", "POST")] is reader_async.create_reader
+    assert endpoints[("/book/import", "POST")] is book.import_catalog
+    assert endpoints[("/borrow/batch", "POST")] is borrow.borrowing_batch
+
+
+def test_async_catalog_and_circulation(async_client):
+    """
+    Книга, читатель, выдача и возврат через AsyncSession: те же ответы и правила, что в синхронных маршрутах.
+    """
+    book_id = async_client.post("/book/create", json={"title": "Асинхронность", "author": "Автор", "copies": 1}).json()["book_id"]
+    first = async_client.post("/reader/create", json={"name": "Первый", "email": "first@test.com"}).json()["reader_id"]
+    second = async_client.post("/reader/create", json={"name": "Второй", "email": "second@test.com"}).json()["reader_id"]
+    assert async_client.post("/reader/create", json={"name": "Дубль", "email": "first@test.com"}).status_code == 400
+
+    read = async_client.get(f"/book/read/{book_id}")
+    assert read.json()["title"] == "Асинхронность"
+    assert async_client.get(f"/book/read/{book_id}", headers={"If-None-Match": read.headers["ETag"]}).status_code == 304
+
+    assert async_client.post("/borrow/", json={"reader_id": first, "book_id": book_id}).status_code == 200
+    # Единственный экземпляр уже выдан
+    assert async_client.post("/borrow/", json={"reader_id": second, "book_id": book_id}).status_code == 400
+    assert [item["id"] for item in async_client.get(f"/borrow/{first}/borrows").json()] == [book_id]
+
+    assert async_client.post("/borrow/return", json={"reader_id": first, "book_id": book_id}).status_code == 200
+    assert async_client.post("/borrow/return", json={"reader_id": first, "book_id": book_id}).status_code == 404
+    assert async_client.get(f"/borrow/{first}/borrows").json() == []
+    assert async_client.post("/borrow/", json={"reader_id": second, "book_id": book_id}).status_code == 200
+
+    history = async_client.get(f"/borrow/{first}/history", params={"status": "returned"}).json()
+    assert [item["book_id"] for item in history["items"]] == [book_id]
+
+    assert async_client.put(f"/book/update/{book_id}", json={"copies": 3}).status_code == 200
+    assert async_client.get(f"/book/read/{book_id}").json()["copies"] == 3
+    assert async_client.get("/book/all", params={"stream": True}).text.count("\n") == 1
+
+
+def test_async_routes_reach_shared_cache_off_event_loop(async_client, monkeypatch):
+    """
+    Асинхронные маршруты обращаются к общему кэшу (Redis) из пула потоков, а не из потока event loop.
+    """
+    threads = set()
+
+    class RecordingStore(LocalSharedStore):
+        def get(self, name):
+            threads.add(threading.get_ident())
+            return super().get(name)
+
+    cache = SharedCache(RecordingStore(), prefix="book:")
+    monkeypatch.setattr(book_async, "async_book_cache", ThreadpoolCache(cache))
+    loop_thread = async_client.portal.call(lambda: threading.get_ident())
+
+    book_id = async_client.post("/book/create", json={"title": "Кэш", "author": "Автор", "copies": 1}).json()["book_id"]
+    assert async_client.get(f"/book/read/{book_id}").json()["title"] == "Кэш"
+    assert async_client.get(f"/book/read/{book_id}").json()["title"] == "Кэш"
+    assert cache.stats()["hits"] == 1
+    assert threads and loop_thread not in threads
@@ -1,5 +1,5 @@
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Request, Response
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock
 
@@ -33,7 +33,9 @@ def test_auth_request():
     db.query().filter().first.side_effect = [book]
 
     # --- Вызов ---
-    response = read_book(book_id=2, db=db, user=get_user)
+    response = read_book(
+        book_id=2, request=Request({"type": "http", "headers": []}), response=Response(), db=db, user=get_user
+    )
 
     # --- Проверка ---
     print(response)
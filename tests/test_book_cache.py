@@ -0,0 +1,73 @@
+import time
+
+from database.models import Book
+from utils.cache import LRUCache, LocalSharedStore, SharedCache, book_cache
+
+
+def test_read_book_cache_invalidation(client, db):
+    """
+    Тестирует read-through кэш /book/read/{id}: повторное чтение — попадание, обновление сбрасывает запись.
+    """
+    db.add(Book(id=1, title="Старое название", author="Автор", copies=1))
+    db.commit()
+
+    assert client.get("/book/read/1").json()["title"] == "Старое название"
+    hits = book_cache.stats()["hits"]
+    assert client.get("/book/read/1").json()["title"] == "Старое название"
+    assert book_cache.stats()["hits"] == hits + 1
+
+    client.put("/book/update/1", json={"title": "Новое название"})
+    assert client.get("/book/read/1").json()["title"] == "Новое название"
+
+
+def test_lru_cache_eviction_and_ttl():
+    """
+    Тестирует вытеснение по размеру и истечение времени жизни записей LRU-кэша.
+    """
+    cache = LRUCache(max_size=2, ttl=None)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.set(3, "c")
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.stats()["evictions"] == 1
+
+    cache.set(4, "d", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get(4) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_shared_cache_roundtrip():
+    """
+    Тестирует кэш поверх общего хранилища: данные видны другому экземпляру (другому процессу).
+    """
+    store = LocalSharedStore()
+    first, second = SharedCache(store, prefix="book:"), SharedCache(store, prefix="book:")
+    first.set(1, {"id": 1, "title": "Книга"})
+    assert second.get(1) == {"id": 1, "title": "Книга"}
+    second.delete(1)
+    assert first.get(1) is None
+
+    # Доли секунды округляются вверх: Redis отклоняет ex=0
+    first.set(2, "a", ttl=0.2)
+    assert 0.5 < store._data["book:2"][1] - time.monotonic() <= 1
+
+
+def test_read_through_add_keeps_fresher_entry():
+    """
+    Тестирует запись чтения через кэш (add): устаревшая строка, прочитанная до конкурентного обновления,
+    не затирает запись, положенную update_book, но заполняет отсутствующий или истёкший ключ.
+    """
+    for cache in (LRUCache(ttl=None), SharedCache(LocalSharedStore(), prefix="book:")):
+        cache.set(1, {"title": "Новое название"})
+        assert cache.add(1, {"title": "Старое название"}) is False
+        assert cache.get(1) == {"title": "Новое название"}
+        assert cache.add(2, {"title": "Книга"}) is True
+
+    cache = LRUCache(ttl=None)
+    cache.add(1, "a", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.add(1, "b") is True
+    assert cache.get(1) == "b"
@@ -0,0 +1,18 @@
+from database.models import Book
+
+
+def test_read_books_batch_order_and_missing(client, db):
+    """
+    Тестирует пакетное чтение книг: порядок запроса сохраняется, отсутствующие id возвращаются отдельно.
+    """
+    db.add_all([Book(id=i, title=f"Книга {i}", author="Автор", copies=1) for i in (1, 2, 3)])
+    db.commit()
+    client.get("/book/read/2")  # книга 2 попадёт в кэш
+
+    response = client.get("/book/read", params={"ids": "3,42,2,1,3"})
+    assert response.status_code == 200
+    body = response.json()
+    assert [book["id"] for book in body["items"]] == [3, 2, 1]
+    assert body["missing"] == [42]
+
+    assert client.get("/book/read", params={"ids": "1,x"}).status_code == 422
@@ -0,0 +1,43 @@
+import json
+
+from database.models import Book
+
+
+def test_books_import_csv_upsert_and_errors(client, db):
+    """
+    Тестирует импорт CSV: вставку, обновление по ISBN и отчёт об ошибочных строках.
+    """
+    db.add(Book(title="Старое название", author="Автор", isbn="978-1", copies=1))
+    db.commit()
+
+    body = (
+        "title,author,year,isbn,copies\n"
+        "Новое название,Автор,2001,978-1,5\n"
+        "Без ISBN,Автор,,,2\n"
+        "Плохая строка,Автор,не год,978-2,1\n"
+        "Ещё книга,Автор,1999,978-3,1\n"
+    )
+    response = client.post(
+        "/book/import", params={"batch_size": 2}, content=body.encode(), headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["processed"], result["imported"], result["failed"]) == (4, 3, 1)
+    assert result["errors"][0]["row"] == 3
+
+    db.expire_all()
+    assert db.query(Book).count() == 3
+    updated = db.query(Book).filter(Book.isbn == "978-1").one()
+    assert (updated.title, updated.copies, updated.year) == ("Новое название", 5, 2001)
+
+
+def test_books_import_ndjson(client, db):
+    """
+    Тестирует импорт NDJSON, включая строку с некорректным JSON.
+    """
+    lines = [json.dumps({"title": f"Книга {i}", "author": "Автор", "copies": 1}) for i in range(3)]
+    body = "\n".join(lines[:2] + ["{oops"] + lines[2:]) + "\n"
+    response = client.post("/book/import", content=body.encode(), headers={"content-type": "application/x-ndjson"})
+    result = response.json()
+    assert (result["processed"], result["imported"], result["failed"]) == (4, 3, 1)
+    assert db.query(Book).count() == 3
@@ -0,0 +1,35 @@
+import json
+
+from database.models import Book
+
+
+def test_books_keyset_pagination(client, db):
+    """
+    Тестирует постраничный обход каталога по курсору next_cursor.
+    """
+    db.add_all([Book(title=f"Книга {i}", author="Автор", copies=1) for i in range(5)])
+    db.commit()
+
+    first = client.get("/book/all", params={"limit": 2}).json()
+    assert [book["title"] for book in first["items"]] == ["Книга 0", "Книга 1"]
+    assert first["next_cursor"] == first["items"][-1]["id"]
+
+    second = client.get("/book/all", params={"limit": 2, "after": first["next_cursor"]}).json()
+    assert [book["title"] for book in second["items"]] == ["Книга 2", "Книга 3"]
+
+    last = client.get("/book/all", params={"limit": 2, "after": second["next_cursor"]}).json()
+    assert [book["title"] for book in last["items"]] == ["Книга 4"]
+    assert last["next_cursor"] is None
+
+
+def test_books_stream_ndjson(client, db):
+    """
+    Тестирует потоковую выдачу каталога в формате NDJSON.
+    """
+    db.add_all([Book(title=f"Книга {i}", author="Автор", copies=1) for i in range(3)])
+    db.commit()
+
+    response = client.get("/book/all", params={"stream": True, "after": 1})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Книга 1", "Книга 2"]
@@ -0,0 +1,28 @@
+from sqlalchemy import text
+
+from database.models import Book
+from utils.search import SQLITE_FTS_DDL
+
+
+def test_books_search_prefix_and_rank(client, db):
+    """
+    Тестирует поиск по префиксу слова и ранжирование: совпадение в названии выше совпадения в описании.
+    """
+    for statement in SQLITE_FTS_DDL:
+        db.execute(text(statement))
+    db.add_all([
+        Book(title="Сборник рассказов", author="Иван Бунин", description="Включает повесть о войне", copies=1),
+        Book(title="Война и мир", author="Лев Толстой", copies=1),
+        Book(title="Капитанская дочка", author="Александр Пушкин", copies=1),
+    ])
+    db.commit()
+
+    response = client.get("/book/search", params={"q": "вой"})
+    assert response.status_code == 200
+    titles = [book["title"] for book in response.json()["items"]]
+    assert titles == ["Война и мир", "Сборник рассказов"]
+
+    response = client.get("/book/search", params={"q": "пушк", "limit": 1})
+    page = response.json()
+    assert [book["title"] for book in page["items"]] == ["Капитанская дочка"]
+    assert page["next_offset"] is None
@@ -0,0 +1,69 @@
+from sqlalchemy import event
+
+from database.models import Book, BorrowedBooks, Reader
+from utils.inventory import copies_sync
+
+
+def seed(db):
+    db.add_all([Reader(id=1, name="Иван", email="ivan@test.com"), Reader(id=2, name="Пётр", email="petr@test.com")])
+    db.add_all([
+        Book(id=1, title="Книга 1", author="Автор", copies=2),
+        Book(id=2, title="Книга 2", author="Автор", copies=1),
+        Book(id=3, title="Книга 3", author="Автор", copies=5),
+    ])
+    db.commit()
+
+
+def test_batch_borrow_partial_failure(client, db):
+    """
+    Тестирует пакетную выдачу: ошибки по позициям не отменяют успешные, экземпляры и лимит учитываются внутри пакета.
+    """
+    seed(db)
+    items = [
+        {"reader_id": 1, "book_id": 2},
+        {"reader_id": 2, "book_id": 2},   # последний экземпляр уже выдан первой позицией
+        {"reader_id": 1, "book_id": 42},
+        {"reader_id": 9, "book_id": 1},
+        {"reader_id": 1, "book_id": 1},
+        {"reader_id": 1, "book_id": 3},
+        {"reader_id": 1, "book_id": 3},   # четвёртая книга читателя — лимит
+    ]
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    response = client.post("/borrow/batch", json={"items": items})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["committed"] is True
+    assert [result["status_code"] for result in data["results"]] == [200, 400, 404, 404, 200, 200, 400]
+    assert (data["succeeded"], data["failed"]) == (3, 4)
+    # Экземпляры забираются одним запросом на книгу (книги 1, 2 и 3)
+    assert len(statements) == 5 + 3
+
+    copies_sync.flush(session_factory=lambda: db)
+    assert [db.get(Book, i).copies for i in (1, 2, 3)] == [1, 0, 4]
+    assert db.query(BorrowedBooks).filter(BorrowedBooks.reader_id == 1).count() == 3
+    assert db.get(Reader, 1).active_borrows == 3
+
+
+def test_batch_atomic_and_return(client, db):
+    """
+    Тестирует атомарный пакет (любая ошибка отменяет все позиции) и пакетный возврат.
+    """
+    seed(db)
+    response = client.post("/borrow/batch", json={"items": [{"reader_id": 1, "book_id": 1}, {"reader_id": 1, "book_id": 42}], "atomic": True})
+    data = response.json()
+    assert data["committed"] is False
+    assert [result["status_code"] for result in data["results"]] == [409, 404]
+    db.expire_all()
+    assert db.get(Book, 1).copies == 2 and db.query(BorrowedBooks).count() == 0
+
+    items = [{"reader_id": 1, "book_id": 1}, {"reader_id": 1, "book_id": 1}, {"reader_id": 2, "book_id": 3}]
+    assert client.post("/borrow/batch", json={"items": items, "atomic": True}).json()["succeeded"] == 3
+
+    returns = items + [{"reader_id": 2, "book_id": 3}]
+    data = client.post("/borrow/return/batch", json={"items": returns}).json()
+    assert [result["status_code"] for result in data["results"]] == [200, 200, 200, 404]
+    copies_sync.flush(session_factory=lambda: db)
+    assert [db.get(Book, i).copies for i in (1, 3)] == [2, 5]
+    assert db.query(BorrowedBooks).filter(BorrowedBooks.return_date.is_(None)).count() == 0
+    assert [db.get(Reader, i).active_borrows for i in (1, 2)] == [0, 0]
@@ -0,0 +1,104 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from database.models import Base, Book, BookCopy, BorrowedBooks, Reader
+from database.schemas import BorrowCreate
+from routes.borrow import borrowing, returning
+from utils.idempotency import IdempotentRequest
+from utils.inventory import COPY_LOANED, copies_sync
+
+COPIES = 50
+READERS = 300
+
+
+def test_parallel_borrows_do_not_oversell(tmp_path):
+    """
+    Тестирует, что сотни параллельных выдач одной книги выдают ровно столько экземпляров, сколько есть.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'library.db'}", connect_args={"check_same_thread": False, "timeout": 60})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        db.add(Book(id=1, title="Война и мир", author="Толстой", year=1869, copies=COPIES))
+        db.add_all([Reader(id=i, name=f"Читатель {i}", email=f"reader{i}@test.com") for i in range(1, READERS + 1)])
+        db.commit()
+
+    def borrow(reader_id: int) -> int:
+        with Session() as db:
+            try:
+                borrowing(BorrowCreate(book_id=1, reader_id=reader_id), db=db, user={}, idempotency=IdempotentRequest(None))
+                return 200
+            except HTTPException as exc:
+                return exc.status_code
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        statuses = list(pool.map(borrow, range(1, READERS + 1)))
+
+    assert statuses.count(200) == COPIES
+    assert statuses.count(400) == READERS - COPIES
+    copies_sync.flush(session_factory=Session)
+    with Session() as db:
+        assert db.get(Book, 1).copies == 0
+        assert db.query(BookCopy).filter(BookCopy.status == COPY_LOANED).count() == COPIES
+        assert db.query(func.count(BorrowedBooks.id)).scalar() == COPIES
+    engine.dispose()
+
+
+def test_parallel_borrows_respect_reader_limit(tmp_path):
+    """
+    Тестирует, что параллельные выдачи разных книг одному читателю не превышают лимит.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'library.db'}", connect_args={"check_same_thread": False, "timeout": 60})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        db.add(Reader(id=1, name="Иван", email="ivan@test.com"))
+        db.add_all([Book(id=i, title=f"Книга {i}", author="Автор", copies=1) for i in range(1, 101)])
+        db.commit()
+
+    def borrow(book_id: int) -> int:
+        with Session() as db:
+            try:
+                borrowing(BorrowCreate(book_id=book_id, reader_id=1), db=db, user={}, idempotency=IdempotentRequest(None))
+                return 200
+            except HTTPException as exc:
+                return exc.status_code
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        statuses = list(pool.map(borrow, range(1, 101)))
+
+    assert statuses.count(200) == settings.MAX_ACTIVE_BORROWS
+    copies_sync.flush(session_factory=Session)
+    with Session() as db:
+        assert db.get(Reader, 1).active_borrows == settings.MAX_ACTIVE_BORROWS
+        assert db.query(func.sum(Book.copies)).scalar() == 100 - settings.MAX_ACTIVE_BORROWS
+    engine.dispose()
+
+
+def test_borrow_and_return_round_trips(db):
+    """
+    Тестирует, что выдача и возврат выполняются фиксированным числом запросов (без подсчёта истории), а повторный возврат невозможен.
+    """
+    db.add(Book(id=1, title="Война и мир", author="Толстой", year=1869, copies=1))
+    db.add(Reader(id=1, name="Иван", email="ivan@test.com"))
+    db.commit()
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    borrowing(BorrowCreate(book_id=1, reader_id=1), db=db, user={}, idempotency=IdempotentRequest(None))
+    assert len(statements) == 4
+    statements.clear()
+    returning(BorrowCreate(book_id=1, reader_id=1), db=db, user={}, idempotency=IdempotentRequest(None))
+    assert len(statements) == 5
+
+    with pytest.raises(HTTPException) as exc_info:
+        returning(BorrowCreate(book_id=1, reader_id=1), db=db, user={}, idempotency=IdempotentRequest(None))
+    assert exc_info.value.status_code == 404
+    copies_sync.flush(session_factory=lambda: db)
+    assert db.get(Book, 1).copies == 1
+    assert db.get(Reader, 1).active_borrows == 0
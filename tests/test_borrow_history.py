@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from database.models import Book, BorrowedBooks, Reader
+
+
+def test_my_borrows_single_query(client, db):
+    """
+    Тестирует, что активные выдачи читателя читаются одним запросом, а формат даты не изменился.
+    """
+    db.add(Reader(id=1, name="Иван", email="ivan@test.com"))
+    for i in range(1, 6):
+        db.add(Book(id=i, title=f"Книга {i}", author="Автор", copies=1))
+        db.add(BorrowedBooks(book_id=i, reader_id=1, borrow_date=datetime(2024, 1, i, 10, 30),
+                             return_date=datetime(2024, 2, 1) if i == 5 else None))
+    db.commit()
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    response = client.get("/borrow/1/borrows")
+    assert response.status_code == 200
+    assert len(statements) == 1
+    items = response.json()
+    assert [item["id"] for item in items] == [1, 2, 3, 4]
+    assert items[0]["borrow_date"] == "2024-01-01 10:30:00"
+
+
+def test_borrow_history_keyset_and_filters(client, db):
+    """
+    Тестирует постраничный обход истории выдач, фильтры по статусу и диапазону дат.
+    """
+    db.add(Reader(id=1, name="Иван", email="ivan@test.com"))
+    db.add(Reader(id=2, name="Пётр", email="petr@test.com"))
+    db.add(Book(id=1, title="Книга", author="Автор", copies=1))
+    start = datetime(2024, 1, 1)
+    for i in range(25):
+        # Пары выдач с одинаковой датой проверяют порядок по id внутри даты
+        borrow_date = start + timedelta(days=i // 2)
+        db.add(BorrowedBooks(book_id=1, reader_id=1, borrow_date=borrow_date,
+                             return_date=None if i % 5 == 0 else borrow_date + timedelta(days=3)))
+    db.add(BorrowedBooks(book_id=1, reader_id=2, borrow_date=start))
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 4} if cursor is None else {"limit": 4, "before": cursor}
+        page = client.get("/borrow/1/history", params=params).json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(range(25, 0, -1))
+
+    active = client.get("/borrow/1/history", params={"status": "active"}).json()["items"]
+    assert len(active) == 5 and all(item["return_date"] is None for item in active)
+    returned = client.get("/borrow/1/history", params={"status": "returned"}).json()["items"]
+    assert len(returned) == 20
+
+    window = client.get("/borrow/1/history", params={"date_from": "2024-01-02", "date_to": "2024-01-04"}).json()["items"]
+    assert sorted(item["id"] for item in window) == [3, 4, 5, 6]
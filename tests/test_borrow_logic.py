@@ -3,31 +3,36 @@ from fastapi import HTTPException
 from unittest.mock import MagicMock
 
 from routes.borrow import borrowing
+from utils.idempotency import IdempotentRequest
 from database.schemas import BorrowCreate, TokenResponse
-from database.models import Reader, Book
+from database.models import BorrowedBooks, Reader, Book
 
-def test_borrowing_limit_exceeded():
+def test_borrowing_limit_exceeded(db):
     """
     Тестирует, что читатель не может взять более 3 книг одновременно.
     """
     # --- Входные данные ---
     borrow_data = BorrowCreate(reader_id=2, book_id=2)
 
-    # --- Мок БД сессии ---
-    db = MagicMock()
-
-    # --- Мокаем Reader ---
-    mock_reader = Reader(id=2, name="Тест", email="test@test.com")
+    # --- Данные в БД ---
     mock_get_user = MagicMock(return_value=TokenResponse(token="test_token")) # Подменяем зависимость get_user на mock_get_user с возвращаемым значением auth_data
-    db.query().filter().first.side_effect = [mock_reader, Book(id=2, title="Торговля и флот", author="Пётр I", year=1706, copies=4)] # Создаем книгу с 4 экземплярами
+    db.add(Reader(id=2, name="Тест", email="test@test.com", active_borrows=3))
+    db.add(Book(id=2, title="Торговля и флот", author="Пётр I", year=1706, copies=4)) # Создаем книгу с 4 экземплярами
 
-    # Мокаем количество уже взятых книг = 3 (превышает лимит)
-    db.query().filter().count.return_value = 3
+    # Читатель уже взял 3 книги (лимит)
+    for book_id in (10, 11, 12):
+        db.add(Book(id=book_id, title=f"Книга {book_id}", author="Автор", copies=0))
+        db.add(BorrowedBooks(book_id=book_id, reader_id=2))
+    db.commit()
 
     # --- Вызов ---
     with pytest.raises(HTTPException) as exc_info:
-        borrowing(borrow_data, db=db, user=mock_get_user)
+        borrowing(borrow_data, db=db, user=mock_get_user, idempotency=IdempotentRequest(None))
 
     # --- Проверка ---
     assert exc_info.value.status_code == 400
     assert exc_info.value.detail == "Лимит превышен. Читатель не может взять более 3 книг"
+
+    # Списанный экземпляр возвращён откатом
+    db.expire_all()
+    assert db.get(Book, 2).copies == 4
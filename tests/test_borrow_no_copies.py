@@ -3,27 +3,26 @@ from fastapi import HTTPException
 from unittest.mock import MagicMock
 
 from routes.borrow import borrowing
+from utils.idempotency import IdempotentRequest
 from database.schemas import BorrowCreate, TokenResponse
 from database.models import Reader, Book
 
-def test_borrowing_no_copies():
+def test_borrowing_no_copies(db):
     """
     Тестирует, что читатель не может взять книгу, если нет доступных экземпляров.
     """
     # --- Входные данные ---
     borrow_data = BorrowCreate(reader_id=2, book_id=2)
 
-    # --- Мок БД сессии ---
-    db = MagicMock()
-
-    # --- Мокаем Reader ---
-    mock_reader = Reader(id=2, name="Тест", email="test@test.com")
+    # --- Данные в БД ---
     mock_get_user = MagicMock(return_value=TokenResponse(token="test_token")) # Подменяем зависимость get_user на mock_get_user с возвращаемым значением auth_data
-    db.query().filter().first.side_effect = [mock_reader, Book(id=2, title="Торговля и флот", author="Пётр I", year=1706, copies=0)]
+    db.add(Reader(id=2, name="Тест", email="test@test.com"))
+    db.add(Book(id=2, title="Торговля и флот", author="Пётр I", year=1706, copies=0))
+    db.commit()
 
     # --- Вызов ---
     with pytest.raises(HTTPException) as exc_info:
-        borrowing(borrow_data, db=db, user=mock_get_user)
+        borrowing(borrow_data, db=db, user=mock_get_user, idempotency=IdempotentRequest(None))
 
     # --- Проверка ---
     assert exc_info.value.status_code == 400
@@ -0,0 +1,34 @@
+from database.models import Book
+
+
+def test_read_book_conditional_get(client, db):
+    """
+    Тестирует ETag /book/read/{id}: совпадение If-None-Match даёт 304, изменение книги — новую версию.
+    """
+    db.add(Book(id=1, title="Книга", author="Автор", copies=1))
+    db.commit()
+
+    first = client.get("/book/read/1")
+    etag = first.headers["etag"]
+    assert client.get("/book/read/1", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put("/book/update/1", json={"copies": 3})
+    changed = client.get("/book/read/1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_books_page_conditional_get(client, db):
+    """
+    Тестирует ETag страницы /book/all: 304 без изменений, новая версия после удаления книги со страницы.
+    """
+    db.add_all([Book(title=f"Книга {i}", author="Автор", copies=1) for i in range(3)])
+    db.commit()
+
+    etag = client.get("/book/all", params={"limit": 2}).headers["etag"]
+    assert client.get("/book/all", params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 304
+
+    client.delete("/book/delete/2")
+    response = client.get("/book/all", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [book["id"] for book in response.json()["items"]] == [1, 3]
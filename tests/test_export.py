@@ -0,0 +1,63 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.models import Book, BorrowedBooks, Reader
+
+
+def test_export_books_csv_gzip_id_range(client, db):
+    """
+    Тестирует выгрузку books в CSV со сжатием gzip и фильтром по диапазону id.
+    """
+    db.add_all([Book(title=f"Книга {i}", author="Автор", copies=1) for i in range(5)])
+    db.commit()
+
+    response = client.get("/export/books", params={"format": "csv", "gzip": True, "after_id": 1, "before_id": 5})
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == 'attachment; filename="books.csv.gz"'
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert [row["id"] for row in rows] == ["2", "3", "4"]
+    assert rows[0]["title"] == "Книга 1"
+
+
+def test_export_borrowed_books_updated_since(client, db):
+    """
+    Тестирует инкрементальную выгрузку borrowed_books: в выгрузку попадают выданные или возвращённые после метки.
+    """
+    now = datetime.utcnow()
+    db.add_all([Book(id=1, title="Книга", author="Автор", copies=1), Reader(id=1, name="Читатель", email="r@test.com")])
+    db.add_all([
+        BorrowedBooks(book_id=1, reader_id=1, borrow_date=now - timedelta(days=10)),
+        BorrowedBooks(book_id=1, reader_id=1, borrow_date=now - timedelta(days=10), return_date=now),
+        BorrowedBooks(book_id=1, reader_id=1, borrow_date=now),
+    ])
+    db.commit()
+
+    response = client.get(
+        "/export/borrowed_books", params={"updated_since": (now - timedelta(days=1)).isoformat()}
+    )
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [2, 3]
+
+
+def test_export_books_parquet_roundtrip(client, db):
+    """
+    Тестирует выгрузку books в Parquet: файл читается pyarrow с теми же строками и типами колонок.
+    """
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+
+    db.add_all([Book(title=f"Книга {i}", author="Автор", year=2000 + i, copies=i) for i in range(1, 6)])
+    db.commit()
+
+    response = client.get("/export/books", params={"format": "parquet", "after_id": 1})
+    assert response.status_code == 200
+
+    table = pyarrow.parquet.read_table(io.BytesIO(response.content))
+    assert table.column("title").to_pylist() == [f"Книга {i}" for i in range(2, 6)]
+    assert table.column("copies").to_pylist() == [2, 3, 4, 5]
+    assert table.schema.field("updated_at").type == pyarrow.timestamp("us")
@@ -0,0 +1,57 @@
+from database.models import Book, Reader
+from utils.facets import rebuild_facets
+from utils.inventory import copies_sync
+
+
+def facets_of(client):
+    response = client.get("/book/facets")
+    assert response.status_code == 200
+    data = response.json()
+    return data["total"], {item["value"]: item for item in data["authors"]}, {item["value"]: item for item in data["decades"]}
+
+
+def test_facets_follow_catalog_writes(client, db):
+    """
+    Тестирует инкрементальное обновление фасетов при создании, изменении и удалении книг
+    и совпадение с полным пересчётом.
+    """
+    client.post("/book/create", json={"title": "A", "author": "Толстой", "year": 1869, "copies": 2})
+    client.post("/book/create", json={"title": "B", "author": "Толстой", "year": 1877, "copies": 0})
+    client.post("/book/create", json={"title": "C", "author": "Чехов", "year": 1901, "copies": 1})
+
+    total, authors, decades = facets_of(client)
+    assert (total["titles"], total["copies"], total["available_titles"]) == (3, 3, 2)
+    assert (authors["Толстой"]["titles"], authors["Толстой"]["available_titles"]) == (2, 1)
+    assert set(decades) == {"1860", "1870", "1900"}
+
+    book_id = db.query(Book.id).filter(Book.title == "C").scalar()
+    assert client.put(f"/book/update/{book_id}", json={"author": "Толстой", "copies": 5}).status_code == 200
+    total, authors, _ = facets_of(client)
+    assert "Чехов" not in authors
+    assert (authors["Толстой"]["titles"], authors["Толстой"]["copies"]) == (3, 7)
+
+    assert client.delete(f"/book/delete/{book_id}").status_code == 200
+    incremental = facets_of(client)
+    rebuild_facets(db)
+    db.commit()
+    assert facets_of(client) == incremental
+
+
+def test_facets_follow_copies_sync(client, db):
+    """
+    Тестирует, что выдача и возврат попадают в copies и фасеты после пересчёта изменённых книг.
+    """
+    client.post("/book/create", json={"title": "A", "author": "Толстой", "year": 1869, "copies": 1})
+    db.add(Reader(id=1, name="Иван", email="ivan@test.com"))
+    db.commit()
+    book_id = db.query(Book.id).scalar()
+
+    assert client.post("/borrow/", json={"book_id": book_id, "reader_id": 1}).status_code == 200
+    assert facets_of(client)[0]["copies"] == 1
+    copies_sync.flush(session_factory=lambda: db)
+    total, authors, _ = facets_of(client)
+    assert (total["copies"], total["available_titles"], authors["Толстой"]["available_titles"]) == (0, 0, 0)
+
+    assert client.post("/borrow/return", json={"book_id": book_id, "reader_id": 1}).status_code == 200
+    copies_sync.flush(session_factory=lambda: db)
+    assert facets_of(client)[0]["copies"] == 1
@@ -0,0 +1,112 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from database.models import Book, Hold, Reader
+from utils.circulation import expire_holds
+from utils.inventory import copies_sync
+from config import settings
+
+
+def seed(db):
+    db.add_all([Reader(id=i, name=f"Читатель {i}", email=f"reader{i}@test.com") for i in (1, 2, 3)])
+    db.add(Book(id=1, title="Война и мир", author="Толстой", year=1869, copies=1))
+    db.commit()
+
+
+def test_hold_queue_hand_off_and_pickup(client, db):
+    """
+    Тестирует очередь броней: возврат откладывает экземпляр для первого в очереди,
+    выдать его может только этот читатель, отмена передаёт экземпляр следующему.
+    """
+    seed(db)
+    assert client.post("/hold/", json={"reader_id": 2, "book_id": 1}).status_code == 400  # экземпляр свободен
+    assert client.post("/borrow/", json={"reader_id": 1, "book_id": 1}).status_code == 200
+
+    first = client.post("/hold/", json={"reader_id": 2, "book_id": 1}).json()
+    second = client.post("/hold/", json={"reader_id": 3, "book_id": 1}).json()
+    assert (first["status"], first["position"], second["position"]) == ("waiting", 1, 2)
+    assert client.post("/hold/", json={"reader_id": 2, "book_id": 1}).status_code == 400
+
+    assert client.post("/borrow/return", json={"reader_id": 1, "book_id": 1}).status_code == 200
+    assert client.get(f"/hold/{first['id']}").json()["status"] == "ready"
+    assert client.get(f"/hold/{second['id']}").json()["position"] == 1
+    copies_sync.flush(session_factory=lambda: db)
+    assert db.get(Book, 1).copies == 0
+    assert client.post("/borrow/", json={"reader_id": 3, "book_id": 1}).status_code == 400
+
+    # Отмена отложенной брони передаёт экземпляр следующему в очереди
+    assert client.delete(f"/hold/{first['id']}").status_code == 200
+    assert client.get(f"/hold/{second['id']}").json()["status"] == "ready"
+    assert client.post("/borrow/", json={"reader_id": 3, "book_id": 1}).status_code == 200
+    copies_sync.flush(session_factory=lambda: db)
+    assert db.get(Hold, second["id"]).status == "fulfilled"
+    assert db.get(Book, 1).copies == 0
+
+
+def test_hold_wait_is_woken_by_return(client, db):
+    """
+    Тестирует long-poll ожидание брони: ответ приходит сразу после возврата книги, а не по таймауту.
+    """
+    seed(db)
+    client.post("/borrow/", json={"reader_id": 1, "book_id": 1})
+    hold_id = client.post("/hold/", json={"reader_id": 2, "book_id": 1}).json()["id"]
+
+    result = {}
+
+    def wait():
+        started = time.monotonic()
+        result["hold"] = client.get(f"/hold/{hold_id}/wait", params={"timeout": 10}).json()
+        result["elapsed"] = time.monotonic() - started
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    time.sleep(0.3)
+    client.post("/borrow/return", json={"reader_id": 1, "book_id": 1})
+    waiter.join(timeout=10)
+
+    assert result["hold"]["status"] == "ready"
+    assert result["elapsed"] < 3
+
+
+def test_ready_hold_expires_to_next_in_queue(client, db):
+    """
+    Тестирует истечение брони: экземпляр, не полученный до ready_until, переходит следующему в очереди,
+    а после истечения последней брони возвращается в доступные.
+    """
+    seed(db)
+    client.post("/borrow/", json={"reader_id": 1, "book_id": 1})
+    first = client.post("/hold/", json={"reader_id": 2, "book_id": 1}).json()["id"]
+    second = client.post("/hold/", json={"reader_id": 3, "book_id": 1}).json()["id"]
+    client.post("/borrow/return", json={"reader_id": 1, "book_id": 1})
+    ready_until = datetime.fromisoformat(client.get(f"/hold/{first}").json()["ready_until"])
+    assert ready_until > datetime.utcnow()
+
+    assert expire_holds(db, now=ready_until - timedelta(seconds=1)) == ([], [])
+    expired, handed = expire_holds(db, now=ready_until)
+    db.commit()
+    assert [hold.id for hold in expired] == [first] and [hold.id for hold in handed] == [second]
+    assert client.get(f"/hold/{first}").json()["status"] == "expired"
+    assert client.post("/borrow/", json={"reader_id": 2, "book_id": 1}).status_code == 400
+
+    expire_holds(db, now=ready_until + timedelta(days=settings.HOLD_PICKUP_DAYS))
+    db.commit()
+    assert client.get(f"/hold/{second}").json()["status"] == "expired"
+    assert client.post("/borrow/", json={"reader_id": 2, "book_id": 1}).status_code == 200
+
+
+def test_restock_goes_to_waiting_hold(client, db):
+    """
+    Тестирует пополнение каталога: новый экземпляр откладывается для первого в очереди,
+    а не становится доступным для любого читателя.
+    """
+    seed(db)
+    client.post("/borrow/", json={"reader_id": 1, "book_id": 1})
+    hold_id = client.post("/hold/", json={"reader_id": 2, "book_id": 1}).json()["id"]
+
+    assert client.put("/book/update/1", json={"copies": 1}).status_code == 200
+    assert client.get(f"/hold/{hold_id}").json()["status"] == "ready"
+    assert client.post("/borrow/", json={"reader_id": 3, "book_id": 1}).status_code == 400
+    copies_sync.flush(session_factory=lambda: db)
+    assert db.get(Book, 1).copies == 0
+    assert client.post("/borrow/", json={"reader_id": 2, "book_id": 1}).status_code == 200
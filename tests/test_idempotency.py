@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, select, update
+
+from database.models import Book, BorrowedBooks, IdempotencyKey, Reader
+from utils.idempotency import idempotency_cache, purge_idempotency_keys_job
+
+
+def test_borrow_retry_replays_response(client, db):
+    """
+    Тестирует повтор выдачи с тем же Idempotency-Key: сохранённый ответ без повторной выдачи,
+    из кэша процесса без запросов к БД, из idempotency_keys без обращения к бизнес-таблицам.
+    """
+    db.add_all([Book(id=1, title="Книга", author="Автор", copies=2), Reader(id=1, name="Иван", email="ivan@test.com")])
+    db.commit()
+    body = {"book_id": 1, "reader_id": 1}
+    headers = {"Idempotency-Key": "desk-1"}
+
+    first = client.post("/borrow/", json=body, headers=headers)
+    assert first.status_code == 200
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    retry = client.post("/borrow/", json=body, headers=headers)
+    assert (retry.status_code, retry.json(), retry.headers["idempotent-replayed"]) == (200, first.json(), "true")
+    assert statements == []
+
+    idempotency_cache.clear()
+    retry = client.post("/borrow/", json=body, headers=headers)
+    assert retry.json() == first.json()
+    assert len(statements) == 1 and "idempotency_keys" in statements[0]
+    assert db.scalar(select(func.count()).select_from(BorrowedBooks)) == 1
+
+    # Тот же ключ с другим запросом отклоняется, без ключа запрос выполняется как обычно
+    assert client.post("/borrow/", json={"book_id": 1, "reader_id": 2}, headers=headers).status_code == 422
+    assert client.post("/borrow/", json=body).status_code == 200
+    assert db.scalar(select(func.count()).select_from(BorrowedBooks)) == 2
+
+
+def test_create_book_retry_and_key_expiry(client, db):
+    """
+    Тестирует повтор создания книги (один и тот же book_id, книга не дублируется), область ключа
+    (тот же ключ на другом эндпоинте независим) и очистку просроченных ключей.
+    """
+    body = {"title": "Книга", "author": "Автор", "copies": 1}
+    headers = {"Idempotency-Key": "create-1"}
+
+    first = client.post("/book/create", json=body, headers=headers)
+    assert client.post("/book/create", json=body, headers=headers).json() == first.json()
+    assert db.scalar(select(func.count()).select_from(Book)) == 1
+
+    db.add(Reader(id=1, name="Иван", email="ivan@test.com"))
+    db.commit()
+    assert client.post("/borrow/", json={"book_id": 1, "reader_id": 1}, headers=headers).status_code == 200
+
+    db.execute(update(IdempotencyKey).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+    purge_idempotency_keys_job(session_factory=lambda: db)
+    assert db.scalar(select(func.count()).select_from(IdempotencyKey)) == 0
+
+    idempotency_cache.clear()
+    second = client.post("/book/create", json=body, headers=headers)
+    assert second.json()["book_id"] != first.json()["book_id"]
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from database.models import Book, BorrowedBooks, OverdueLoan, Reader
+from utils.overdue import scan_overdue
+
+
+def test_scan_overdue_incremental(client, db):
+    """
+    Тестирует, что выдаче назначается срок возврата, а повторный поиск находит только новые просрочки.
+    """
+    db.add(Reader(id=1, name="Иван", email="ivan@test.com"))
+    db.add(Book(id=1, title="Книга", author="Автор", copies=5))
+    db.commit()
+    assert client.post("/borrow/", json={"reader_id": 1, "book_id": 1}).status_code == 200
+    loan = db.query(BorrowedBooks).one()
+    assert loan.due_date - loan.borrow_date == timedelta(days=14)
+
+    start = datetime(2024, 1, 1)
+    for i in range(2, 6):
+        db.add(BorrowedBooks(book_id=1, reader_id=1, borrow_date=start, due_date=start + timedelta(days=i),
+                             return_date=start + timedelta(days=1) if i == 5 else None))
+    db.commit()
+
+    assert scan_overdue(db, now=start + timedelta(days=3)) == 2
+    db.commit()
+    assert scan_overdue(db, now=start + timedelta(days=3)) == 0
+    # Возвращённая вовремя выдача (срок 5-го дня) не считается просроченной
+    assert scan_overdue(db, now=start + timedelta(days=10)) == 1
+    db.commit()
+    assert sorted(row.due_date.day for row in db.query(OverdueLoan)) == [3, 4, 5]
+
+
+def test_overdue_endpoint_pages(client, db):
+    """
+    Тестирует постраничный обход просроченных выдач и фильтр по невозвращённым.
+    """
+    db.add(Reader(id=1, name="Иван", email="ivan@test.com"))
+    db.add(Book(id=1, title="Книга", author="Автор", copies=1))
+    start = datetime(2024, 1, 1)
+    for i in range(7):
+        db.add(BorrowedBooks(book_id=1, reader_id=1, borrow_date=start, due_date=start + timedelta(days=1)))
+    db.commit()
+    scan_overdue(db, now=start + timedelta(days=2))
+    db.query(BorrowedBooks).filter(BorrowedBooks.id == 7).update({"return_date": start + timedelta(days=3)})
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3} if cursor is None else {"limit": 3, "after": cursor}
+        page = client.get("/borrow/overdue", params=params).json()
+        seen.extend(item["borrow_id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [1, 2, 3, 4, 5, 6]
+    every = client.get("/borrow/overdue", params={"active": False}).json()["items"]
+    assert len(every) == 7 and every[-1]["return_date"] is not None
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from database.models import User
+from utils.passwords import PasswordHasher
+
+
+def test_login_rehashes_on_cost_change(client, db, monkeypatch):
+    """
+    Тестирует регистрацию и вход через общий PasswordHasher и прозрачный пересчёт хэша
+    после изменения стоимости bcrypt.
+    """
+    monkeypatch.setattr("routes.auth.password_hasher", PasswordHasher(["bcrypt"], 4, workers=1, max_queue=4))
+    credentials = {"email": "admin@test.com", "password": "password"}
+    assert client.post("/auth/register", json=credentials).status_code == 200
+    assert db.query(User).one().password_hash.startswith("$2b$04$")
+
+    monkeypatch.setattr("routes.auth.password_hasher", PasswordHasher(["bcrypt"], 5, workers=1, max_queue=4))
+    assert client.post("/auth/login", json={**credentials, "password": "wrong"}).status_code == 401
+    assert client.post("/auth/login", json=credentials).status_code == 200
+    db.expire_all()
+    assert db.query(User).one().password_hash.startswith("$2b$05$")
+    assert client.post("/auth/login", json=credentials).status_code == 200
+
+
+def test_hasher_queue_limit():
+    """
+    Тестирует ограничение очереди: операция сверх потоков и очереди сразу получает 503,
+    после освобождения пула хэширование снова доступно.
+    """
+    hasher = PasswordHasher(["bcrypt"], 4, workers=1, max_queue=1)
+    release = threading.Event()
+    slow_hash = hasher.context.hash
+    hasher.context.hash = lambda password: release.wait() and slow_hash(password)
+
+    async def storm():
+        running = [asyncio.ensure_future(hasher.hash("password")) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as error:
+            await hasher.hash("password")
+        release.set()
+        return error.value.status_code, await asyncio.gather(*running)
+
+    status_code, hashes = asyncio.run(storm())
+    assert status_code == 503
+    assert all(hasher.context.verify("password", password_hash) for password_hash in hashes)
+    assert asyncio.run(hasher.hash("password")).startswith("$2b$04$")
@@ -0,0 +1,42 @@
+from limits.strategies import FixedWindowRateLimiter
+
+from config import settings
+from utils.jwt import jwt_handler
+from utils.rate_limiter import SQLiteStorage, SharedStoreStorage, limiter
+
+
+def test_sqlite_storage_shared_between_workers(tmp_path):
+    """
+    Тестирует хранилище SQLite: два экземпляра (как два процесса) видят общие счётчики,
+    истёкшее окно начинается заново.
+    """
+    uri = f"sqlite:///{tmp_path / 'limits.db'}"
+    first, second = SQLiteStorage(uri), SQLiteStorage(uri)
+
+    assert first.incr("key", 60) == 1
+    assert second.incr("key", 60) == 2
+    assert first.incr("key", 60, amount=3) == 5
+    assert second.get("key") == 5
+
+    assert first.incr("expired", 0) == 1
+    assert second.incr("expired", 60) == 1
+    second.clear("key")
+    assert first.get("key") == 0
+
+
+def test_limit_keyed_by_jwt_subject(client, monkeypatch):
+    """
+    Тестирует ключ лимита по пользователю из JWT: исчерпанный лимит одного пользователя
+    не действует на другого пользователя с того же IP.
+    """
+    storage = SharedStoreStorage("shared://")
+    monkeypatch.setattr(limiter, "_storage", storage)
+    monkeypatch.setattr(limiter, "_limiter", FixedWindowRateLimiter(storage))
+    limiter.enabled = True
+    first = {"Authorization": f"Bearer {jwt_handler.issue_token(1, 60)}"}
+    second = {"Authorization": f"Bearer {jwt_handler.issue_token(2, 60)}"}
+
+    statuses = [client.get("/book/all", headers=first).status_code for _ in range(int(settings.RATE_LIMITER) + 1)]
+    assert statuses[-2:] == [200, 429]
+    assert client.get("/book/all", headers=second).status_code == 200
+    assert client.get("/book/all").status_code == 200
@@ -0,0 +1,35 @@
+from database.models import Book, Reader
+
+
+def test_update_and_delete_reader(client, db):
+    """
+    Тестирует обновление только переданных полей читателя, конфликт email и 404 для отсутствующего читателя.
+    """
+    db.add_all([Reader(id=1, name="Иван", email="ivan@test.com"), Reader(id=2, name="Пётр", email="petr@test.com")])
+    db.commit()
+
+    assert client.put("/reader/update/1", json={"name": "Иван Иванов"}).status_code == 200
+    db.expire_all()
+    reader = db.get(Reader, 1)
+    assert (reader.name, reader.email) == ("Иван Иванов", "ivan@test.com")
+
+    assert client.put("/reader/update/1", json={"email": "petr@test.com"}).status_code == 400
+    assert client.put("/reader/update/42", json={"name": "Никто"}).status_code == 404
+
+    assert client.delete("/reader/delete/2").status_code == 200
+    assert client.delete("/reader/delete/2").status_code == 404
+
+
+def test_update_book_partial_fields(client, db):
+    """
+    Тестирует обновление книги: null не затирает обязательные поля, но очищает необязательные.
+    """
+    db.add(Book(id=1, title="Книга", author="Автор", year=1999, copies=1))
+    db.commit()
+
+    response = client.put("/book/update/1", json={"title": None, "year": None, "copies": 4})
+    assert response.status_code == 200
+    db.expire_all()
+    book = db.get(Book, 1)
+    assert (book.title, book.year, book.copies) == ("Книга", None, 4)
+    assert client.put("/book/update/42", json={"copies": 1}).status_code == 404
@@ -0,0 +1,28 @@
+from database.models import Book, Reader
+
+
+def test_books_sparse_fields(client, db):
+    """
+    Тестирует параметр fields: в ответе только запрошенные поля и всегда id, неизвестное поле — 400.
+    """
+    db.add_all([Book(id=i, title=f"Книга {i}", author="Автор", description="Длинное описание", copies=1) for i in (1, 2)])
+    db.commit()
+
+    page = client.get("/book/all", params={"fields": "title,author"}).json()
+    assert page["items"] == [
+        {"id": 1, "title": "Книга 1", "author": "Автор"},
+        {"id": 2, "title": "Книга 2", "author": "Автор"},
+    ]
+    assert client.get("/book/read/1", params={"fields": "title"}).json() == {"id": 1, "title": "Книга 1"}
+    batch = client.get("/book/read", params={"ids": "2,1", "fields": "copies"}).json()
+    assert batch["items"] == [{"id": 2, "copies": 1}, {"id": 1, "copies": 1}]
+    assert client.get("/book/all", params={"fields": "title,password"}).status_code == 400
+
+
+def test_reader_sparse_fields(client, db):
+    """
+    Тестирует параметр fields для читателя.
+    """
+    db.add(Reader(id=1, name="Иван", email="ivan@test.com"))
+    db.commit()
+    assert client.get("/reader/read/1", params={"fields": "name"}).json() == {"name": "Иван"}
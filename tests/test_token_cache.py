@@ -0,0 +1,49 @@
+import time
+
+import pytest
+from jose.exceptions import JWTError
+
+from utils.jwt import JWT, VerifiedTokenCache
+
+
+def test_token_cache_hits_and_revoke():
+    """
+    Тестирует кэш проверенных токенов: повторная проверка без декодирования, отзыв и недействительные токены.
+    """
+    handler = JWT(secret_key="secret")
+    cache = VerifiedTokenCache(handler, max_size=10, ttl=60)
+    token = handler.generate_token({"email": "admin@test.com"})
+
+    assert cache.verify(token) == cache.verify(token) == {"email": "admin@test.com"}
+    stats = cache.stats()
+    assert (stats["decodes"], stats["hits"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    cache.revoke(token)
+    cache.verify(token)
+    assert cache.stats()["decodes"] == 2
+
+    with pytest.raises(JWTError):
+        cache.verify(token[:-2])
+    with pytest.raises(JWTError):
+        cache.verify(token[:-2])
+    assert cache.stats()["decodes"] == 4
+
+
+def test_token_cache_entry_expires_with_token():
+    """
+    Тестирует истечение записи вместе с exp токена: после exp токен снова проверяется и отклоняется.
+    """
+    handler = JWT(secret_key="secret")
+    cache = VerifiedTokenCache(handler, max_size=10, ttl=60)
+    exp = int(time.time()) + 2
+    token = handler.generate_token({"email": "admin@test.com", "exp": exp})
+
+    cache.verify(token)
+    cache.verify(token)
+    assert cache.stats()["decodes"] == 1
+
+    # exp проверяется с точностью до секунды
+    time.sleep(exp + 1.1 - time.time())
+    with pytest.raises(JWTError):
+        cache.verify(token)
+    assert cache.stats()["decodes"] == 2
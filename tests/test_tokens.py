@@ -0,0 +1,88 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from database.session import get_db
+from utils.jwt import jwt_handler, token_cache
+from utils.passwords import PasswordHasher
+from utils.rate_limiter import limiter
+from utils.revocation import RevocationList, revocation_list
+from main import app
+
+
+@pytest.fixture
+def auth_client(db, monkeypatch):
+    """
+    Тестовый клиент с настоящей проверкой JWT (подменены только get_db и стоимость bcrypt).
+    """
+    monkeypatch.setattr("routes.auth.password_hasher", PasswordHasher(["bcrypt"], 4, workers=1, max_queue=4))
+    app.dependency_overrides[get_db] = lambda: db
+    limiter.enabled = False
+    revocation_list.clear()
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        limiter.enabled = True
+        revocation_list.clear()
+
+
+def _bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_slim_tokens_and_refresh_rotation(auth_client):
+    """
+    Тестирует компактный access-токен (sub, exp, jti), обмен refresh-токена на новую пару
+    и отказ при повторном использовании refresh-токена или его использовании вместо access-токена.
+    """
+    tokens = auth_client.post("/auth/register", json={"email": "admin@test.com", "password": "password"}).json()
+    assert set(jwt_handler.verify_token(tokens["token"])) == {"sub", "exp", "jti"}
+    assert auth_client.get("/auth/token-cache/stats", headers=_bearer(tokens["token"])).status_code == 200
+    assert auth_client.get("/auth/token-cache/stats", headers=_bearer(tokens["refresh_token"])).status_code == 401
+
+    refreshed = auth_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert refreshed.status_code == 200
+    assert auth_client.get("/auth/token-cache/stats", headers=_bearer(refreshed.json()["token"])).status_code == 200
+    assert auth_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert auth_client.post("/auth/refresh", json={"refresh_token": tokens["token"]}).status_code == 401
+
+
+def test_logout_revokes_tokens(auth_client, db):
+    """
+    Тестирует выход: access-токен отклоняется сразу в этом процессе и после синхронизации — в другом,
+    refresh-токен больше не обменивается.
+    """
+    credentials = {"email": "admin@test.com", "password": "password"}
+    tokens = auth_client.post("/auth/register", json=credentials).json()
+    other_token = auth_client.post("/auth/login", json=credentials).json()["token"]
+
+    body = {"refresh_token": tokens["refresh_token"]}
+    response = auth_client.post("/auth/logout", json=body, headers=_bearer(tokens["token"]))
+    assert response.status_code == 200
+    assert auth_client.get("/auth/token-cache/stats", headers=_bearer(tokens["token"])).status_code == 401
+    assert auth_client.get("/auth/token-cache/stats", headers=_bearer(other_token)).status_code == 200
+    assert auth_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+    other_process = RevocationList()
+    other_process.sync(db)
+    assert other_process.is_revoked(jwt_handler.verify_token(tokens["token"])["jti"])
+    assert not other_process.is_revoked(jwt_handler.verify_token(other_token)["jti"])
+
+
+def test_logout_and_refresh_drop_tokens_from_cache(auth_client):
+    """
+    Тестирует хук отзыва: после выхода и обмена refresh-токена их claims не остаются в кэше проверенных токенов.
+    """
+    credentials = {"email": "admin@test.com", "password": "password"}
+    tokens = auth_client.post("/auth/register", json=credentials).json()
+    cached = lambda token: token_cache._cache.get(token_cache._digest(token)) is not None
+
+    token_cache.verify(tokens["refresh_token"])
+    assert auth_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+    assert not cached(tokens["refresh_token"])
+
+    token = auth_client.post("/auth/login", json=credentials).json()["token"]
+    assert auth_client.get("/auth/token-cache/stats", headers=_bearer(token)).status_code == 200
+    assert cached(token)
+    assert auth_client.post("/auth/logout", headers=_bearer(token)).status_code == 200
+    assert not cached(token)
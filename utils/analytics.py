@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import Date, Integer, cast, delete, extract, func, select, true
+from sqlalchemy.orm import Session
+
+from database.crud import claim_watermark, read_watermark, set_watermark
+from database.dialect import insert_for
+from database.models import BorrowedBooks, LoanDailyBook, LoanDailyHour, LoanDailyReader
+from database.session import SessionLocal
+from utils.archive import all_loans
+from config import settings
+
+# Имя отметки прогресса обновления агрегатов
+ANALYTICS_WATERMARK = "analytics_rollup"
+
+# Дневные агрегаты и их ключ
+ROLLUPS = ((LoanDailyBook, "book_id"), (LoanDailyHour, "hour"), (LoanDailyReader, "reader_id"))
+
+
+def _add_loans(db: Session, loans, *criteria) -> None:
+    """
+    Добавляет выдачи, подходящие под условия, к дневным агрегатам: по одному
+    INSERT ... SELECT ... GROUP BY с upsert на каждый агрегат.
+
+    :param db: сессия базы данных.
+    :param loans: таблица или подзапрос выдач.
+    :param criteria: условия отбора выдач.
+    """
+    day = func.date(loans.c.borrow_date, type_=Date)
+    keys = {
+        "book_id": loans.c.book_id,
+        "hour": cast(extract("hour", loans.c.borrow_date), Integer),
+        "reader_id": loans.c.reader_id,
+    }
+    for model, key in ROLLUPS:
+        table = model.__table__
+        # WHERE обязателен: без него SQLite не разбирает INSERT ... SELECT ... ON CONFLICT
+        grouped = select(day, keys[key], func.count()).where(true(), *criteria).group_by(day, keys[key])
+        stmt = insert_for(db, table).from_select(["day", key, "loans"], grouped)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.day, table.c[key]],
+            set_={"loans": table.c.loans + stmt.excluded.loans}
+        ))
+
+
+def backfill_rollups(db: Session, now: Optional[datetime] = None) -> None:
+    """
+    Пересчитывает дневные агрегаты по всем выдачам, включая архив (без commit).
+
+    :param db: сессия базы данных.
+    :param now: текущий момент (по умолчанию datetime.utcnow()).
+    """
+    upto = (now or datetime.utcnow()) - timedelta(seconds=settings.ANALYTICS_ROLLUP_DELAY)
+    read_watermark(db, ANALYTICS_WATERMARK)
+    for model, _ in ROLLUPS:
+        db.execute(delete(model))
+    loans = all_loans()
+    _add_loans(db, loans, loans.c.borrow_date <= upto)
+    set_watermark(db, ANALYTICS_WATERMARK, upto)
+
+
+def update_rollups(db: Session, now: Optional[datetime] = None) -> None:
+    """
+    Добавляет к дневным агрегатам выдачи, появившиеся с прошлого запуска (без commit).
+
+    Читается только диапазон (отметка, now - ANALYTICS_ROLLUP_DELAY] по индексу borrow_date;
+    задержка оставляет время зафиксироваться транзакциям выдачи, начатым до конца диапазона.
+    При первом запуске агрегаты строятся полностью (backfill_rollups) только в той транзакции, которая
+    создала отметку: остальные воркеры ждут её фиксации и обновляют агрегаты инкрементально, не удваивая счётчики.
+
+    :param db: сессия базы данных.
+    :param now: текущий момент (по умолчанию datetime.utcnow()).
+    """
+    now = now or datetime.utcnow()
+    watermark = read_watermark(db, ANALYTICS_WATERMARK)
+    if watermark is None:
+        if claim_watermark(db, ANALYTICS_WATERMARK, now):
+            backfill_rollups(db, now)
+            return
+        watermark = read_watermark(db, ANALYTICS_WATERMARK)
+    upto = now - timedelta(seconds=settings.ANALYTICS_ROLLUP_DELAY)
+    if upto <= watermark:
+        return
+    loans = BorrowedBooks.__table__
+    _add_loans(db, loans, loans.c.borrow_date > watermark, loans.c.borrow_date <= upto)
+    set_watermark(db, ANALYTICS_WATERMARK, upto)
+
+
+def update_rollups_job(session_factory=SessionLocal) -> None:
+    """Фоновая задача инкрементального обновления агрегатов аналитики."""
+    with session_factory() as db:
+        update_rollups(db)
+        db.commit()
+
+
+if __name__ == "__main__":
+    # Полный пересчёт агрегатов по существующим выдачам: python -m utils.analytics
+    with SessionLocal() as session:
+        backfill_rollups(session)
+        session.commit()
+    settings.logger.info("Агрегаты аналитики пересчитаны")
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import Subquery, delete, func, select, union_all
+from sqlalchemy.orm import Session
+
+from database.dialect import insert_for
+from database.models import BorrowedBooks, BorrowedBooksArchive
+from database.session import SessionLocal
+from config import settings
+
+# Общие столбцы borrowed_books и архива
+LOAN_COLUMNS = ("id", "book_id", "reader_id", "borrow_date", "due_date", "return_date")
+
+
+def all_loans(reader_id: Optional[int] = None) -> Subquery:
+    """
+    Все выдачи — текущие (borrowed_books) и архивные — как один подзапрос UNION ALL.
+
+    :param reader_id: если указан, фильтр по читателю применяется в каждой ветке (по индексам обеих таблиц).
+    :return: подзапрос со столбцами LOAN_COLUMNS.
+    """
+    branches = []
+    for table in (BorrowedBooks.__table__, BorrowedBooksArchive.__table__):
+        branch = select(*(table.c[name] for name in LOAN_COLUMNS))
+        if reader_id is not None:
+            branch = branch.where(table.c.reader_id == reader_id)
+        branches.append(branch)
+    return union_all(*branches).subquery("loans")
+
+
+def archive_loans(db: Session, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> int:
+    """
+    Переносит пачку выдач, возвращённых более ARCHIVE_AFTER_DAYS дней назад, в архив (без commit).
+
+    В borrowed_books остаются открытые и недавно закрытые выдачи, поэтому размер таблицы и её индексов
+    определяется текущим оборотом, а не всей историей.
+
+    Задача запускается на каждом воркере: пачка забирается через SELECT ... FOR UPDATE SKIP LOCKED,
+    поэтому параллельные воркеры переносят разные выдачи. Вставка в архив с ON CONFLICT DO NOTHING,
+    а удаляются только ещё не удалённые строки: в SQLite, где блокировок строк нет, второй воркер
+    после фиксации первого ничего не переносит повторно.
+
+    :param db: сессия базы данных.
+    :param now: текущий момент (по умолчанию datetime.utcnow()).
+    :param batch_size: максимальное количество выдач за вызов (по умолчанию ARCHIVE_BATCH_SIZE).
+    :return: количество перенесённых (удалённых из borrowed_books) выдач.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    hot = BorrowedBooks.__table__
+    # Выдача с наибольшим id не переносится: SQLite без AUTOINCREMENT иначе выдал бы её id повторно
+    newest = select(func.max(hot.c.id)).scalar_subquery()
+    ids = db.scalars(
+        select(hot.c.id)
+        .where(hot.c.return_date < cutoff, hot.c.id < newest)
+        .order_by(hot.c.id)
+        .limit(batch_size or settings.ARCHIVE_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not ids:
+        return 0
+    archive = BorrowedBooksArchive.__table__
+    db.execute(insert_for(db, archive).from_select(
+        list(LOAN_COLUMNS), select(*(hot.c[name] for name in LOAN_COLUMNS)).where(hot.c.id.in_(ids))
+    ).on_conflict_do_nothing(index_elements=[archive.c.id]))
+    return db.execute(delete(hot).where(hot.c.id.in_(ids))).rowcount
+
+
+def archive_loans_job(session_factory=SessionLocal) -> None:
+    """Фоновая задача переноса возвращённых выдач в архив (пачками, каждая в своей транзакции)."""
+    with session_factory() as db:
+        while True:
+            moved = archive_loans(db)
+            db.commit()
+            if moved < settings.ARCHIVE_BATCH_SIZE:
+                break
@@ -0,0 +1,172 @@
+import codecs
+import csv
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from config import settings
+from database.dialect import insert_for
+from database.models import Book
+from database.schemas import BookCreate
+from utils.cache import book_cache
+from utils.facets import apply_facet_deltas, book_deltas
+from utils.circulation import after_release, restock_copies
+from utils.inventory import add_copies
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """
+    Склеивает поток байтовых блоков в строки текста (UTF-8, BOM допускается).
+
+    :param chunks: итератор байтовых блоков тела запроса.
+    :return: итератор строк с сохранённым символом перевода строки.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+def iter_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, object]]:
+    """
+    Разбирает строки CSV (с заголовком) или NDJSON в записи.
+
+    Пустые значения CSV считаются отсутствующими. Строка NDJSON, которую не удалось разобрать,
+    возвращается как исключение вместо записи.
+
+    :param lines: итератор строк.
+    :param fmt: формат — csv или ndjson.
+    :return: итератор пар (номер строки данных, запись или исключение).
+    """
+    if fmt == "csv":
+        for number, record in enumerate(csv.DictReader(lines), start=1):
+            yield number, {key: value for key, value in record.items() if value not in ("", None)}
+    else:
+        number = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                yield number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, e
+
+
+def _write_batch(db: Session, books: List[Dict]) -> None:
+    """
+    Записывает пачку книг: с ISBN — upsert по isbn, без ISBN — обычная вставка.
+
+    :param db: сессия базы данных.
+    :param books: провалидированные данные книг.
+    """
+    # В одной пачке ISBN должен встречаться один раз, иначе ON CONFLICT обновит строку дважды
+    by_isbn = {book["isbn"]: book for book in books if book["isbn"] is not None}
+    without_isbn = [book for book in books if book["isbn"] is None]
+
+    deltas = defaultdict(lambda: [0, 0, 0])
+    if by_isbn:
+        # Прежние версии обновляемых книг вычитаются из фасетов, новые версии прибавляются
+        existing = db.execute(
+            select(Book.author, Book.year, Book.copies).where(Book.isbn.in_(list(by_isbn))).with_for_update()
+        ).all()
+        for row in existing:
+            book_deltas(row.author, row.year, row.copies, sign=-1, deltas=deltas)
+        stmt = insert_for(db, Book.__table__).values(list(by_isbn.values()))
+        # onupdate колонки updated_at к ON CONFLICT DO UPDATE не применяется, задаём явно
+        set_ = {column: stmt.excluded[column] for column in BookCreate.model_fields if column != "isbn"}
+        set_["updated_at"] = datetime.utcnow()
+        stmt = stmt.on_conflict_do_update(index_elements=[Book.isbn], set_=set_).returning(
+            Book.id, Book.author, Book.year, Book.copies
+        )
+        rows = db.execute(stmt).all()
+        for row in rows:
+            book_deltas(row.author, row.year, row.copies, deltas=deltas)
+        book_ids = [row.id for row in rows]
+        handed = restock_copies(db, {row.id: row.copies for row in rows})
+    else:
+        book_ids, handed = [], []
+    if without_isbn:
+        inserted = db.execute(insert(Book.__table__).returning(Book.id, Book.copies), without_isbn).all()
+        add_copies(db, dict(inserted))
+        for book in without_isbn:
+            book_deltas(book["author"], book["year"], book["copies"], deltas=deltas)
+    apply_facet_deltas(db, deltas)
+    db.commit()
+    # Новые книги в кэше отсутствуют, сбрасываем только обновлённые upsert'ом
+    for book_id in book_ids:
+        book_cache.delete(book_id)
+    after_release({hold.book_id for hold in handed}, handed)
+
+
+def import_books(
+    db: Session,
+    records: Iterable[Tuple[int, object]],
+    batch_size: int = settings.BOOK_IMPORT_BATCH_SIZE,
+    max_errors: int = settings.BOOK_IMPORT_MAX_ERRORS
+) -> dict:
+    """
+    Валидирует записи через BookCreate и пишет их в БД пачками по batch_size.
+
+    В памяти одновременно находится не больше одной пачки и не больше max_errors отчётов об ошибках,
+    остальные ошибки только подсчитываются.
+
+    :param db: сессия базы данных.
+    :param records: итератор пар (номер строки, запись).
+    :param batch_size: размер пачки для записи в БД.
+    :param max_errors: максимальное количество отчётов об ошибках в ответе.
+    :return: словарь для BookImportResult.
+    """
+    result = {"processed": 0, "imported": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+    def report(row: int, errors: List[str]) -> None:
+        result["failed"] += 1
+        if len(result["errors"]) < max_errors:
+            result["errors"].append({"row": row, "errors": errors})
+        else:
+            result["errors_truncated"] = True
+
+    batch: List[Tuple[int, Dict]] = []
+
+    def flush() -> None:
+        try:
+            _write_batch(db, [book for _, book in batch])
+        except SQLAlchemyError as e:
+            db.rollback()
+            for number, _ in batch:
+                report(number, [f"Ошибка записи в БД: {e.__class__.__name__}"])
+        else:
+            result["imported"] += len(batch)
+        batch.clear()
+
+    for number, record in records:
+        result["processed"] += 1
+        if isinstance(record, Exception):
+            report(number, [f"Некорректный JSON: {record}"])
+            continue
+        try:
+            book = BookCreate.model_validate(record)
+        except ValidationError as e:
+            report(number, [f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()])
+            continue
+        batch.append((number, book.model_dump()))
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    return result
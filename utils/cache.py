@@ -0,0 +1,332 @@
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.util import await_only
+
+from config import settings
+
+
+class CacheBackend:
+    """
+    Интерфейс кэша. Реализации: LRUCache (в памяти процесса), SharedCache (общее хранилище), NullCache.
+
+    Ключи — строки или числа, значения — JSON-совместимые объекты.
+    """
+
+    def get(self, key) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def add(self, key, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Записывает значение, только если ключа ещё нет (для чтения через кэш: не затирает более свежую запись,
+        положенную конкурентным обновлением).
+
+        :return: True, если значение записано.
+        """
+        raise NotImplementedError
+
+    def delete(self, key) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """
+    Потокобезопасный LRU-кэш в памяти процесса с ограничением размера и временем жизни записей.
+
+    :param max_size: максимальное количество записей, при превышении вытесняется самая давняя по обращению.
+    :param ttl: время жизни записи в секундах по умолчанию (None — без ограничения).
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: Optional[float] = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            self._evict()
+
+    def add(self, key, value: Any, ttl: Optional[float] = None) -> bool:
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > now):
+                return False
+            self._data[key] = (value, now + ttl if ttl is not None else None)
+            self._data.move_to_end(key)
+            self._evict()
+            return True
+
+    def _evict(self) -> None:
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class LocalSharedStore:
+    """
+    Локальная замена сетевого хранилища (совместима по интерфейсу с redis.Redis: get, set(ex=, nx=), delete,
+    incrby, expire, ttl).
+
+    Используется для разработки и тестов вместо настоящего общего хранилища: данные живут в памяти одного
+    процесса и между воркерами не разделяются.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._alive(name)
+            return entry[0] if entry else None
+
+    def _alive(self, name: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        entry = self._data.get(name)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[name]
+            return None
+        return entry
+
+    def set(self, name: str, value: bytes, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        with self._lock:
+            if nx and self._alive(name) is not None:
+                return None
+            self._data[name] = (value, time.monotonic() + ex if ex else None)
+            return True
+
+    def incrby(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            entry = self._alive(name)
+            value, expires_at = (int(entry[0]) + amount, entry[1]) if entry else (amount, None)
+            self._data[name] = (str(value).encode(), expires_at)
+            return value
+
+    def expire(self, name: str, time_: int) -> bool:
+        with self._lock:
+            entry = self._alive(name)
+            if entry is None:
+                return False
+            self._data[name] = (entry[0], time.monotonic() + time_)
+            return True
+
+    def ttl(self, name: str) -> int:
+        with self._lock:
+            entry = self._alive(name)
+            if entry is None:
+                return -2
+            if entry[1] is None:
+                return -1
+            return max(int(entry[1] - time.monotonic()), 0)
+
+    def delete(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._data.pop(name, None)
+
+    def keys(self, pattern: str = "*"):
+        prefix = pattern.rstrip("*")
+        with self._lock:
+            return [name for name in self._data if name.startswith(prefix)]
+
+
+class SharedCache(CacheBackend):
+    """
+    Кэш поверх общего для всех процессов хранилища (redis.Redis; LocalSharedStore — для разработки и тестов).
+
+    Значения сериализуются в JSON. Счётчики попаданий и промахов ведутся локально в процессе.
+
+    :param client: клиент хранилища с методами get, set(ex=), delete и keys.
+    :param prefix: префикс ключей.
+    :param ttl: время жизни записи в секундах.
+    """
+
+    def __init__(self, client, prefix: str = "cache:", ttl: Optional[float] = 300):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[Any]:
+        raw = self.client.get(f"{self.prefix}{key}")
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def _expiry(self, ttl: Optional[float]) -> Optional[int]:
+        # Redis принимает только целые секунды не меньше 1
+        ttl = self.ttl if ttl is None else ttl
+        return max(1, math.ceil(ttl)) if ttl else None
+
+    def set(self, key, value: Any, ttl: Optional[float] = None) -> None:
+        self.client.set(f"{self.prefix}{key}", json.dumps(value, default=str).encode(), ex=self._expiry(ttl))
+
+    def add(self, key, value: Any, ttl: Optional[float] = None) -> bool:
+        return bool(self.client.set(f"{self.prefix}{key}", json.dumps(value, default=str).encode(),
+                                    ex=self._expiry(ttl), nx=True))
+
+    def delete(self, key) -> None:
+        self.client.delete(f"{self.prefix}{key}")
+
+    def clear(self) -> None:
+        keys = self.client.keys(f"{self.prefix}*")
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "shared", "hits": self.hits, "misses": self.misses}
+
+
+class NullCache(CacheBackend):
+    """Выключенный кэш: всегда промах."""
+
+    def __init__(self):
+        self.misses = 0
+
+    def get(self, key) -> Optional[Any]:
+        self.misses += 1
+        return None
+
+    def set(self, key, value: Any, ttl: Optional[float] = None) -> None:
+        pass
+
+    def add(self, key, value: Any, ttl: Optional[float] = None) -> bool:
+        return False
+
+    def delete(self, key) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "none", "misses": self.misses}
+
+
+class ThreadpoolCache(CacheBackend):
+    """
+    Кэш для кода, выполняемого через AsyncSession.run_sync (асинхронные маршруты): обращения к хранилищу
+    уходят в пул потоков (run_in_threadpool), а greenlet run_sync ждёт их через await_only, поэтому сетевой
+    ввод-вывод Redis не блокирует поток event loop. Вне run_sync не используется.
+
+    :param cache: кэш, к которому обращается обёртка.
+    """
+
+    def __init__(self, cache: CacheBackend):
+        self.cache = cache
+
+    def _call(self, method: str, *args, **kwargs):
+        return await_only(run_in_threadpool(getattr(self.cache, method), *args, **kwargs))
+
+    def get(self, key) -> Optional[Any]:
+        return self._call("get", key)
+
+    def set(self, key, value: Any, ttl: Optional[float] = None) -> None:
+        self._call("set", key, value, ttl)
+
+    def add(self, key, value: Any, ttl: Optional[float] = None) -> bool:
+        return self._call("add", key, value, ttl)
+
+    def delete(self, key) -> None:
+        self._call("delete", key)
+
+    def clear(self) -> None:
+        self._call("clear")
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+
+def build_cache(backend: str, prefix: str, max_size: int, ttl: Optional[float], url: str = "") -> CacheBackend:
+    """
+    Создаёт кэш по имени бэкенда из настроек.
+
+    :param backend: memory, shared или none.
+    :param prefix: префикс ключей для общего хранилища.
+    :param max_size: максимальный размер LRU-кэша.
+    :param ttl: время жизни записи в секундах.
+    :param url: адрес Redis для shared (нужен пакет redis, requirements-redis.txt); пусто — LocalSharedStore
+        в памяти процесса.
+    :return: экземпляр кэша.
+    """
+    if backend == "memory":
+        return LRUCache(max_size=max_size, ttl=ttl)
+    if backend == "shared":
+        if url:
+            import redis
+            return SharedCache(redis.Redis.from_url(url), prefix=prefix, ttl=ttl)
+        return SharedCache(LocalSharedStore(), prefix=prefix, ttl=ttl)
+    if backend == "none":
+        return NullCache()
+    raise ValueError(f"Неизвестный бэкенд кэша: {backend}")
+
+
+# Кэш отдельных книг для /book/read/{book_id}: ключ — id книги, значение — поля BookResponse
+book_cache = build_cache(
+    settings.BOOK_CACHE_BACKEND, "book:", settings.BOOK_CACHE_SIZE, settings.BOOK_CACHE_TTL, settings.BOOK_CACHE_URL
+)
+# Тот же кэш для асинхронных маршрутов: общее хранилище — через пул потоков, кэш в памяти процесса — напрямую
+async_book_cache = ThreadpoolCache(book_cache) if isinstance(book_cache, SharedCache) else book_cache
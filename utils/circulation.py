@@ -0,0 +1,202 @@
+import asyncio
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from database.models import Book, Hold
+from database.session import SessionLocal
+from utils.inventory import (
+    COPY_AVAILABLE, COPY_LOANED, COPY_RESERVED, add_copies, copies_sync, move_copies, trim_available_copies
+)
+from config import settings
+
+# Статусы брони
+HOLD_WAITING = "waiting"
+HOLD_READY = "ready"
+HOLD_FULFILLED = "fulfilled"
+HOLD_CANCELLED = "cancelled"
+HOLD_EXPIRED = "expired"
+
+
+def hand_off(db: Session, counts: Dict[int, int]) -> List[Row]:
+    """
+    Откладывает освободившиеся экземпляры для первых в очереди: по каждой книге до counts[book_id]
+    самых ранних броней в статусе waiting переводятся в ready одним UPDATE. Экземпляр ждёт читателя
+    HOLD_PICKUP_DAYS дней (ready_until), затем его забирает expire_holds.
+
+    Вызывается после блокировки строк книг (lock_books), поэтому параллельные возвраты одной книги
+    не отдают один экземпляр дважды.
+
+    :param db: сессия базы данных.
+    :param counts: количество освободившихся экземпляров по id книги.
+    :return: строки (id, book_id, reader_id) броней, получивших экземпляр.
+    """
+    ranked = select(
+        Hold.id,
+        Hold.book_id,
+        func.row_number().over(partition_by=Hold.book_id, order_by=(Hold.created_at, Hold.id)).label("position")
+    ).where(Hold.book_id.in_(list(counts)), Hold.status == HOLD_WAITING).subquery()
+    heads = select(ranked.c.id).where(ranked.c.position <= case(counts, value=ranked.c.book_id, else_=0))
+    now = datetime.utcnow()
+    return db.execute(
+        update(Hold.__table__)
+        .where(Hold.id.in_(heads), Hold.status == HOLD_WAITING)
+        .values(status=HOLD_READY, ready_at=now, ready_until=now + timedelta(days=settings.HOLD_PICKUP_DAYS))
+        .returning(Hold.id, Hold.book_id, Hold.reader_id)
+    ).all()
+
+
+def lock_books(db: Session, book_ids: Iterable[int]) -> None:
+    """
+    Блокирует строки книг (FOR NO KEY UPDATE) при возврате экземпляров в оборот.
+
+    Возвраты одной книги выполняются по очереди (очередь броней не теряет экземпляр), а с постановкой
+    в очередь (FOR UPDATE) не разминутся: бронь увидит свободный экземпляр или возврат увидит бронь.
+    Выдачи строку книги не блокируют (вставка выдачи берёт только FOR KEY SHARE по внешнему ключу).
+
+    :param db: сессия базы данных.
+    :param book_ids: идентификаторы книг.
+    """
+    db.execute(select(Book.id).where(Book.id.in_(sorted(book_ids))).order_by(Book.id).with_for_update(key_share=True))
+
+
+def release_copies(db: Session, counts: Dict[int, int], source: Optional[str] = COPY_LOANED) -> List[Row]:
+    """
+    Возвращает экземпляры в оборот (возврат книги, отмена отложенной брони, пополнение каталога): экземпляры
+    сначала отдаются очереди броней (статус reserved), остальные становятся доступными.
+
+    Если экземпляров в статусе source не хватает (данные до ведения учёта экземпляров), недостающие создаются.
+
+    :param db: сессия базы данных.
+    :param counts: количество освободившихся экземпляров по id книги.
+    :param source: текущий статус освобождаемых экземпляров; None — новые экземпляры, они создаются сразу.
+    :return: брони, получившие экземпляр.
+    """
+    lock_books(db, counts)
+    handed = hand_off(db, counts)
+    reserved = Counter(hold.book_id for hold in handed)
+    missing = defaultdict(Counter)
+    for book_id, count in sorted(counts.items()):
+        for target, needed in ((COPY_RESERVED, reserved[book_id]), (COPY_AVAILABLE, count - reserved[book_id])):
+            if needed <= 0:
+                continue
+            if target == source:
+                moved = needed
+            else:
+                moved = move_copies(db, book_id, needed, source, target) if source is not None else 0
+            missing[target][book_id] = needed - moved
+    for target, books in missing.items():
+        add_copies(db, +books, status=target)
+    return handed
+
+
+def restock_copies(db: Session, targets: Dict[int, int]) -> List[Row]:
+    """
+    Доводит количество доступных экземпляров книг до заданного при изменении copies из каталога (без commit):
+    лишние доступные удаляются, недостающие добавляются через release_copies, поэтому новые экземпляры
+    сначала откладываются для ожидающих броней, как при возврате.
+
+    :param db: сессия базы данных.
+    :param targets: требуемое количество доступных экземпляров по id книги.
+    :return: брони, получившие экземпляр.
+    """
+    lock_books(db, targets)
+    added = trim_available_copies(db, targets)
+    return release_copies(db, added, source=None) if added else []
+
+
+def after_release(released: Iterable[int], handed: List[Row]) -> None:
+    """
+    Итог release_copies после фиксации транзакции: пересчёт copies освободившихся книг
+    и пробуждение ожидающих броней.
+
+    :param released: id книг, экземпляры которых вернулись в оборот.
+    :param handed: брони, получившие экземпляр.
+    """
+    copies_sync.mark(released)
+    for hold in handed:
+        hold_notifier.notify(hold.id)
+
+
+def expire_holds(db: Session, now: Optional[datetime] = None) -> Tuple[List[Row], List[Row]]:
+    """
+    Переводит брони, экземпляр по которым не забрали до ready_until, в статус expired и передаёт
+    их экземпляры следующим в очереди или возвращает в доступные (без commit).
+
+    Выдача по брони и истечение меняют статус одним условным UPDATE, поэтому экземпляр достаётся
+    только одному из них.
+
+    :param db: сессия базы данных.
+    :param now: текущий момент (по умолчанию datetime.utcnow()).
+    :return: истёкшие брони (id, book_id) и брони, получившие их экземпляры.
+    """
+    expired = db.execute(
+        update(Hold.__table__)
+        .where(Hold.status == HOLD_READY, Hold.ready_until <= (now or datetime.utcnow()))
+        .values(status=HOLD_EXPIRED)
+        .returning(Hold.id, Hold.book_id)
+    ).all()
+    if not expired:
+        return [], []
+    handed = release_copies(db, Counter(hold.book_id for hold in expired), source=COPY_RESERVED)
+    return expired, handed
+
+
+def expire_holds_job(session_factory=SessionLocal) -> None:
+    """Фоновая задача истечения неполученных броней."""
+    with session_factory() as db:
+        expired, handed = expire_holds(db)
+        db.commit()
+    for hold in expired:
+        hold_notifier.notify(hold.id)
+    after_release({hold.book_id for hold in expired}, handed)
+
+
+class HoldNotifier:
+    """
+    Пробуждение ожидающих (long-poll) запросов при изменении статуса брони в этом процессе.
+
+    Изменения из других процессов ожидающий запрос замечает при периодической перепроверке в БД.
+    """
+
+    def __init__(self):
+        self._waiters: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, hold_id: int) -> asyncio.Event:
+        """
+        Подписывает текущий event loop на изменения брони.
+
+        :param hold_id: идентификатор брони.
+        :return: событие, устанавливаемое при изменении брони.
+        """
+        event = asyncio.Event()
+        with self._lock:
+            self._waiters[hold_id].add((asyncio.get_running_loop(), event))
+        return event
+
+    def unsubscribe(self, hold_id: int, event: asyncio.Event) -> None:
+        with self._lock:
+            waiters = self._waiters.get(hold_id, set())
+            waiters.difference_update({waiter for waiter in waiters if waiter[1] is event})
+            if not waiters:
+                self._waiters.pop(hold_id, None)
+
+    def notify(self, hold_id: int) -> None:
+        """
+        Будит подписчиков брони (можно вызывать из любого потока).
+
+        :param hold_id: идентификатор брони.
+        """
+        with self._lock:
+            waiters = list(self._waiters.get(hold_id, ()))
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+
+hold_notifier = HoldNotifier()
@@ -2,7 +2,11 @@ from fastapi import Header, HTTPException, status
 from jose.exceptions import JWTError
 from typing import Optional
 
-from .jwt import jwt_handler
+from .jwt import token_cache
+from .revocation import revocation_list
+
+# Обязательные claims access-токена
+ACCESS_CLAIMS = ("sub", "exp", "jti")
 
 def get_user(authorization: Optional[str] = Header(default=None)) -> dict:
     """
@@ -11,13 +15,21 @@ def get_user(authorization: Optional[str] = Header(default=None)) -> dict:
     :param authorization: Заголовок Authorization, который может быть None
     :return: Информация о пользователе, если он авторизован
     :raises HTTPException: 401, если пользователь не авторизован
+
+    Проверенные токены кэшируются (token_cache): подпись повторно не проверяется до exp токена.
+    Отзыв проверяется по списку в памяти процесса (revocation_list), без запроса к БД. Refresh-токены
+    и токены старого формата (без exp и jti) не принимаются.
     """
     if authorization is None or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Необходима авторизация")
     token = authorization.split(" ")[1]
     try:
-        payload = jwt_handler.verify_token(token)
+        payload = token_cache.verify(token)
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Токен недействителен")
+    if "typ" in payload or any(claim not in payload for claim in ACCESS_CLAIMS):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Токен недействителен")
+    if revocation_list.is_revoked(payload["jti"]):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Токен отозван")
     return payload
 
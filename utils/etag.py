@@ -0,0 +1,41 @@
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Response
+
+
+def make_etag(*parts) -> str:
+    """
+    Строгий ETag из версии данных (идентификаторы, отметки updated_at, счётчики).
+
+    :param parts: значения, однозначно определяющие версию представления.
+    :return: ETag в кавычках.
+    """
+    raw = "|".join(part.isoformat() if isinstance(part, datetime) else str(part) for part in parts)
+    return f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Проверяет заголовок If-None-Match (список ETag через запятую или *) против текущего ETag.
+
+    :param if_none_match: значение заголовка If-None-Match.
+    :param etag: текущий ETag ресурса.
+    :return: True, если клиент уже имеет актуальную версию.
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # If-None-Match использует слабое сравнение: префикс W/ не учитывается
+    return "*" in candidates or etag in (candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Ответ 304 Not Modified без тела.
+
+    :param etag: текущий ETag ресурса.
+    :return: ответ 304.
+    """
+    return Response(status_code=304, headers={"ETag": etag})
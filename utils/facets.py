@@ -0,0 +1,147 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+from database.dialect import insert_for
+from database.models import CatalogFacet
+
+# Ключ фасета (facet, value) -> приращения (titles, copies, available_titles)
+FacetDeltas = Dict[Tuple[str, str], List[int]]
+
+# Полный пересчёт фасетов из books (используется миграцией и rebuild_facets).
+# Итог по каталогу отдельной строкой не хранится: её обновляла бы каждая запись в каталог (read_facet_total)
+REBUILD_FACETS_SQL = [
+    "INSERT INTO catalog_facets (facet, value, titles, copies, available_titles) "
+    "SELECT 'author', author, count(*), sum(copies), sum(CASE WHEN copies > 0 THEN 1 ELSE 0 END) "
+    "FROM books GROUP BY author",
+    "INSERT INTO catalog_facets (facet, value, titles, copies, available_titles) "
+    "SELECT 'decade', coalesce(CAST((year / 10) * 10 AS VARCHAR), ''), count(*), sum(copies), "
+    "sum(CASE WHEN copies > 0 THEN 1 ELSE 0 END) "
+    "FROM books GROUP BY coalesce(CAST((year / 10) * 10 AS VARCHAR), '')",
+]
+
+
+def decade(year: Optional[int]) -> str:
+    """
+    Десятилетие издания (как в SQL: целочисленное деление с отбрасыванием дробной части).
+
+    :param year: год издания.
+    :return: строка десятилетия или пустая строка, если год неизвестен.
+    """
+    return str(int(year / 10) * 10) if year is not None else ""
+
+
+def book_deltas(author: str, year: Optional[int], copies: int, sign: int = 1, deltas: Optional[FacetDeltas] = None) -> FacetDeltas:
+    """
+    Вклад книги в фасеты: sign=1 — книга добавлена, sign=-1 — удалена.
+
+    Изменение книги выражается как вычитание старой версии и добавление новой.
+
+    :param author: автор.
+    :param year: год издания.
+    :param copies: количество доступных экземпляров.
+    :param sign: знак вклада.
+    :param deltas: накопитель, в который добавляется вклад (по умолчанию новый).
+    :return: накопитель приращений.
+    """
+    deltas = deltas if deltas is not None else defaultdict(lambda: [0, 0, 0])
+    for key in (("author", author), ("decade", decade(year))):
+        delta = deltas[key]
+        delta[0] += sign
+        delta[1] += sign * copies
+        delta[2] += sign * (1 if copies > 0 else 0)
+    return deltas
+
+
+def copies_deltas(author: str, year: Optional[int], old_copies: int, new_copies: int, deltas: Optional[FacetDeltas] = None) -> FacetDeltas:
+    """
+    Вклад изменения количества доступных экземпляров (выдача, возврат).
+
+    :param author: автор.
+    :param year: год издания.
+    :param old_copies: количество экземпляров до изменения.
+    :param new_copies: количество экземпляров после изменения.
+    :param deltas: накопитель, в который добавляется вклад (по умолчанию новый).
+    :return: накопитель приращений.
+    """
+    deltas = deltas if deltas is not None else defaultdict(lambda: [0, 0, 0])
+    available = (1 if new_copies > 0 else 0) - (1 if old_copies > 0 else 0)
+    for key in (("author", author), ("decade", decade(year))):
+        delta = deltas[key]
+        delta[1] += new_copies - old_copies
+        delta[2] += available
+    return deltas
+
+
+def apply_facet_deltas(db: Session, deltas: FacetDeltas) -> None:
+    """
+    Применяет приращения к catalog_facets одним upsert-запросом (без commit).
+
+    :param db: сессия базы данных.
+    :param deltas: приращения по ключам фасетов.
+    """
+    rows = [
+        {"facet": facet, "value": value, "titles": titles, "copies": copies, "available_titles": available}
+        for (facet, value), (titles, copies, available) in deltas.items()
+        if titles or copies or available
+    ]
+    if not rows:
+        return
+    stmt = insert_for(db, CatalogFacet.__table__).values(rows)
+    table = CatalogFacet.__table__
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.facet, table.c.value],
+        set_={
+            "titles": table.c.titles + stmt.excluded.titles,
+            "copies": table.c.copies + stmt.excluded.copies,
+            "available_titles": table.c.available_titles + stmt.excluded.available_titles,
+        }
+    ))
+
+
+def rebuild_facets(db: Session) -> None:
+    """
+    Полный пересчёт фасетов по таблице books (исправляет возможное расхождение, без commit).
+
+    :param db: сессия базы данных.
+    """
+    db.execute(delete(CatalogFacet))
+    for statement in REBUILD_FACETS_SQL:
+        db.execute(text(statement))
+
+
+def read_facets(db: Session, facet: str, limit: int) -> List[CatalogFacet]:
+    """
+    Значения фасета по убыванию количества книг. Читает только предрассчитанные строки.
+
+    :param db: сессия базы данных.
+    :param facet: тип фасета.
+    :param limit: максимальное количество значений.
+    :return: список строк catalog_facets.
+    """
+    stmt = (
+        select(CatalogFacet)
+        .where(CatalogFacet.facet == facet, CatalogFacet.titles > 0)
+        .order_by(CatalogFacet.titles.desc(), CatalogFacet.value)
+        .limit(limit)
+    )
+    return list(db.scalars(stmt))
+
+
+def read_facet_total(db: Session) -> CatalogFacet:
+    """
+    Итог по каталогу — сумма строк фасета decade (каждая книга входит ровно в одно десятилетие).
+
+    :param db: сессия базы данных.
+    :return: несохраняемая строка фасета all.
+    """
+    row = db.execute(
+        select(
+            func.coalesce(func.sum(CatalogFacet.titles), 0),
+            func.coalesce(func.sum(CatalogFacet.copies), 0),
+            func.coalesce(func.sum(CatalogFacet.available_titles), 0)
+        ).where(CatalogFacet.facet == "decade")
+    ).one()
+    return CatalogFacet(facet="all", value="", titles=row[0], copies=row[1], available_titles=row[2])
@@ -0,0 +1,34 @@
+from typing import Iterable, List, Mapping, Optional, Sequence
+
+from fastapi import HTTPException
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str], required: Sequence[str] = ("id",)) -> Optional[List[str]]:
+    """
+    Разбирает параметр fields=a,b,c (sparse fieldset) и проверяет имена полей.
+
+    :param fields: значение параметра fields или None (все поля).
+    :param allowed: допустимые имена полей.
+    :param required: поля, которые добавляются всегда (например, id).
+    :return: список полей в порядке запроса или None, если параметр не передан.
+    :raises HTTPException: 400, если запрошено неизвестное поле.
+    """
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    allowed = list(allowed)
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Неизвестные поля: {', '.join(unknown)}. Допустимые: {', '.join(allowed)}")
+    return [name for name in required if name not in names] + names
+
+
+def project(data: Mapping, names: Sequence[str]) -> dict:
+    """
+    Оставляет в записи только запрошенные поля.
+
+    :param data: запись (словарь или RowMapping).
+    :param names: имена полей.
+    :return: словарь с выбранными полями.
+    """
+    return {name: data[name] for name in names}
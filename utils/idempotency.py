@@ -0,0 +1,141 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from database.dialect import insert_for
+from database.models import IdempotencyKey
+from database.session import SessionLocal
+from utils.cache import LRUCache
+from utils.dependencies import get_user
+from config import settings
+
+# Максимальная длина заголовка Idempotency-Key
+MAX_KEY_LENGTH = 255
+
+# Сохранённые ответы в памяти процесса: повтор, попавший в тот же процесс, обслуживается без запроса к БД
+idempotency_cache = LRUCache(max_size=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_TTL)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class IdempotentRequest:
+    """
+    Запрос с необязательным заголовком Idempotency-Key.
+
+    Ответ сохраняется в idempotency_keys в той же транзакции, что и изменения запроса: повтор после успешного
+    выполнения получает сохранённый ответ, а повтор после отката выполняется заново.
+
+    :param key: хэш ключа вместе с пользователем и эндпоинтом (None — заголовок не передан).
+    :param fingerprint: хэш тела запроса.
+    """
+
+    def __init__(self, key: Optional[str], fingerprint: Optional[str] = None):
+        self.key = key
+        self.fingerprint = fingerprint
+
+    def replay(self, db: Session) -> Optional[JSONResponse]:
+        """
+        Сохранённый ответ на этот ключ: сначала из кэша процесса, затем из idempotency_keys.
+        Бизнес-таблицы не читаются.
+
+        :param db: сессия базы данных.
+        :return: ответ с заголовком Idempotent-Replayed или None, если запрос с ключом ещё не выполнялся.
+        :raises HTTPException: 422, если ключ уже использован с другим телом запроса.
+        """
+        if self.key is None:
+            return None
+        entry = idempotency_cache.get(self.key)
+        if entry is None:
+            now = datetime.utcnow()
+            row = db.execute(
+                select(IdempotencyKey.fingerprint, IdempotencyKey.response, IdempotencyKey.expires_at)
+                .where(IdempotencyKey.key == self.key, IdempotencyKey.expires_at > now)
+            ).first()
+            if row is None:
+                return None
+            entry = {"fingerprint": row.fingerprint, "response": json.loads(row.response)}
+            idempotency_cache.set(self.key, entry, ttl=(row.expires_at - now).total_seconds())
+        if entry["fingerprint"] != self.fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key уже использован для другого запроса")
+        return JSONResponse(entry["response"], headers={"Idempotent-Replayed": "true"})
+
+    def commit(self, db: Session, response: dict) -> dict:
+        """
+        Сохраняет ответ по ключу и фиксирует транзакцию запроса.
+
+        Ключ вставляется через INSERT ... ON CONFLICT DO UPDATE WHERE expires_at <= now (просроченная запись,
+        ещё не удалённая очисткой, перезаписывается). Параллельный повтор с тем же ключом ждёт фиксации
+        первой попытки на строке ключа и откатывается целиком, поэтому изменения не выполняются дважды.
+
+        :param db: сессия базы данных.
+        :param response: тело успешного ответа.
+        :return: тело ответа.
+        :raises HTTPException: 409, если запрос с этим ключом выполнен параллельно.
+        """
+        if self.key is None:
+            db.commit()
+            return response
+        now = datetime.utcnow()
+        body = jsonable_encoder(response)
+        table = IdempotencyKey.__table__
+        values = {
+            "key": self.key,
+            "fingerprint": self.fingerprint,
+            "response": json.dumps(body),
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_TTL),
+        }
+        stmt = insert_for(db, table).values(**values)
+        stored = db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={name: stmt.excluded[name] for name in values if name != "key"},
+            where=table.c.expires_at <= now
+        )).rowcount
+        if not stored:
+            db.rollback()
+            raise HTTPException(
+                status_code=409, detail="Запрос с этим Idempotency-Key выполняется параллельно, повторите его позже"
+            )
+        db.commit()
+        idempotency_cache.set(self.key, {"fingerprint": self.fingerprint, "response": body})
+        return response
+
+
+async def idempotent_request(
+    request: Request,
+    idempotency_key: Optional[str] = Header(default=None),
+    user: dict = Depends(get_user)
+) -> IdempotentRequest:
+    """
+    Зависимость для эндпоинтов, поддерживающих заголовок Idempotency-Key.
+
+    Ключ действует в пределах пользователя и эндпоинта; тело запроса запоминается по хэшу.
+
+    :param request: запрос.
+    :param idempotency_key: заголовок Idempotency-Key.
+    :param user: авторизованный пользователь (JWT).
+    :return: IdempotentRequest (без ключа, если заголовок не передан).
+    :raises HTTPException: 400, если ключ пустой или длиннее MAX_KEY_LENGTH.
+    """
+    if idempotency_key is None:
+        return IdempotentRequest(None)
+    if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key должен содержать от 1 до {MAX_KEY_LENGTH} символов")
+    scope = f"{user.get('sub')}\n{request.method} {request.url.path}\n{idempotency_key}"
+    return IdempotentRequest(_digest(scope.encode()), _digest(await request.body()))
+
+
+def purge_idempotency_keys_job(session_factory=SessionLocal) -> None:
+    """Фоновая задача удаления просроченных ключей идемпотентности."""
+    with session_factory() as db:
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
+        db.commit()
@@ -0,0 +1,173 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from database.models import Book, BookCopy
+from database.session import SessionLocal
+from utils.cache import book_cache
+from utils.facets import apply_facet_deltas, copies_deltas, rebuild_facets
+
+# Статусы экземпляра книги
+COPY_AVAILABLE = "available"
+COPY_LOANED = "loaned"
+COPY_RESERVED = "reserved"
+
+
+def move_copies(db: Session, book_id: int, count: int, source: str, target: str) -> int:
+    """
+    Переводит до count экземпляров книги из статуса source в target одним UPDATE.
+
+    Экземпляры выбираются через SELECT ... FOR UPDATE SKIP LOCKED: параллельные выдачи одной книги
+    забирают разные строки экземпляров и не ждут друг друга (в SQLite записи и так последовательны).
+
+    :param db: сессия базы данных.
+    :param book_id: идентификатор книги.
+    :param count: количество экземпляров.
+    :param source: исходный статус.
+    :param target: новый статус.
+    :return: количество переведённых экземпляров (меньше count, если подходящих свободных строк не хватило).
+    """
+    picked = (
+        select(BookCopy.id)
+        .where(BookCopy.book_id == book_id, BookCopy.status == source)
+        .limit(count)
+        .with_for_update(skip_locked=True)
+    )
+    return db.execute(
+        update(BookCopy.__table__).where(BookCopy.id.in_(picked), BookCopy.status == source).values(status=target)
+    ).rowcount
+
+
+def add_copies(db: Session, counts: Dict[int, int], status: str = COPY_AVAILABLE) -> None:
+    """
+    Добавляет экземпляры книг одним INSERT (без commit).
+
+    :param db: сессия базы данных.
+    :param counts: количество новых экземпляров по id книги.
+    :param status: статус новых экземпляров.
+    """
+    rows = [{"book_id": book_id, "status": status} for book_id, count in counts.items() for _ in range(count)]
+    if rows:
+        db.execute(insert(BookCopy.__table__), rows)
+
+
+def trim_available_copies(db: Session, targets: Dict[int, int]) -> Dict[int, int]:
+    """
+    Удаляет доступные экземпляры сверх заданного количества (изменение copies из каталога, без commit)
+    и возвращает, сколько экземпляров не хватает. Выданные и отложенные не затрагиваются; недостающие
+    добавляет circulation.restock_copies, чтобы они сначала достались очереди броней.
+
+    :param db: сессия базы данных.
+    :param targets: требуемое количество доступных экземпляров по id книги.
+    :return: количество недостающих экземпляров по id книги (только книги, где их не хватает).
+    """
+    current = dict(db.execute(
+        select(BookCopy.book_id, func.count())
+        .where(BookCopy.book_id.in_(list(targets)), BookCopy.status == COPY_AVAILABLE)
+        .group_by(BookCopy.book_id)
+    ).all())
+    for book_id, target in targets.items():
+        surplus = current.get(book_id, 0) - target
+        if surplus > 0:
+            picked = (
+                select(BookCopy.id)
+                .where(BookCopy.book_id == book_id, BookCopy.status == COPY_AVAILABLE)
+                .limit(surplus)
+                .with_for_update(skip_locked=True)
+            )
+            db.execute(delete(BookCopy.__table__).where(BookCopy.id.in_(picked)))
+    return {
+        book_id: target - current.get(book_id, 0)
+        for book_id, target in targets.items() if target > current.get(book_id, 0)
+    }
+
+
+def sync_copies(db: Session, book_ids: Optional[Iterable[int]] = None) -> List[int]:
+    """
+    Пересчитывает кэшированное books.copies по доступным экземплярам и применяет изменения к фасетам (без commit).
+
+    :param db: сессия базы данных.
+    :param book_ids: книги для пересчёта (по умолчанию все).
+    :return: id книг, у которых copies изменилось.
+    """
+    available = select(func.count()).where(
+        BookCopy.book_id == Book.id, BookCopy.status == COPY_AVAILABLE
+    ).correlate(Book).scalar_subquery()
+    stmt = select(Book.id, Book.author, Book.year, Book.copies, available.label("available")).order_by(Book.id)
+    if book_ids is not None:
+        stmt = stmt.where(Book.id.in_(list(book_ids)))
+    changed = [row for row in db.execute(stmt.with_for_update(of=Book)).all() if row.copies != row.available]
+    if not changed:
+        return []
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for row in changed:
+        copies_deltas(row.author, row.year, row.copies, row.available, deltas)
+    counts = {row.id: row.available for row in changed}
+    db.execute(update(Book.__table__).where(Book.id.in_(list(counts))).values(copies=case(counts, value=Book.id)))
+    apply_facet_deltas(db, deltas)
+    return [row.id for row in changed]
+
+
+class CopiesSync:
+    """
+    Книги, у которых изменилось количество доступных экземпляров (выдача, возврат, бронь).
+
+    Выдача и возврат меняют только строки экземпляров и не трогают строку книги: кэшированное books.copies
+    и фасеты пересчитываются фоновой задачей раз в COPIES_SYNC_INTERVAL секунд сразу для всех накопленных книг.
+    Отметки живут только в памяти процесса: потерянные при падении догоняет rebuild_catalog_job.
+    До пересчёта книга (в кэше и в БД) отдаётся с прежним copies и прежним ETag.
+    """
+
+    def __init__(self):
+        self._books: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def mark(self, book_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._books.update(book_ids)
+
+    def drain(self) -> Set[int]:
+        with self._lock:
+            books, self._books = self._books, set()
+        return books
+
+    def flush(self, session_factory=SessionLocal) -> None:
+        """
+        Пересчитывает накопленные книги; при ошибке возвращает их в очередь.
+
+        :param session_factory: фабрика сессий.
+        """
+        book_ids = self.drain()
+        if not book_ids:
+            return
+        try:
+            with session_factory() as db:
+                changed = sync_copies(db, sorted(book_ids))
+                db.commit()
+        except Exception:
+            self.mark(book_ids)
+            raise
+        for book_id in changed:
+            book_cache.delete(book_id)
+
+
+def rebuild_catalog_job(session_factory=SessionLocal) -> None:
+    """
+    Фоновая задача полного пересчёта copies всех книг и фасетов каталога (при запуске и раз в FACETS_REBUILD_INTERVAL).
+
+    Строки книг блокируются по порядку id, поэтому пересчёты нескольких воркеров выполняются друг за другом.
+    """
+    with session_factory() as db:
+        # Полный пересчёт учитывает все закоммиченные изменения экземпляров
+        copies_sync.drain()
+        changed = sync_copies(db)
+        rebuild_facets(db)
+        db.commit()
+    for book_id in changed:
+        book_cache.delete(book_id)
+
+
+copies_sync = CopiesSync()
@@ -1,5 +1,16 @@
+import hashlib
+import secrets
+import threading
+import time
+from typing import Any, Dict, Optional
+
 from jose import jwt
 from config import settings
+from utils.cache import LRUCache
+
+# Типы токенов; у access-токена claim typ не передаётся, чтобы не увеличивать его размер
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
 
 
 class JWT:
@@ -28,5 +39,99 @@ class JWT:
         :return: словарь с данными из токена
         """
         return jwt.decode(token, self.secret_key, algorithms=self.algorithm)
+
+    def issue_token(self, subject: int, ttl: float, token_type: Optional[str] = None) -> str:
+        """
+        Генерация компактного токена: идентификатор пользователя (sub), срок действия (exp) и идентификатор
+        токена для отзыва (jti)
+
+        :param subject: идентификатор пользователя
+        :param ttl: время жизни токена в секундах
+        :param token_type: тип токена (claim typ), None — access-токен
+
+        :return: JWT токен
+        """
+        payload = {"sub": str(subject), "exp": int(time.time() + ttl), "jti": secrets.token_urlsafe(12)}
+        if token_type is not None:
+            payload["typ"] = token_type
+        return self.generate_token(payload)
     
-jwt_handler = JWT(secret_key=settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
\ No newline at end of file
+jwt_handler = JWT(secret_key=settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+class VerifiedTokenCache:
+    """
+    Кэш проверенных токенов: дайджест токена -> claims.
+
+    Подпись одного и того же токена проверяется один раз, повторные запросы с ним берут claims из LRU-кэша.
+    Запись живёт до exp токена (но не дольше ttl), отозванный токен удаляется из кэша через revoke.
+
+    :param handler: JWT для проверки токенов.
+    :param max_size: максимальное количество токенов в кэше.
+    :param ttl: максимальное время жизни записи в секундах.
+    """
+
+    def __init__(self, handler: JWT, max_size: int, ttl: float):
+        self.handler = handler
+        self.ttl = ttl
+        self._cache = LRUCache(max_size=max_size, ttl=ttl)
+        self._lock = threading.Lock()
+        self.decodes = 0
+        self.decode_seconds = 0.0
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def verify(self, token: str) -> dict:
+        """
+        Проверка JWT токена с кэшированием результата
+
+        :param token: JWT токен
+
+        :return: словарь с данными из токена
+        :raises JWTError: если токен недействителен (ошибки не кэшируются)
+        """
+        key = self._digest(token)
+        claims = self._cache.get(key)
+        if claims is not None:
+            return claims
+        started = time.perf_counter()
+        try:
+            claims = self.handler.verify_token(token)
+        finally:
+            with self._lock:
+                self.decodes += 1
+                self.decode_seconds += time.perf_counter() - started
+        ttl = self.ttl
+        if "exp" in claims:
+            ttl = min(ttl, claims["exp"] - time.time())
+        if ttl > 0:
+            self._cache.set(key, claims, ttl=ttl)
+        return claims
+
+    def revoke(self, token: str) -> None:
+        """
+        Удаляет токен из кэша (хук отзыва токена).
+
+        :param token: JWT токен
+        """
+        self._cache.delete(self._digest(token))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        with self._lock:
+            decodes, decode_seconds = self.decodes, self.decode_seconds
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+            "decodes": decodes,
+            "decode_ms_avg": decode_seconds * 1000 / decodes if decodes else 0.0,
+        }
+
+
+token_cache = VerifiedTokenCache(jwt_handler, max_size=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
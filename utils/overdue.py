@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.dialect import insert_for
+from database.crud import read_watermark, set_watermark
+from database.models import BorrowedBooks, OverdueLoan
+from database.session import SessionLocal
+
+# Имя отметки прогресса задачи поиска просрочек
+OVERDUE_WATERMARK = "overdue_scan"
+
+
+def scan_overdue(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Записывает выдачи, ставшие просроченными с прошлого запуска, одним INSERT ... SELECT (без commit).
+
+    Просматриваются только открытые выдачи со сроком возврата в интервале (отметка, now] — диапазон
+    по частичному индексу ix_borrowed_books_open_due, поэтому стоимость пропорциональна количеству
+    новых просрочек, а не размеру таблицы. После записи отметка сдвигается на now.
+
+    :param db: сессия базы данных.
+    :param now: текущий момент (по умолчанию datetime.utcnow()).
+    :return: количество новых просроченных выдач.
+    """
+    now = now or datetime.utcnow()
+    watermark = read_watermark(db, OVERDUE_WATERMARK)
+
+    newly_overdue = select(
+        BorrowedBooks.id, BorrowedBooks.book_id, BorrowedBooks.reader_id, BorrowedBooks.due_date
+    ).where(BorrowedBooks.return_date.is_(None), BorrowedBooks.due_date <= now)
+    if watermark is not None:
+        newly_overdue = newly_overdue.where(BorrowedBooks.due_date > watermark)
+    inserted = db.execute(
+        insert_for(db, OverdueLoan.__table__)
+        .from_select(["borrow_id", "book_id", "reader_id", "due_date"], newly_overdue)
+        .on_conflict_do_nothing(index_elements=[OverdueLoan.borrow_id])
+    ).rowcount
+
+    set_watermark(db, OVERDUE_WATERMARK, now)
+    return inserted
+
+
+def scan_overdue_job(session_factory=SessionLocal) -> None:
+    """Фоновая задача поиска новых просрочек."""
+    with session_factory() as db:
+        scan_overdue(db)
+        db.commit()
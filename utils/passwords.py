@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from config import settings
+
+
+class PasswordHasher:
+    """
+    Хэширование и проверка паролей: один CryptContext на процесс и отдельный ограниченный пул потоков.
+
+    bcrypt выполняется вне пула обработчиков запросов (bcrypt отпускает GIL, поэтому достаточно потоков,
+    без пула процессов): всплеск логинов занимает только потоки хэширования, а остальные эндпоинты
+    продолжают обслуживаться. Очередь ограничена: при переполнении запрос сразу получает 503,
+    а не ждёт минутами.
+
+    Первая схема из schemes используется для новых хэшей, остальные принимаются при проверке и помечаются
+    устаревшими; хэши bcrypt со стоимостью, отличной от bcrypt_rounds, тоже считаются устаревшими.
+
+    :param schemes: схемы passlib.
+    :param bcrypt_rounds: стоимость bcrypt (log2 числа раундов).
+    :param workers: количество потоков хэширования.
+    :param max_queue: максимальное количество операций, ожидающих свободного потока.
+    """
+
+    def __init__(self, schemes: Sequence[str], bcrypt_rounds: int, workers: int, max_queue: int):
+        self.context = CryptContext(
+            schemes=list(schemes),
+            deprecated="auto",
+            bcrypt__default_rounds=bcrypt_rounds,
+            bcrypt__min_desired_rounds=bcrypt_rounds,
+            bcrypt__max_desired_rounds=bcrypt_rounds,
+        )
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+
+    async def _run(self, func: Callable, *args):
+        """
+        Выполняет операцию в пуле хэширования, не блокируя цикл событий.
+
+        :raises HTTPException: 503, если пул и очередь заняты.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=503,
+                detail="Сервис проверки паролей перегружен, повторите позже",
+                headers={"Retry-After": "1"}
+            )
+        try:
+            future = self._pool.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        """
+        Хэширует пароль текущей схемой и стоимостью.
+
+        :param password: пароль.
+        :return: хэш пароля.
+        """
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """
+        Проверяет пароль и при необходимости пересчитывает хэш (сменилась схема или стоимость).
+
+        :param password: пароль.
+        :param password_hash: сохранённый хэш.
+        :return: (пароль верен, новый хэш или None, если хэш актуален).
+        """
+        return await self._run(self.context.verify_and_update, password, password_hash)
+
+
+password_hasher = PasswordHasher(
+    schemes=settings.PASSWORD_SCHEMES,
+    bcrypt_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE,
+)
@@ -1,5 +1,178 @@
+import itertools
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from fastapi import Request
+from jose.exceptions import JWTError
+from limits.storage import Storage
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-# Создание экземпляра лимитера с использованием IP как ключа
-limiter = Limiter(key_func=get_remote_address)
+from config import settings
+from utils.cache import LocalSharedStore
+from utils.jwt import token_cache
+
+
+class SQLiteStorage(Storage):
+    """
+    Хранилище счётчиков лимитов в файле SQLite (URI sqlite:///путь): общее для всех процессов приложения
+    на одном хосте.
+
+    Каждое увеличение счётчика — один атомарный INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+    (истёкшее окно начинается заново в том же запросе). Файл в режиме WAL, соединение — одно на поток.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    # Каждые PURGE_EVERY увеличений счётчиков удаляются истёкшие ключи
+    PURGE_EVERY = 1000
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = uri[len("sqlite:///"):] if uri.startswith("sqlite:///") else uri
+        self._local = threading.local()
+        self._hits = itertools.count(1)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits "
+                "(key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1) -> int:
+        now = time.time()
+        if next(self._hits) % self.PURGE_EVERY == 0:
+            self._connection.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+        # Выражения SET видят значения строки до обновления, поэтому оба CASE проверяют старое окно
+        return self._connection.execute(
+            "INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END, "
+            "expires_at = CASE WHEN expires_at <= ? OR ? THEN excluded.expires_at ELSE expires_at END "
+            "RETURNING count",
+            (key, amount, now + expiry, now, now, elastic_expiry)
+        ).fetchone()[0]
+
+    def get(self, key: str) -> int:
+        row = self._connection.execute(
+            "SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> int:
+        row = self._connection.execute("SELECT expires_at FROM rate_limits WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else int(time.time())
+
+    def check(self) -> bool:
+        try:
+            self._connection.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        return self._connection.execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key: str) -> None:
+        self._connection.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+
+class SharedStoreStorage(Storage):
+    """
+    Хранилище счётчиков лимитов в общем сетевом хранилище (клиент с интерфейсом redis.Redis).
+
+    URI shared:// — локальная замена (LocalSharedStore, для разработки и тестов),
+    shared+redis://host:6379/0 — Redis (нужен пакет redis).
+    """
+
+    STORAGE_SCHEME = ["shared", "shared+redis"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, client=None, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        if client is None and uri.startswith("shared+redis://"):
+            import redis
+            client = redis.Redis.from_url(uri[len("shared+"):])
+        self.client = client if client is not None else LocalSharedStore()
+
+    @property
+    def base_exceptions(self):
+        return Exception
+
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1) -> int:
+        # Ключ создаётся сразу со сроком действия (SET NX EX), затем увеличивается: счётчик не остаётся без срока
+        self.client.set(key, b"0", ex=expiry, nx=True)
+        value = self.client.incrby(key, amount)
+        if elastic_expiry:
+            self.client.expire(key, expiry)
+        return value
+
+    def get(self, key: str) -> int:
+        return int(self.client.get(key) or 0)
+
+    def get_expiry(self, key: str) -> int:
+        return int(time.time() + max(self.client.ttl(key), 0))
+
+    def check(self) -> bool:
+        try:
+            self.client.get("rate-limit-check")
+            return True
+        except Exception:
+            return False
+
+    def reset(self) -> Optional[int]:
+        keys = self.client.keys("LIMITER*")
+        if keys:
+            self.client.delete(*keys)
+        return len(keys)
+
+    def clear(self, key: str) -> None:
+        self.client.delete(key)
+
+
+def rate_limit_key(request: Request) -> str:
+    """
+    Ключ лимита: пользователь из JWT (sub), если передан действительный токен, иначе IP-адрес клиента.
+
+    Токен проверяется через кэш проверенных токенов, поэтому подменить sub нельзя, а повторная
+    проверка подписи не нужна.
+
+    :param request: запрос.
+    :return: ключ лимита.
+    """
+    authorization = request.headers.get("authorization")
+    if authorization and authorization.startswith("Bearer "):
+        try:
+            subject = token_cache.verify(authorization.split(" ")[1]).get("sub")
+        except JWTError:
+            subject = None
+        if subject is not None:
+            return f"user:{subject}"
+    return f"ip:{get_remote_address(request)}"
+
+
+def route_limit(path: str) -> str:
+    """
+    Лимит маршрута: из RATE_LIMITS, по умолчанию RATE_LIMITER запросов в минуту.
+
+    :param path: путь маршрута, например /auth/login.
+    :return: строка лимита slowapi (например 10/minute).
+    """
+    return settings.RATE_LIMITS.get(path, f"{settings.RATE_LIMITER}/minute")
+
+
+# Лимитер с ключом по пользователю (или IP) и хранилищем из RATE_LIMIT_STORAGE_URI
+limiter = Limiter(key_func=rate_limit_key, storage_uri=settings.RATE_LIMIT_STORAGE_URI)
@@ -0,0 +1,92 @@
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from database.dialect import insert_for
+from database.models import RevokedToken
+from database.session import SessionLocal
+from utils.jwt import ACCESS_TOKEN
+
+
+class RevocationList:
+    """
+    Отозванные access-токены (jti) в памяти процесса.
+
+    Проверка отзыва на каждом запросе — поиск во множестве без запроса к БД. Список синхронизируется из
+    revoked_tokens раз в TOKEN_REVOCATION_SYNC_INTERVAL секунд (отзывы в других процессах приложения),
+    отзыв в этом процессе применяется сразу. Хранятся только неистёкшие токены, а access-токены живут
+    ACCESS_TOKEN_TTL секунд, поэтому множество небольшое и точное (без ложных срабатываний фильтра Блума).
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti in self._revoked
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def sync(self, db: Session, now: Optional[datetime] = None) -> None:
+        """
+        Добавляет отзывы из revoked_tokens и забывает истёкшие токены.
+
+        Отзыв не отменяется, поэтому загруженные записи объединяются с уже известными, а не заменяют их:
+        отзыв, добавленный в этом процессе во время синхронизации, не теряется.
+
+        :param db: сессия базы данных.
+        :param now: текущий момент (по умолчанию datetime.utcnow()).
+        """
+        now = now or datetime.utcnow()
+        rows = db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at)
+            .where(RevokedToken.token_type == ACCESS_TOKEN, RevokedToken.expires_at > now)
+        ).all()
+        with self._lock:
+            revoked = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at > now}
+            revoked.update(rows)
+            self._revoked = revoked
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked = {}
+
+
+def revoke_token(db: Session, claims: dict, token_type: str) -> bool:
+    """
+    Записывает отзыв токена в revoked_tokens (без commit).
+
+    :param db: сессия базы данных.
+    :param claims: claims токена (jti и exp).
+    :param token_type: тип токена (ACCESS_TOKEN или REFRESH_TOKEN).
+    :return: True, если токен отозван этим вызовом; False, если он уже был отозван
+        (повторное использование refresh-токена).
+    """
+    table = RevokedToken.__table__
+    return db.execute(insert_for(db, table).values(
+        jti=claims["jti"],
+        token_type=token_type,
+        expires_at=datetime.utcfromtimestamp(claims["exp"]),
+        revoked_at=datetime.utcnow()
+    ).on_conflict_do_nothing(index_elements=[table.c.jti])).rowcount == 1
+
+
+def sync_revocations_job(session_factory=SessionLocal) -> None:
+    """Фоновая задача синхронизации списка отозванных access-токенов из БД."""
+    with session_factory() as db:
+        revocation_list.sync(db)
+
+
+def purge_revocations_job(session_factory=SessionLocal) -> None:
+    """Фоновая задача удаления записей об отзыве истёкших токенов."""
+    with session_factory() as db:
+        db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+        db.commit()
+
+
+revocation_list = RevocationList()
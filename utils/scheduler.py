@@ -0,0 +1,80 @@
+import asyncio
+from typing import Callable, List
+
+from fastapi.concurrency import run_in_threadpool
+
+from config import settings
+
+
+class Job:
+    """Периодическая задача планировщика."""
+
+    def __init__(
+        self, name: str, func: Callable[[], None], interval: float,
+        run_on_startup: bool = False, run_on_shutdown: bool = False
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.run_on_startup = run_on_startup
+        self.run_on_shutdown = run_on_shutdown
+
+
+class Scheduler:
+    """
+    Простой планировщик фоновых задач внутри процесса приложения (asyncio).
+
+    Задачи — синхронные функции, выполняются в пуле потоков, чтобы не блокировать event loop.
+    Запускается и останавливается из lifespan приложения.
+    """
+
+    def __init__(self):
+        self.jobs: List[Job] = []
+        self._tasks: List[asyncio.Task] = []
+        self.logger = settings.logger
+
+    def add_job(
+        self, name: str, func: Callable[[], None], interval: float,
+        run_on_startup: bool = False, run_on_shutdown: bool = False
+    ) -> None:
+        """
+        Регистрирует периодическую задачу.
+
+        :param name: имя задачи (для логов).
+        :param func: синхронная функция без аргументов.
+        :param interval: период запуска в секундах; 0 или меньше — задача не запускается.
+        :param run_on_startup: выполнить задачу сразу при запуске приложения, не дожидаясь первого периода.
+        :param run_on_shutdown: выполнить задачу ещё раз при остановке приложения.
+        """
+        if interval > 0:
+            self.jobs.append(Job(name, func, interval, run_on_startup, run_on_shutdown))
+
+    async def _run(self, job: Job) -> None:
+        try:
+            await run_in_threadpool(job.func)
+        except Exception:
+            self.logger.exception(f"Фоновая задача {job.name} завершилась с ошибкой")
+
+    async def _loop(self, job: Job) -> None:
+        if job.run_on_startup:
+            await self._run(job)
+        while True:
+            await asyncio.sleep(job.interval)
+            await self._run(job)
+
+    def start(self) -> None:
+        """Запускает все зарегистрированные задачи."""
+        self._tasks = [asyncio.create_task(self._loop(job), name=job.name) for job in self.jobs]
+
+    async def stop(self) -> None:
+        """Останавливает задачи и выполняет те, что отмечены run_on_shutdown."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self.jobs:
+            if job.run_on_shutdown:
+                await self._run(job)
+
+
+scheduler = Scheduler()
@@ -0,0 +1,106 @@
+import re
+from typing import List, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.orm import Session
+
+# Колонки books, по которым идёт поиск (порядок важен для весов bm25 в SQLite)
+SEARCH_COLUMNS = ("title", "author", "description")
+
+# Колонки books, возвращаемые поиском по умолчанию
+SEARCH_RESULT_COLUMNS = ("id", "title", "author", "description", "year", "isbn", "copies")
+
+# Полнотекстовый индекс для SQLite (FTS5 в режиме external content над таблицей books).
+# Используется миграцией и тестами, триггеры поддерживают индекс в актуальном состоянии.
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE books_fts USING fts5("
+    "title, author, description, content='books', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER books_fts_ai AFTER INSERT ON books BEGIN "
+    "INSERT INTO books_fts(rowid, title, author, description) "
+    "VALUES (new.id, new.title, new.author, new.description); END",
+    "CREATE TRIGGER books_fts_ad AFTER DELETE ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, author, description) "
+    "VALUES ('delete', old.id, old.title, old.author, old.description); END",
+    "CREATE TRIGGER books_fts_au AFTER UPDATE ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, author, description) "
+    "VALUES ('delete', old.id, old.title, old.author, old.description); "
+    "INSERT INTO books_fts(rowid, title, author, description) "
+    "VALUES (new.id, new.title, new.author, new.description); END",
+    "INSERT INTO books_fts(books_fts) VALUES ('rebuild')",
+]
+
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS books_fts_au",
+    "DROP TRIGGER IF EXISTS books_fts_ad",
+    "DROP TRIGGER IF EXISTS books_fts_ai",
+    "DROP TABLE IF EXISTS books_fts",
+]
+
+
+# Postgres: взвешенный tsvector (генерируемая колонка search_vector + GIN) и триграммы по title/author
+_PG_SEARCH = """
+    SELECT {columns}
+    FROM books
+    WHERE books.search_vector @@ to_tsquery('simple', :tsquery)
+       OR books.title % :q
+       OR books.author % :q
+    ORDER BY ts_rank(books.search_vector, to_tsquery('simple', :tsquery))
+             + greatest(similarity(books.title, :q), similarity(books.author, :q)) DESC,
+             books.id
+    LIMIT :limit OFFSET :offset
+"""
+
+# SQLite: FTS5 с префиксным поиском, ранжирование bm25 (title важнее author, author важнее description)
+_SQLITE_SEARCH = """
+    SELECT {columns}
+    FROM books_fts
+    JOIN books ON books.id = books_fts.rowid
+    WHERE books_fts MATCH :match
+    ORDER BY bm25(books_fts, 10.0, 5.0, 1.0), books.id
+    LIMIT :limit OFFSET :offset
+"""
+
+
+def _tokens(query: str) -> List[str]:
+    """
+    Разбивает поисковую строку на слова (без спецсимволов синтаксиса tsquery/FTS5).
+
+    :param query: строка поиска.
+    :return: список слов в нижнем регистре.
+    """
+    return [token.lower() for token in re.findall(r"\w+", query)]
+
+
+def search_books(db: Session, query: str, limit: int, offset: int = 0, columns: Sequence[str] = SEARCH_RESULT_COLUMNS) -> List[RowMapping]:
+    """
+    Ранжированный полнотекстовый и префиксный поиск книг по title, author и description.
+
+    На Postgres используется GIN-индекс по tsvector и триграммные индексы (нечёткое совпадение),
+    на SQLite — виртуальная таблица FTS5. Оба варианта создаются миграцией.
+
+    :param db: сессия базы данных.
+    :param query: строка поиска.
+    :param limit: размер страницы.
+    :param offset: смещение от начала выдачи.
+    :param columns: возвращаемые колонки books (имена должны быть заранее проверены).
+    :return: строки books в порядке релевантности.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+
+    dialect = db.get_bind().dialect.name
+    params = {"limit": limit, "offset": offset}
+    if dialect == "postgresql":
+        stmt = _PG_SEARCH
+        params.update(q=" ".join(tokens), tsquery=" & ".join(f"{token}:*" for token in tokens))
+    elif dialect == "sqlite":
+        stmt = _SQLITE_SEARCH
+        params.update(match=" ".join(f'"{token}"*' for token in tokens))
+    else:
+        raise NotImplementedError(f"Поиск не поддерживается для диалекта {dialect}")
+
+    select_list = ", ".join(f"books.{column}" for column in columns)
+    return list(db.execute(text(stmt.format(columns=select_list)), params).mappings().all())
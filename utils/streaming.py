@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Iterable, Iterator, Optional, Union
+
+from anyio.from_thread import run as run_from_thread
+from fastapi import Request
+from sqlalchemy import DateTime, Integer
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import Select
+
+from config import settings
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet — необязательная зависимость
+    pyarrow = None
+
+
+def iter_ndjson(bind: Engine, stmt: Select, yield_per: int = settings.STREAM_YIELD_PER) -> Iterator[str]:
+    """
+    Потоковая выдача результата запроса в формате NDJSON (одна JSON-строка на запись).
+
+    Запрос выполняется на отдельном соединении через серверный курсор (stream_results),
+    строки читаются порциями по yield_per и не превращаются в ORM-объекты,
+    поэтому расход памяти не зависит от размера таблицы.
+
+    :param bind: движок, на котором выполняется запрос.
+    :param stmt: SQLAlchemy select.
+    :param yield_per: размер порции строк, читаемых из курсора.
+    :return: итератор текстовых блоков NDJSON.
+    """
+    with bind.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=yield_per).execute(stmt)
+        for partition in result.mappings().partitions():
+            yield "".join(
+                json.dumps(dict(row), default=str, ensure_ascii=False) + "\n" for row in partition
+            )
+
+
+async def aiter_ndjson(bind: AsyncEngine, stmt: Select, yield_per: int = settings.STREAM_YIELD_PER) -> AsyncIterator[str]:
+    """
+    Асинхронный вариант iter_ndjson для асинхронного движка: строки читаются из серверного курсора
+    порциями по yield_per без блокировки event loop.
+
+    :param bind: асинхронный движок, на котором выполняется запрос.
+    :param stmt: SQLAlchemy select.
+    :param yield_per: размер порции строк, читаемых из курсора.
+    :return: асинхронный итератор текстовых блоков NDJSON.
+    """
+    async with bind.connect() as conn:
+        result = await conn.stream(stmt, execution_options={"yield_per": yield_per})
+        async for partition in result.mappings().partitions():
+            yield "".join(
+                json.dumps(dict(row), default=str, ensure_ascii=False) + "\n" for row in partition
+            )
+
+
+
+def iter_csv(bind: Engine, stmt: Select, yield_per: int = settings.STREAM_YIELD_PER) -> Iterator[str]:
+    """
+    Потоковая выдача результата запроса в формате CSV с заголовком.
+
+    Строки читаются из серверного курсора порциями по yield_per в виде кортежей, без ORM-объектов.
+
+    :param bind: движок, на котором выполняется запрос.
+    :param stmt: SQLAlchemy select.
+    :param yield_per: размер порции строк, читаемых из курсора.
+    :return: итератор текстовых блоков CSV.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    with bind.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=yield_per).execute(stmt)
+        writer.writerow(result.keys())
+        for partition in result.partitions():
+            writer.writerows(partition)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Файлоподобный приёмник, из которого записанные байты забираются порциями."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _arrow_type(column):
+    if isinstance(column.type, Integer):
+        return pyarrow.int64()
+    if isinstance(column.type, DateTime):
+        return pyarrow.timestamp("us")
+    return pyarrow.string()
+
+
+def iter_parquet(bind: Engine, stmt: Select, yield_per: int = settings.STREAM_YIELD_PER) -> Iterator[bytes]:
+    """
+    Потоковая выдача результата запроса в формате Parquet (одна row group на порцию курсора).
+
+    Требует установленного pyarrow.
+
+    :param bind: движок, на котором выполняется запрос.
+    :param stmt: SQLAlchemy select.
+    :param yield_per: размер порции строк, читаемых из курсора.
+    :return: итератор байтовых блоков файла Parquet.
+    """
+    schema = pyarrow.schema([(column.name, _arrow_type(column)) for column in stmt.selected_columns])
+    sink = _ChunkSink()
+    with bind.connect() as conn, pyarrow.parquet.ParquetWriter(sink, schema) as writer:
+        result = conn.execution_options(stream_results=True, yield_per=yield_per).execute(stmt)
+        for partition in result.partitions():
+            columns = list(zip(*partition))
+            writer.write_batch(pyarrow.record_batch([list(values) for values in columns], schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def gzip_stream(chunks: Iterable[Union[str, bytes]], level: int = 6) -> Iterator[bytes]:
+    """
+    Сжимает поток блоков в gzip на лету.
+
+    :param chunks: итератор текстовых (UTF-8) или байтовых блоков.
+    :param level: уровень сжатия.
+    :return: итератор сжатых блоков.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode() if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def _next_chunk(chunks: AsyncIterator[bytes]) -> Optional[bytes]:
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+def iter_request_body(request: Request) -> Iterator[bytes]:
+    """
+    Синхронный итератор по телу запроса для кода, выполняемого в пуле потоков (run_in_threadpool).
+
+    Блоки тела читаются по одному из event loop, поэтому тело не накапливается в памяти целиком.
+
+    :param request: входящий запрос.
+    :return: итератор байтовых блоков тела.
+    """
+    chunks = request.stream().__aiter__()
+    while (chunk := run_from_thread(_next_chunk, chunks)) is not None:
+        if chunk:
+            yield chunk